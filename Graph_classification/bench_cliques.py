@@ -0,0 +1,63 @@
+"""
+Maximal cliques: NetworkX's find_cliques against the engine in cliques.py,
+serial and with 2, 4, ... worker processes up to the core count, on the
+bundled datasets and on synthetic graphs of --nodes nodes. The two must
+find exactly the same cliques (compared as sets of node sets); the table
+gives each one's time and the engine's speedup.
+
+Usage: python bench_cliques.py [--nodes 20000] [--workers 1 2 4] [FILE ...]
+"""
+import argparse
+import os
+
+import networkx as nx
+import numpy as np
+
+from bench_common import DATASETS, timed, worker_counts
+from cliques import maximal_cliques
+from csr_graph import graph_from_pairs, load_graph
+
+
+def canonical(found):
+    return sorted(sorted(clique) for clique in found)
+
+
+def report(csr, label, workers):
+    graph = csr.to_networkx()
+    reference, baseline = timed(lambda: list(nx.find_cliques(graph)))
+    expected = canonical(reference)
+    cells = []
+    for count in workers:
+        found, elapsed = timed(lambda: list(maximal_cliques(csr, workers=count)))
+        if canonical(found) != expected:
+            raise AssertionError(f"{label}: cliques differ from NetworkX with {count} workers")
+        cells.append(f"{elapsed * 1000:>8.0f} {baseline / elapsed:>6.1f}x")
+    largest = max(map(len, reference), default=0)
+    print(f"{label:<26} {csr.num_nodes:>7} {csr.num_edges:>8} {len(reference):>8} {largest:>4} "
+          f"{baseline * 1000:>8.0f}  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", default=DATASETS)
+    parser.add_argument("--nodes", type=int, default=20000, help="nodes in each synthetic graph (0 to skip)")
+    parser.add_argument("--workers", type=int, nargs="+", default=worker_counts())
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores")
+    print(f"{'graph':<26} {'nodes':>7} {'edges':>8} {'cliques':>8} {'max':>4} {'nx ms':>8}  "
+          + "  ".join(f"{f'{count} worker ms':>15}" for count in args.workers))
+    for filepath in args.files:
+        report(load_graph(filepath), os.path.basename(filepath), args.workers)
+    if args.nodes:
+        synthetic = [
+            ("barabasi-albert m=3", nx.barabasi_albert_graph(args.nodes, 3, seed=1)),
+            ("powerlaw-cluster p=0.5", nx.powerlaw_cluster_graph(args.nodes, 5, 0.5, seed=1)),
+            ("gnp dense (200 nodes)", nx.gnp_random_graph(200, 0.3, seed=1)),
+        ]
+        for label, graph in synthetic:
+            report(graph_from_pairs(np.array(graph.edges(), dtype=np.int64)), label, args.workers)
+
+
+if __name__ == "__main__":
+    main()
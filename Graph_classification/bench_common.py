@@ -0,0 +1,22 @@
+"""Helpers shared by the bench_*.py scripts: the bundled datasets, timing and worker counts."""
+import os
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATASETS = [os.path.join(HERE, "Identification", f"Data{i}.txt") for i in (1, 2, 3)]
+
+
+def timed(function, *args, **kwargs):
+    """(result, seconds) of one call."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def worker_counts():
+    """1, 2, 4, ... up to the core count, which is always included."""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    return counts + [cores] if cores > 1 else counts
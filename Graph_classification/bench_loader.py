@@ -0,0 +1,60 @@
+"""
+Edge-list loading: csr_graph.load_graph (bulk parse into CSR arrays, with and
+without a memory map) against the original line-by-line NetworkX reader, on
+the bundled datasets and on a synthetic edge list of --edges random edges.
+
+Usage: python bench_loader.py [--edges 2000000] [FILE ...]
+"""
+import argparse
+import os
+import tempfile
+
+import networkx as nx
+import numpy as np
+
+from bench_common import DATASETS, timed
+from csr_graph import load_graph
+
+
+def read_graph_reference(filepath):
+    """The original read_graph: one split and add_edge per line, string labels."""
+    graph = nx.Graph()
+    with open(filepath, 'r') as file:
+        for line in file:
+            tokens = line.strip().split()
+            if len(tokens) < 2:
+                continue
+            graph.add_edge(tokens[0], tokens[1])
+    return graph
+
+
+def report(filepath, label):
+    _, reference = timed(read_graph_reference, filepath)
+    csr, bulk = timed(load_graph, filepath)
+    _, mapped = timed(load_graph, filepath, use_mmap=True)
+    _, convert = timed(csr.to_networkx)
+    print(f"{label:<24} {csr.num_nodes:>9} {csr.num_edges:>9} {reference * 1000:>10.0f} {bulk * 1000:>8.0f} "
+          f"{mapped * 1000:>8.0f} {reference / bulk:>7.1f}x {convert * 1000:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", default=DATASETS)
+    parser.add_argument("--edges", type=int, default=2000000, help="edges in the synthetic file (0 to skip)")
+    args = parser.parse_args()
+
+    print(f"{'file':<24} {'nodes':>9} {'edges':>9} {'nx ms':>10} {'csr ms':>8} {'mmap ms':>8} {'speedup':>8} "
+          f"{'to nx ms':>9}")
+    for filepath in args.files:
+        report(filepath, os.path.basename(filepath))
+    if args.edges:
+        rng = np.random.default_rng(1)
+        pairs = rng.integers(1, args.edges // 2, size=(args.edges, 2))
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, "synthetic.txt")
+            np.savetxt(path, pairs, fmt="%d", delimiter=", ")
+            report(path, f"synthetic {args.edges}")
+
+
+if __name__ == "__main__":
+    main()
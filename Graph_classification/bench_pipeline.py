@@ -0,0 +1,63 @@
+"""
+Pattern extraction: the four original NetworkX detectors run one after
+another over the whole graph (as q2.main used to) against
+pipeline.extract_patterns with 1, 2, 4, ... worker processes up to the core
+count, on the bundled datasets. Prints wall-clock time and speedup over the
+whole-graph run for each worker count.
+
+The pipeline must find the same patterns as the whole-graph run. It lists
+them by component and its cliques in another order, so each kind is
+compared after sorting, with the nodes of each clique sorted too and each
+chain read from its smaller end. Across worker counts the lists must be
+identical.
+
+Usage: python bench_pipeline.py [--workers 1 2 4] [FILE ...]
+"""
+import argparse
+import os
+
+from bench_common import DATASETS, timed, worker_counts
+from csr_graph import load_graph
+from pipeline import extract_patterns
+from q2 import detect_chains, detect_stars, extract_cliques, extract_cycles
+
+
+def whole_graph(graph):
+    return extract_cliques(graph), extract_cycles(graph), detect_stars(graph), detect_chains(graph)
+
+
+def canonical(patterns):
+    """(cliques, cycles, stars, chains) in an order that does not depend on how they were found."""
+    cliques, cycles, stars, chains = patterns
+    return [sorted(sorted(clique) for clique in cliques), sorted(cycles), sorted(stars),
+            sorted(min(chain, chain[::-1]) for chain in chains)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", default=DATASETS)
+    parser.add_argument("--workers", type=int, nargs="+", default=worker_counts())
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores")
+    print(f"{'file':<12} {'workers':>8} {'ms':>9} {'speedup':>8}  cliques/cycles/stars/chains")
+    for filepath in args.files:
+        csr = load_graph(filepath)
+        label = os.path.basename(filepath)
+        reference, serial = timed(whole_graph, csr.to_networkx())
+        expected = canonical(reference)
+        first = None
+        print(f"{label:<12} {'whole':>8} {serial * 1000:>9.0f} {1:>7.2f}x  {'/'.join(str(len(r)) for r in reference)}")
+        for workers in args.workers:
+            result, elapsed = timed(extract_patterns, csr, workers)
+            if canonical(result) != expected:
+                raise AssertionError(f"{label}: patterns differ from the whole-graph run with {workers} workers")
+            if first is not None and result != first:
+                raise AssertionError(f"{label}: pattern order differs between worker counts")
+            first = first or result
+            print(f"{label:<12} {workers:>8} {elapsed * 1000:>9.0f} {serial / elapsed:>7.2f}x  "
+                  f"{'/'.join(str(len(r)) for r in result)}")
+
+
+if __name__ == "__main__":
+    main()
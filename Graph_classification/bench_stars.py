@@ -0,0 +1,53 @@
+"""
+Star detection: the original detect_stars (every pair of every node's
+neighbours tested on the NetworkX graph) against detect_stars_csr (nodes in
+no triangle, by CSRGraph.in_triangle), on the bundled datasets and on
+synthetic power-law graphs of --nodes nodes. Both must report the same stars
+in the same order.
+
+Usage: python bench_stars.py [--nodes 20000] [FILE ...]
+"""
+import argparse
+import os
+
+import networkx as nx
+import numpy as np
+
+from bench_common import DATASETS, timed
+from csr_graph import graph_from_pairs, load_graph
+from q2 import detect_stars, detect_stars_csr
+
+
+def report(csr, label):
+    graph = csr.to_networkx()
+    reference, pairwise = timed(detect_stars, graph)
+    stars, triangles = timed(detect_stars_csr, csr)
+    if stars != reference:
+        raise AssertionError(f"{label}: star lists differ")
+    hub = int(csr.degrees().max(initial=0))
+    print(f"{label:<28} {csr.num_nodes:>8} {csr.num_edges:>9} {hub:>6} {len(stars):>7} "
+          f"{pairwise * 1000:>10.1f} {triangles * 1000:>9.1f} {pairwise / max(triangles, 1e-9):>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", default=DATASETS)
+    parser.add_argument("--nodes", type=int, default=20000, help="nodes in each synthetic graph (0 to skip)")
+    args = parser.parse_args()
+
+    print(f"{'graph':<28} {'nodes':>8} {'edges':>9} {'hub':>6} {'stars':>7} {'pairs ms':>10} "
+          f"{'tri ms':>9} {'speedup':>8}")
+    for filepath in args.files:
+        report(load_graph(filepath), os.path.basename(filepath))
+    if args.nodes:
+        synthetic = [
+            ("barabasi-albert m=2", nx.barabasi_albert_graph(args.nodes, 2, seed=1)),
+            ("barabasi-albert m=5", nx.barabasi_albert_graph(args.nodes, 5, seed=1)),
+            ("powerlaw-cluster p=0.1", nx.powerlaw_cluster_graph(args.nodes, 3, 0.1, seed=1)),
+        ]
+        for label, graph in synthetic:
+            report(graph_from_pairs(np.array(graph.edges(), dtype=np.int64)), label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Maximal-clique enumeration over a CSRGraph's integer node IDs:
+Bron-Kerbosch with Tomita pivoting, run once per node in degeneracy order,
+for the cliques of four or more nodes; smaller ones are found in bulk.
+
+Most maximal cliques of a sparse graph have two or three nodes, and those
+are settled with whole-array operations: an edge is a maximal clique when
+it lies in no triangle, and a triangle when it lies in no K4 (two
+triangles on a common edge make a K4 exactly when the nodes opposite that
+edge are adjacent). A clique of four or more nodes is made of edges that
+lie in a K4, and so is anything that could extend it, so the search only
+runs over the subgraph of those edges.
+
+There, each node v starts a search among its own neighbours, with those
+later in the order as candidates (P) and those earlier as the excluded set
+(X), so every clique is reported once, from its earliest node, and no
+search has more than degeneracy-many candidates to begin with. Nodes with
+fewer than three later neighbours cannot start one and are never visited.
+Inside a search the neighbourhood is renumbered from 0 and P, X and each
+node's adjacency are held as bitsets in Python integers, so intersections
+and pivot counts are single integer operations.
+
+The per-node searches are independent, so with workers > 1 the outer loop
+is cut into consecutive ranges of the order that a process pool works
+through; results come back in order, identical to the serial run.
+"""
+import heapq
+import multiprocessing
+import os
+
+import numpy as np
+
+from csr_graph import CSRGraph, group_pairs
+
+# Ranges of the degeneracy order handed to each worker; more ranges even out uneven searches.
+RANGES_PER_WORKER = 16
+
+# Adjacency sets and the size filter, set up in each pool worker by init_worker.
+worker_state = {}
+
+
+def triangle_table(graph):
+    """
+    (nodes, opposite): every triangle once, as (t, 3) arrays of its nodes
+    and of the indices in graph.edges of the edge opposite each node.
+    """
+    parts = list(zip(*graph.closed_wedges())) or [[np.zeros(0, dtype=np.int64)]] * 6
+    node, a, b, edge_a, edge_b, edge_ab = (np.concatenate(part) for part in parts)
+    return np.stack((node, a, b), axis=1), np.stack((edge_ab, edge_b, edge_a), axis=1)
+
+
+def in_k4(graph, nodes, opposite):
+    """Boolean array over triangles, True for each one that lies in a K4."""
+    owner = np.repeat(np.arange(len(nodes)), 3)
+    order = np.argsort(opposite.ravel(), kind='stable')
+    edge, apex, owner = opposite.ravel()[order], nodes.ravel()[order], owner[order]
+    found = np.zeros(len(nodes), dtype=bool)
+    for first, second in group_pairs(np.searchsorted(edge, edge, side='right')):
+        joined = graph.edge_ids(apex[first], apex[second]) >= 0
+        found[owner[first[joined]]] = True
+        found[owner[second[joined]]] = True
+    return found
+
+
+def neighbour_sets(graph):
+    """Each node's neighbours as a set of node IDs (one shared empty set for nodes without)."""
+    indices, indptr = graph.indices.tolist(), graph.indptr.tolist()
+    adjacency = [frozenset()] * graph.num_nodes
+    for node in np.flatnonzero(graph.degrees()).tolist():
+        adjacency[node] = set(indices[indptr[node]:indptr[node + 1]])
+    return adjacency
+
+
+def degeneracy_order(adjacency):
+    """
+    Nodes with neighbours, in degeneracy order: repeatedly take the node of
+    least remaining degree, ties going to the smaller ID. Ties are broken
+    by ID so that the order within a component does not depend on the rest
+    of the graph.
+    """
+    n = len(adjacency)
+    degree = [len(nodes) for nodes in adjacency]
+    # Heap entries are degree * n + node, so plain integer comparisons give the tie-break.
+    heap = [d * n + node for node, d in enumerate(degree) if d]
+    heapq.heapify(heap)
+    removed = [False] * n
+    order = []
+    while heap:
+        d, node = divmod(heapq.heappop(heap), n)
+        if removed[node] or d != degree[node]:
+            continue
+        removed[node] = True
+        order.append(node)
+        for other in adjacency[node]:
+            if not removed[other]:
+                degree[other] -= 1
+                heapq.heappush(heap, degree[other] * n + other)
+    return order
+
+
+def search_starts(core, adjacency, min_later):
+    """
+    The nodes of core with at least min_later neighbours later in the
+    degeneracy order, in that order, each with those neighbours sorted by
+    ID. The later neighbours are counted with whole-array operations, so
+    the other nodes are never visited in Python.
+    """
+    n = core.num_nodes
+    order = np.array(degeneracy_order(adjacency), dtype=np.int64)
+    position = np.zeros(n, dtype=np.int64)
+    position[order] = np.arange(len(order))
+    u, v = core.edges[:, 0], core.edges[:, 1]
+    forward = position[u] < position[v]
+    owner, later = np.where(forward, u, v), np.where(forward, v, u)
+    later = later[np.argsort(owner * n + later)].tolist()
+    counts = np.bincount(owner, minlength=n)
+    indptr = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [(node, later[indptr[node]:indptr[node + 1]]) for node in order[counts[order] >= min_later].tolist()]
+
+
+def expand(clique, candidates, excluded, masks, members, min_size, found):
+    """
+    Tomita-pivoted Bron-Kerbosch step: append to found every maximal clique
+    that extends clique (a list of node IDs) by nodes of the candidates
+    bitset and by none of the excluded bitset. masks[i] is the bitset of
+    local node i's neighbours and members[i] its node ID.
+    """
+    size = candidates.bit_count()
+    if len(clique) + size < min_size:
+        return
+    if not size:
+        if not excluded:
+            found.append(clique)
+        return
+    # The pivot covers the most candidates; only candidates outside its neighbourhood are branched
+    # on. An excluded node adjacent to every candidate leaves nothing to branch on at all.
+    pivot_mask, best = 0, -1
+    rest = candidates | excluded
+    while rest:
+        low = rest & -rest
+        mask = masks[low.bit_length() - 1]
+        covered = (candidates & mask).bit_count()
+        if covered > best:
+            if covered == size:
+                return
+            pivot_mask, best = mask, covered
+        rest ^= low
+    branches = candidates & ~pivot_mask
+    while branches:
+        low = branches & -branches
+        branches ^= low
+        index = low.bit_length() - 1
+        expand(clique + [members[index]], candidates & masks[index], excluded & masks[index],
+               masks, members, min_size, found)
+        candidates ^= low
+        excluded |= low
+
+
+def cliques_from(node, later, adjacency, min_size, found):
+    """
+    Maximal cliques whose earliest node in the degeneracy order is node,
+    given its later neighbours sorted by ID. The local graph holds the later
+    neighbours (the candidates, numbered from 0) and those earlier
+    neighbours adjacent to one of them, in ID order: an earlier neighbour
+    adjacent to no candidate can neither be the pivot nor stop a clique of
+    node's from being maximal.
+    """
+    neighbours = adjacency[node]
+    shared = [adjacency[other] & neighbours for other in later]
+    members = later + sorted(set().union(*shared).difference(later))
+    local = {other: index for index, other in enumerate(members)}
+    masks = [0] * len(members)
+    for index, others in enumerate(shared):
+        for other in others:
+            at = local[other]
+            masks[index] |= 1 << at
+            if at >= len(later):
+                masks[at] |= 1 << index
+    candidates = (1 << len(later)) - 1
+    expand([node], candidates, ((1 << len(members)) - 1) ^ candidates, masks, members, min_size, found)
+
+
+def cliques_in_range(starts, adjacency, min_size):
+    """Maximal cliques from each (node, later neighbours) of starts in turn."""
+    found = []
+    for node, later in starts:
+        cliques_from(node, later, adjacency, min_size, found)
+    return found
+
+
+def init_worker(adjacency, min_size):
+    worker_state.update(adjacency=adjacency, min_size=min_size)
+
+
+def run_range(starts):
+    """Worker task: cliques_in_range over one slice of the search starts."""
+    return cliques_in_range(starts, worker_state["adjacency"], worker_state["min_size"])
+
+
+def clique_groups(graph, min_size=1, workers=1):
+    """
+    The maximal cliques of find_cliques, in the same order, in groups: a
+    list of node-ID lists from each run of searches, and the cliques found
+    in bulk as 2-D arrays, one row per clique.
+    """
+    nodes, opposite = triangle_table(graph)
+    in_triangle = np.zeros(graph.num_edges, dtype=bool)
+    in_triangle[opposite.ravel()] = True
+    k4 = in_k4(graph, nodes, opposite)
+    core_edges = np.zeros(graph.num_edges, dtype=bool)
+    core_edges[opposite[k4].ravel()] = True
+    core = CSRGraph(graph.labels, graph.edges[core_edges])
+    adjacency = neighbour_sets(core)
+    # A triangle whose edges all lie in K4s, though it does not, is maximal in core too; it is
+    # reported with the other triangles, so the search keeps to four nodes or more.
+    search_size = max(min_size, 4)
+    starts = search_starts(core, adjacency, search_size - 1)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(starts) < 2:
+        for node, later in starts:
+            found = []
+            cliques_from(node, later, adjacency, search_size, found)
+            yield found
+    else:
+        step = max(len(starts) // (workers * RANGES_PER_WORKER), 1)
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(adjacency, search_size)) as pool:
+            yield from pool.imap(run_range, [starts[start:start + step] for start in range(0, len(starts), step)])
+    if min_size <= 3:
+        yield nodes[~k4]
+    if min_size <= 2:
+        yield graph.edges[~in_triangle]
+    if min_size <= 1:
+        yield np.flatnonzero(graph.degrees() == 0)[:, None]
+
+
+def find_cliques(graph, min_size=1, workers=1):
+    """
+    Yield every maximal clique of a CSRGraph with at least min_size nodes,
+    as a list of node IDs: first the cliques of four or more nodes, by
+    their earliest node in degeneracy order, then the triangles in no K4,
+    then the edges in no triangle, in file order, then any isolated nodes.
+    With workers > 1 the search is spread over a process pool; the cliques
+    come out in the same order either way.
+    """
+    for group in clique_groups(graph, min_size, workers):
+        yield from group.tolist() if isinstance(group, np.ndarray) else group
+
+
+def maximal_cliques(graph, min_size=1, workers=1):
+    """find_cliques with each clique given as the nodes' original labels."""
+    labels = graph.labels.tolist()
+    for group in clique_groups(graph, min_size, workers):
+        if isinstance(group, np.ndarray):
+            yield from graph.labels[group].tolist()
+        else:
+            for clique in group:
+                yield [labels[node] for node in clique]
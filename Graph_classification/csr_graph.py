@@ -0,0 +1,303 @@
+import mmap
+import os
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Undirected simple graph over integer node IDs 0..n-1 in compressed sparse
+    row form: the neighbours of node i are indices[indptr[i]:indptr[i + 1]],
+    sorted. labels[i] is the node's label in the input file; IDs follow the
+    order in which labels first appear, as NetworkX would add them.
+    edges keeps each undirected edge once, in file order, as an (m, 2) array.
+    file_neighbors() gives a node's neighbours in file order instead, the
+    order NetworkX reports them in.
+    """
+
+    def __init__(self, labels, edges):
+        self.labels = labels
+        self.edges = edges
+        n = len(labels)
+        # Both directions of every edge, sorted by (source, target); the
+        # pairs are distinct, so one sort on a combined key does it.
+        sources = np.concatenate((edges[:, 0], edges[:, 1]))
+        targets = np.concatenate((edges[:, 1], edges[:, 0]))
+        self.indices = targets[np.argsort(sources * n + targets)]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=self.indptr[1:])
+        self.file_indices = None    # Built by file_adjacency().
+        self.edge_keys = None       # Built by edge_ids(), with edge_order.
+        self.edge_order = None
+
+    @property
+    def num_nodes(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.edges)
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def file_adjacency(self):
+        """Counterpart of indices, indexed by indptr, with each neighbour list in file order."""
+        if self.file_indices is None:
+            # Interleaving both directions keeps a stable sort in file order.
+            order = np.argsort(self.edges.ravel(), kind='stable')
+            self.file_indices = self.edges[:, ::-1].ravel()[order]
+        return self.file_indices
+
+    def file_neighbors(self, node):
+        """Neighbours of node in the order their edges appear in the file."""
+        return self.file_adjacency()[self.indptr[node]:self.indptr[node + 1]]
+
+    def edge_ids(self, a, b):
+        """Index in edges of the edge between a[i] and b[i] for each i, or -1 where there is none."""
+        n = self.num_nodes
+        if self.edge_keys is None:
+            keys = np.minimum(self.edges[:, 0], self.edges[:, 1]) * n + np.maximum(self.edges[:, 0], self.edges[:, 1])
+            self.edge_order = np.argsort(keys)
+            self.edge_keys = keys[self.edge_order]
+        wanted = np.minimum(a, b) * n + np.maximum(a, b)
+        if not len(self.edge_keys):
+            return np.full(len(wanted), -1, dtype=np.int64)
+        at = np.minimum(np.searchsorted(self.edge_keys, wanted), len(self.edge_keys) - 1)
+        return np.where(self.edge_keys[at] == wanted, self.edge_order[at], -1)
+
+    def closed_wedges(self, batch=1 << 22, done=None):
+        """
+        Every triangle once, as arrays per batch of about batch candidate
+        pairs: yields (node, a, b, edge_a, edge_b, edge_ab), the triangles'
+        nodes and the indices in edges of the edges node-a, node-b and a-b.
+        Edges are oriented from lower to higher (degree, ID) rank and each
+        triangle is found from its lowest node, among the pairs of that
+        node's out-neighbours; no node has more than about sqrt(2m) of those.
+        With a boolean node array done, pairs whose three nodes are all
+        marked in it when their batch is built are skipped.
+        """
+        n = self.num_nodes
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.lexsort((np.arange(n), self.degrees()))] = np.arange(n)
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        forward = rank[u] < rank[v]
+        low, high = np.where(forward, u, v), np.where(forward, v, u)
+        order = np.argsort(low * n + high)
+        sources, targets = low[order], high[order]
+        ends = np.cumsum(np.bincount(low, minlength=n))
+        for first, second in group_pairs(ends[sources], batch):
+            if done is not None:
+                open_ = ~(done[sources[first]] & done[targets[first]] & done[targets[second]])
+                first, second = first[open_], second[open_]
+            node, a, b = sources[first], targets[first], targets[second]
+            closing = self.edge_ids(a, b)
+            closed = closing >= 0
+            yield node[closed], a[closed], b[closed], order[first[closed]], order[second[closed]], closing[closed]
+
+    def in_triangle(self, batch=1 << 22):
+        """
+        Boolean array, True for every node that lies in a triangle, from
+        closed_wedges; the scan stops once every node of degree two or more
+        is marked, and pairs among marked nodes are not looked up.
+        """
+        found = np.zeros(self.num_nodes, dtype=bool)
+        candidates = self.degrees() >= 2
+        for node, a, b, _, _, _ in self.closed_wedges(batch, found):
+            found[node] = True
+            found[a] = True
+            found[b] = True
+            if found[candidates].all():
+                break
+        return found
+
+    def triangle_edges(self, batch=1 << 22):
+        """Boolean array over edges, True for every edge that lies in a triangle."""
+        found = np.zeros(self.num_edges, dtype=bool)
+        for _, _, _, edge_a, edge_b, edge_ab in self.closed_wedges(batch):
+            found[edge_a] = True
+            found[edge_b] = True
+            found[edge_ab] = True
+        return found
+
+    def label_list(self, nodes):
+        """Original labels of the given node IDs, as a Python list."""
+        return self.labels[np.asarray(nodes, dtype=np.int64)].tolist()
+
+    def connected_components(self):
+        """
+        Component of every node, named by the smallest node ID in it. Roots
+        are hooked onto the smaller root across each edge and the trees
+        flattened by pointer jumping, all as whole-array operations.
+        """
+        component = np.arange(self.num_nodes)
+        u, v = self.edges[:, 0], self.edges[:, 1]
+        while True:
+            cu, cv = component[u], component[v]
+            low = np.minimum(cu, cv)
+            hooked = component.copy()
+            np.minimum.at(hooked, cu, low)
+            np.minimum.at(hooked, cv, low)
+            while True:
+                jumped = hooked[hooked]
+                if np.array_equal(jumped, hooked):
+                    break
+                hooked = jumped
+            if np.array_equal(hooked, component):
+                return component
+            component = hooked
+
+    def to_networkx(self):
+        """Equivalent networkx.Graph with the original labels (NetworkX is only needed here)."""
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_nodes_from(self.labels.tolist())
+        graph.add_edges_from(self.labels[self.edges].tolist())
+        return graph
+
+
+def group_pairs(ends, batch=1 << 22):
+    """
+    All pairs of positions i < j in the same run of an array made of runs,
+    where ends[i] is the end of position i's run: yields (first, second)
+    index arrays, about batch pairs at a time, so that the pairs of a large
+    array never have to exist at once.
+    """
+    partners = ends - np.arange(len(ends)) - 1
+    total = np.cumsum(partners)
+    done = 0
+    start = 0
+    while start < len(ends):
+        stop = max(int(np.searchsorted(total, done + batch, side='right')), start + 1)
+        counts = partners[start:stop]
+        first = np.repeat(np.arange(start, stop), counts)
+        second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        yield first, second
+        done = int(total[stop - 1])
+        start = stop
+
+
+# Bytes of input scanned per step, so the temporaries stay bounded on huge files.
+CHUNK_SIZE = 1 << 24
+
+
+def scan_pairs(buf):
+    """
+    First two fields of every line in buf (a uint8 array of whole lines) as
+    an (m, 2) int64 array. Fields are separated by spaces, tabs or commas;
+    lines with fewer than two fields, and comment lines starting with '#'
+    or '%', are skipped. Raises ValueError on a line whose first two fields
+    are not both unsigned integers below 2**63, so that no label can wrap
+    around in int64 and merge with another.
+    """
+    newlines = np.flatnonzero(buf == 10)
+    # A carriage return before the line break counts as a separator, so CRLF files work too.
+    in_field = (buf != 32) & (buf != 9) & (buf != 44) & (buf != 13) & (buf != 10)
+    edge = np.diff(in_field.view(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edge == 1)
+    ends = np.flatnonzero(edge == -1)
+    line = np.searchsorted(newlines, starts)
+    # Position of each field within its line.
+    first = np.ones(len(starts), dtype=bool)
+    first[1:] = line[1:] != line[:-1]
+    position = np.arange(len(starts)) - np.maximum.accumulate(np.where(first, np.arange(len(starts)), 0))
+    comment = first & ((buf[starts] == 35) | (buf[starts] == 37))
+    commented = np.zeros(len(newlines) + 1, dtype=bool)
+    commented[line[comment]] = True
+    second = np.flatnonzero((position == 1) & ~commented[line])
+    fields = np.stack((second - 1, second), axis=1).ravel()
+    starts, lengths = starts[fields], ends[fields] - starts[fields]
+    values = np.zeros(len(starts), dtype=np.int64)
+    numeric = np.ones(len(starts), dtype=bool)
+    for k in range(int(lengths.max(initial=0))):
+        longer = np.flatnonzero(lengths > k)
+        digits = buf[starts[longer] + k] - 48    # uint8, so anything below '0' wraps past 9 too.
+        numeric[longer[digits > 9]] = False
+        values[longer] = values[longer] * 10 + digits
+    # Below 19 digits nothing overflows; 19 digits wrap negative exactly when they reach 2**63.
+    numeric &= (lengths < 19) | ((lengths == 19) & (values >= 0))
+    if not numeric.all():
+        at = line[fields[np.argmin(numeric)]]
+        begin = newlines[at - 1] + 1 if at else 0
+        stop = newlines[at] if at < len(newlines) else len(buf)
+        text = bytes(buf[begin:stop]).decode(errors='replace')
+        raise ValueError(f"edge list line is not two unsigned integers below 2**63: {text!r}")
+    return values.reshape(-1, 2)
+
+
+def read_edge_list(filepath, use_mmap=False):
+    """
+    Parse an edge list into an (m, 2) int64 array of endpoint labels: the
+    first two fields of each line, which must be unsigned integers below
+    2**63, so "1 2", "1, 2" and "1\t2 0.5" are all the edge (1, 2). Blank
+    lines, lines with a single field and '#' or '%' comment lines are
+    skipped; any other line raises ValueError (see scan_pairs). The file is
+    read in bulk, or through a memory map with use_mmap, and scanned
+    CHUNK_SIZE bytes at a time.
+    """
+    with open(filepath, 'rb') as file:
+        if use_mmap:
+            size = os.fstat(file.fileno()).st_size
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        else:
+            data = file.read()
+    buf = np.frombuffer(data, dtype=np.uint8)
+    chunks = [np.zeros((0, 2), dtype=np.int64)]
+    start = 0
+    while start < len(buf):
+        # Chunks end on a line break so no field is split.
+        newline = data.find(b'\n', start + CHUNK_SIZE)
+        end = len(buf) if newline < 0 else newline + 1
+        chunks.append(scan_pairs(buf[start:end]))
+        start = end
+    del buf
+    if use_mmap and data:
+        data.close()
+    return np.concatenate(chunks)
+
+
+def number_nodes(flat):
+    """
+    (labels, ids): the distinct labels in order of first appearance, and
+    each entry of flat replaced by its label's position in that order.
+    """
+    if not len(flat):
+        return flat, flat
+    top = int(flat.max())
+    if flat.min() >= 0 and top <= 4 * len(flat):
+        # Dense labels: first positions by an unbuffered minimum, no sorting of the entries.
+        first = np.full(top + 1, len(flat), dtype=np.int64)
+        np.minimum.at(first, flat, np.arange(len(flat)))
+        present = np.flatnonzero(first < len(flat))
+        labels = present[np.argsort(first[present])]
+        rank = np.empty(top + 1, dtype=np.int64)
+        rank[labels] = np.arange(len(labels))
+        return labels, rank[flat]
+    labels, first, ids = np.unique(flat, return_index=True, return_inverse=True)
+    appearance = np.argsort(first)
+    rank = np.empty_like(appearance)
+    rank[appearance] = np.arange(len(appearance))
+    return labels[appearance], rank[ids]
+
+
+def load_graph(filepath, use_mmap=False):
+    """
+    Read an edge list into a CSRGraph. Duplicate edges (in either direction)
+    and self-loops are dropped.
+    """
+    return graph_from_pairs(read_edge_list(filepath, use_mmap))
+
+
+def graph_from_pairs(pairs):
+    """CSRGraph from an (m, 2) array of label pairs, as load_graph builds it."""
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    labels, ids = number_nodes(pairs.ravel())
+    ids = ids.reshape(-1, 2)
+    n = len(labels)
+    low, high = np.minimum(ids[:, 0], ids[:, 1]), np.maximum(ids[:, 0], ids[:, 1])
+    _, keep = np.unique(low * n + high, return_index=True)
+    keep.sort()
+    return CSRGraph(labels, ids[keep])
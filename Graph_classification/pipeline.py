@@ -0,0 +1,139 @@
+"""
+Per-component pattern extraction. Cliques, cycles, stars and chains never
+cross a connected component, so components are computed once and shared
+out among a process pool, largest first, with smaller ones grouped so that
+each task holds about the same number of nodes plus edges. A task runs all
+four detectors in one pass over the subgraph of its components, and every
+pattern is put back under the component it came from, so the output is in
+component order (components in the order of their first node) however the
+work was split and whichever task finished first.
+"""
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+import q2
+from csr_graph import CSRGraph
+
+# Tasks handed to each worker, so that one slow component does not leave the others idle at the end.
+TASKS_PER_WORKER = 4
+
+
+def split_components(graph):
+    """(component, members): each node's component index, in order of first node, and each component's node IDs."""
+    roots, component = np.unique(graph.connected_components(), return_inverse=True)
+    order = np.argsort(component, kind='stable')
+    members = np.split(order, np.cumsum(np.bincount(component, minlength=len(roots)))[:-1])
+    return component, members
+
+
+def make_tasks(graph, component, members, num_tasks, min_clique_size=1, max_cliques=None):
+    """
+    Subgraphs for the pool as (labels, edges, owner, min_clique_size,
+    max_cliques), owner giving each local node's component. Components are taken largest
+    first and a task is closed once it holds about 1/num_tasks of all nodes
+    plus edges. Nodes keep their relative order and edges their file order.
+    """
+    edge_component = component[graph.edges[:, 0]]
+    sizes = np.array([len(nodes) for nodes in members]) + np.bincount(edge_component, minlength=len(members))
+    target = int(sizes.sum()) // max(num_tasks, 1) + 1
+    groups, group, filled = [], [], 0
+    for index in np.argsort(-sizes, kind='stable').tolist():
+        group.append(index)
+        filled += int(sizes[index])
+        if filled >= target:
+            groups.append(group)
+            group, filled = [], 0
+    if group:
+        groups.append(group)
+    local = np.empty(graph.num_nodes, dtype=np.int64)
+    tasks = []
+    for group in groups:
+        chosen = np.zeros(len(members), dtype=bool)
+        chosen[group] = True
+        nodes = np.flatnonzero(chosen[component])
+        local[nodes] = np.arange(len(nodes))
+        edges = local[graph.edges[chosen[edge_component]]]
+        tasks.append((graph.labels[nodes], edges, component[nodes], min_clique_size, max_cliques))
+    return tasks
+
+
+def first_cliques(found, component_of, limit):
+    """
+    The cliques among the first limit in component order, as (component,
+    clique), from an iterator that yields each component's cliques in
+    order but interleaves the components. No more than limit are held at a
+    time: once that many are kept, the last kept clique of the highest
+    component is dropped, and with it everything that component or a later
+    one still yields. The iterator is abandoned once that happens to the
+    first component, since nothing after it can be kept.
+    """
+    kept = {}
+    total = 0
+    first = min(component_of.values(), default=0)
+    cutoff = math.inf
+    for clique in found:
+        index = component_of[clique[0]]
+        if index >= cutoff:
+            continue
+        kept.setdefault(index, []).append(clique)
+        total += 1
+        if total > limit:
+            cutoff = max(kept)
+            kept[cutoff].pop()
+            total -= 1
+            if not kept[cutoff]:
+                del kept[cutoff]
+            if cutoff == first:
+                break
+    return [(index, clique) for index in sorted(kept) for clique in kept[index]]
+
+
+def analyse(task):
+    """
+    Run the four detectors on one task's subgraph. Returns, for cliques,
+    cycles, stars and chains in turn, a list of (component, pattern). With
+    max_cliques set, only the cliques that can be among the first
+    max_cliques of the whole graph are kept (see first_cliques).
+    """
+    labels, edges, owner, min_clique_size, max_cliques = task
+    graph = CSRGraph(labels, edges)
+    nx_graph = graph.to_networkx()
+    component_of = dict(zip(labels.tolist(), owner.tolist()))
+    found = q2.iter_cliques(graph, min_clique_size)
+    if max_cliques is None:
+        cliques = [(component_of[clique[0]], clique) for clique in found]
+    else:
+        cliques = first_cliques(found, component_of, max_cliques)
+    others = (q2.extract_cycles(nx_graph), q2.detect_stars_csr(graph), q2.detect_chains_csr(graph))
+    return [cliques] + [[(component_of[pattern[0]], pattern) for pattern in patterns] for patterns in others]
+
+
+def extract_patterns(graph, workers=None, min_clique_size=1, max_cliques=None):
+    """
+    (cliques, cycles, stars, chains) of a CSRGraph, grouped by component in
+    component order, computed by workers processes (default: one per core).
+    With one worker the whole graph is a single task, run in this process.
+    Cliques smaller than min_clique_size are left out, and only the first
+    max_cliques are returned; no task holds more than that many at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    component, members = split_components(graph)
+    tasks = make_tasks(graph, component, members, 1 if workers == 1 else workers * TASKS_PER_WORKER,
+                       min_clique_size, max_cliques)
+    if len(tasks) == 1:
+        results = [analyse(tasks[0])]
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            results = list(pool.imap_unordered(analyse, tasks))
+    merged = []
+    for kind in range(4):
+        by_component = [[] for _ in members]
+        for result in results:
+            for index, pattern in result[kind]:
+                by_component[index].append(pattern)
+        merged.append([pattern for patterns in by_component for pattern in patterns])
+    merged[0] = merged[0][:max_cliques]
+    return tuple(merged)
@@ -1,29 +1,57 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from itertools import islice
+
 import networkx as nx
+import numpy as np
+
+import cliques
+import pipeline
+from csr_graph import CSRGraph, load_graph
+
+SEPARATOR = "------------------------------------------------------------------------------\n"
+# Buffer size for writing the report, and for copying its spooled body into place.
+WRITE_BUFFER = 1 << 20
+# Patterns between updates of the progress counter.
+PROGRESS_EVERY = 10000
+# Star centres whose stars are assembled per numpy pass in iter_stars_csr.
+STAR_CHUNK = 1 << 16
 
 def read_graph(filepath):
     """
-    Construct an undirected graph from the provided file.
+    Construct an undirected NetworkX graph from the provided file.
     Each line is assumed to define an edge using at least two elements:
       - The first node (source)
       - The second node (destination)
-    Any additional elements are ignored.
+    Any additional elements are ignored. Nodes must be unsigned integers
+    below 2**63, separated by spaces, tabs or commas; lines starting with
+    '#' or '%' are comments. Any other line whose first two elements are not
+    both such integers raises ValueError. The file is parsed by
+    csr_graph.load_graph; use that directly to skip building NetworkX.
     """
-    graph = nx.Graph()
-    with open(filepath, 'r') as file:
-        for line in file:
-            tokens = line.strip().split()
-            if len(tokens) < 2:
-                continue
-            source, destination = tokens[0], tokens[1]
-            graph.add_edge(source, destination)
-    return graph
+    return load_graph(filepath).to_networkx()
 
-def extract_cliques(graph):
+def extract_cliques(graph, min_size=1, limit=None, workers=1):
     """
     Retrieve all maximal cliques in the graph.
     A maximal clique is a fully connected subset of nodes that cannot be extended.
+    Cliques smaller than min_size are skipped, and at most limit are returned.
+    graph may be a NetworkX graph or a CSRGraph, which uses the clique engine
+    in cliques.py (the same cliques, in another order) over workers processes.
     """
-    return list(nx.find_cliques(graph))
+    return list(iter_cliques(graph, min_size, limit, workers))
+
+def iter_cliques(graph, min_size=1, limit=None, workers=1):
+    """extract_cliques as an iterator, producing each clique as it is found."""
+    if isinstance(graph, CSRGraph):
+        return islice(cliques.maximal_cliques(graph, min_size, workers), limit)
+    found = nx.find_cliques(graph)
+    if min_size > 1:
+        found = (clique for clique in found if len(clique) >= min_size)
+    return islice(found, limit)
 
 def extract_cycles(graph):
     """
@@ -32,13 +60,55 @@ def extract_cycles(graph):
     """
     return nx.cycle_basis(graph)
 
+def iter_cycles(graph):
+    """
+    extract_cycles as a generator: the same walk as nx.cycle_basis, which
+    yields the same cycles in the same order, each as soon as it is closed,
+    and keeps the spanning-tree state of only one component at a time.
+    """
+    remaining = dict.fromkeys(graph)
+    while remaining:
+        root = remaining.popitem()[0]
+        stack = [root]
+        pred = {root: root}
+        used = {root: set()}
+        while stack:
+            z = stack.pop()
+            zused = used[z]
+            for nbr in graph[z]:
+                if nbr not in used:
+                    pred[nbr] = z
+                    stack.append(nbr)
+                    used[nbr] = {z}
+                elif nbr == z:
+                    yield [z]
+                elif nbr not in zused:
+                    pn = used[nbr]
+                    cycle = [nbr, z]
+                    p = pred[z]
+                    while p not in pn:
+                        cycle.append(p)
+                        p = pred[p]
+                    cycle.append(p)
+                    yield cycle
+                    used[nbr].add(z)
+        for node in pred:
+            remaining.pop(node, None)
+
 def detect_stars(graph):
     """
     Find star-like patterns in the graph.
     A node with two or more neighbors forms a star if its neighbors are not connected to each other.
     Each star is reported as a list: [center, leaf1, leaf2, ...].
+    graph may be a NetworkX graph or a CSRGraph.
     """
-    star_patterns = []
+    return list(iter_stars(graph))
+
+def iter_stars(graph):
+    """detect_stars as a generator, yielding each star in turn."""
+    if isinstance(graph, CSRGraph):
+        yield from iter_stars_csr(graph)
+        return
     for node in graph.nodes():
         neighbors = list(graph.neighbors(node))
         if len(neighbors) < 2:
@@ -46,8 +116,33 @@ def detect_stars(graph):
         if all(not graph.has_edge(neighbors[i], neighbors[j]) 
                for i in range(len(neighbors)) 
                for j in range(i + 1, len(neighbors))):
-            star_patterns.append([node] + neighbors)
-    return star_patterns
+            yield [node] + neighbors
+
+def detect_stars_csr(graph):
+    """
+    detect_stars on a CSRGraph. A node's neighbours are pairwise unconnected
+    exactly when the node lies in no triangle, so the centres are the nodes
+    of degree two or more left unmarked by CSRGraph.in_triangle, without
+    testing neighbour pairs one by one.
+    """
+    return list(iter_stars_csr(graph))
+
+def iter_stars_csr(graph):
+    """detect_stars_csr as a generator, assembling STAR_CHUNK stars at a time."""
+    degrees = graph.degrees()
+    all_centres = np.flatnonzero((degrees >= 2) & ~graph.in_triangle())
+    for chunk in range(0, len(all_centres), STAR_CHUNK):
+        centres = all_centres[chunk:chunk + STAR_CHUNK]
+        # The chunk's stars as one flat array, each centre followed by its neighbours, split into lists at the end.
+        sizes = degrees[centres] + 1
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        within = np.arange(int(ends[-1])) - np.repeat(starts, sizes)
+        flat = graph.file_adjacency()[np.maximum(np.repeat(graph.indptr[centres], sizes) + within - 1, 0)]
+        flat[starts] = centres
+        labels = graph.label_list(flat)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            yield labels[start:end]
 
 def detect_chains(graph):
     """
@@ -55,8 +150,16 @@ def detect_chains(graph):
     A chain is defined as a linear subgraph with:
       - Exactly two nodes of degree 1 (endpoints),
       - All other nodes having degree 2.
+    graph may be a NetworkX graph or a CSRGraph (see detect_chains_csr for
+    the orientation of its chains).
     """
-    chain_list = []
+    return list(iter_chains(graph))
+
+def iter_chains(graph):
+    """detect_chains as a generator, yielding each chain in turn."""
+    if isinstance(graph, CSRGraph):
+        yield from iter_chains_csr(graph)
+        return
     for component in nx.connected_components(graph):
         subgraph = graph.subgraph(component)
         if len(subgraph.nodes) < 2:
@@ -65,44 +168,106 @@ def detect_chains(graph):
         if degree_counts.count(1) == 2 and degree_counts.count(2) == len(subgraph.nodes) - 2:
             endpoints = [node for node in subgraph.nodes if subgraph.degree(node) == 1]
             if len(endpoints) == 2:
-                path = nx.shortest_path(subgraph, source=endpoints[0], target=endpoints[1])
-                chain_list.append(path)
-    return chain_list
+                yield nx.shortest_path(subgraph, source=endpoints[0], target=endpoints[1])
+
+def detect_chains_csr(graph):
+    """
+    detect_chains on a CSRGraph: components whose degree counts make them
+    a path are found with whole-array counts, and only those are walked.
+    Chains come out in component order, each starting from its endpoint
+    with the lower node ID, the one that appears first in the file. The
+    NetworkX version may list a chain the other way round.
+    """
+    return list(iter_chains_csr(graph))
+
+def iter_chains_csr(graph):
+    """detect_chains_csr as a generator, yielding each chain as it is walked."""
+    component = graph.connected_components()
+    degrees = graph.degrees()
+    sizes = np.bincount(component, minlength=graph.num_nodes)
+    ends = np.bincount(component, weights=degrees == 1, minlength=graph.num_nodes)
+    inner = np.bincount(component, weights=degrees == 2, minlength=graph.num_nodes)
+    is_chain = (sizes >= 2) & (ends == 2) & (inner == sizes - 2)
+    # Components are named by their first node, so sorting by name keeps component order.
+    endpoints = np.flatnonzero(is_chain[component] & (degrees == 1))
+    endpoints = endpoints[np.argsort(component[endpoints], kind='stable')]
+    seen = set()
+    for start in endpoints.tolist():
+        root = component[start]
+        if root in seen:
+            continue
+        seen.add(root)
+        path = [start]
+        previous = -1
+        while len(path) == 1 or degrees[path[-1]] == 2:
+            current = path[-1]
+            step = next(node for node in graph.neighbors(current).tolist() if node != previous)
+            previous = current
+            path.append(step)
+        yield graph.label_list(path)
+
+def write_patterns(file, patterns, name=None):
+    """
+    Write each pattern from the iterable as a " - pattern" line, as it
+    arrives; returns how many there were. With a name, a running count is
+    shown on stderr.
+    """
+    count = 0
+    for count, pattern in enumerate(patterns, 1):
+        file.write(f" - {pattern}\n")
+        if name and count % PROGRESS_EVERY == 0:
+            print(f"\r{name}: {count}", end="", file=sys.stderr, flush=True)
+    if name:
+        print(f"\r{name}: {count}", file=sys.stderr)
+    return count
+
+def write_report(path, cliques, cycles, stars, chains, progress=False):
+    """
+    Write the report: pattern counts, then the patterns of each kind. The
+    four arguments may be lists or generators; each is consumed once and
+    its patterns are written as they come, to a temporary file beside path,
+    so only the counts are held in memory. The header goes in once the
+    counts are known and the body is copied in after it.
+    """
+    sections = (("Cliques", cliques), ("Cycles", cycles), ("Stars", stars), ("Chains", chains))
+    counts = []
+    with tempfile.TemporaryFile("w+", buffering=WRITE_BUFFER, dir=os.path.dirname(os.path.abspath(path))) as body:
+        for index, (title, patterns) in enumerate(sections):
+            if index:
+                body.write(SEPARATOR)
+            body.write(f"{title}:\n")
+            counts.append(write_patterns(body, patterns, title if progress else None))
+        body.seek(0)
+        with open(path, "w", buffering=WRITE_BUFFER) as output:
+            output.write(f"Cliques (maximal): {counts[0]}\n")
+            output.write(f"\nCycles (basis): {counts[1]}\n")
+            output.write(f"\nStars (center + leaves): {counts[2]}\n")
+            output.write(f"\nChains (simple paths): {counts[3]}\n")
+            output.write(SEPARATOR)
+            shutil.copyfileobj(body, output, WRITE_BUFFER)
 
 def main():
-    input_file = "Identification/Data2.txt"  
-    graph = read_graph(input_file)
-
-    cliques = extract_cliques(graph)
-    cycles = extract_cycles(graph)
-    stars = detect_stars(graph)
-    chains = detect_chains(graph)
-
-    with open("output.txt", "w") as output:
-        output.write(f"Cliques (maximal): {len(cliques)}\n")
-        output.write(f"\nCycles (basis): {len(cycles)}\n")
-        output.write(f"\nStars (center + leaves): {len(stars)}\n")
-        output.write(f"\nChains (simple paths): {len(chains)}\n")
-        output.write("------------------------------------------------------------------------------\n")
-
-        output.write("Cliques:\n")
-        for group in cliques:
-            output.write(f" - {group}\n")
-        output.write("------------------------------------------------------------------------------\n")
-
-        output.write("Cycles:\n")
-        for cyc in cycles:
-            output.write(f" - {cyc}\n")
-        output.write("------------------------------------------------------------------------------\n")
-
-        output.write("Stars:\n")
-        for s in stars:
-            output.write(f" - {s}\n")
-        output.write("------------------------------------------------------------------------------\n")
-
-        output.write("Chains:\n")
-        for ch in chains:
-            output.write(f" - {ch}\n")
+    parser = argparse.ArgumentParser(description="Find cliques, cycles, stars and chains in an edge list.")
+    parser.add_argument("input_file", nargs="?", default="Identification/Data2.txt")
+    parser.add_argument("--output", default="output.txt")
+    parser.add_argument("--stream", action="store_true",
+                        help="run the detectors as generators in this process, writing patterns as they are found")
+    parser.add_argument("--min-clique-size", type=int, default=1, help="leave out smaller cliques")
+    parser.add_argument("--max-cliques", type=int, help="write at most this many cliques")
+    parser.add_argument("--workers", type=int, help="processes for the per-component run (default: one per core)")
+    parser.add_argument("--progress", action="store_true", help="count patterns on stderr as they are written")
+    args = parser.parse_args()
+
+    csr = load_graph(args.input_file)
+    if args.stream:
+        # Nothing is collected: each detector feeds the report as it runs.
+        found_cliques = iter_cliques(csr, args.min_clique_size, args.max_cliques, args.workers)
+        cycles, stars, chains = iter_cycles(csr.to_networkx()), iter_stars(csr), iter_chains(csr)
+    else:
+        # All four detectors run per connected component, across one process per core.
+        found_cliques, cycles, stars, chains = pipeline.extract_patterns(csr, args.workers, args.min_clique_size,
+                                                                         args.max_cliques)
+    write_report(args.output, found_cliques, cycles, stars, chains, args.progress)
 
 if __name__ == "__main__":
     main()
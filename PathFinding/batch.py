@@ -0,0 +1,149 @@
+"""
+Non-interactive batch planning over directories of scenario triples
+(data*.txt, Robots*.txt, Agent*.txt).
+
+Scenarios are planned across a process pool. Each one gets a wall-clock
+timeout: the planner's own budget is set to it, and a worker alarm stops a
+search that overruns anyway (where signal.setitimer exists). One JSON
+object per scenario is appended to the output file as soon as it finishes,
+so an interrupted run loses only the scenarios in flight. Running again
+with the same output file skips every scenario already recorded there.
+
+Usage: python batch.py DIR [DIR ...] [--out results.jsonl] [--workers 4] [--timeout 60]
+                       [--method cbs] [--w 1.0] [--heuristic manhattan] [--max-time 1000]
+                       [--no-paths] [--restart]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import time
+
+import cbs
+import prioritized
+from loader import load_problem, scenarios
+from pathfinder import HEURISTICS, SearchStats
+
+METHODS = ('cbs', 'prioritized')
+
+
+class ScenarioTimeout(Exception):
+    pass
+
+
+def on_alarm(signum, frame):
+    raise ScenarioTimeout()
+
+
+def init_worker():
+    # The parent handles Ctrl-C; workers are terminated with the pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, on_alarm)
+
+
+def scenario_key(grid_file):
+    """Identity of a scenario in the results file."""
+    return os.path.normpath(os.path.abspath(grid_file))
+
+
+def run_scenario(task):
+    """Plan one scenario in a worker; returns its result record."""
+    name, grid_file, robots_file, agents_file, options = task
+    record = {"scenario": name, "grid": scenario_key(grid_file), "method": options["method"]}
+    start_time = time.perf_counter()
+    alarm = hasattr(signal, 'setitimer') and options["timeout"]
+    if alarm:
+        # The planner's budget should stop it first; the alarm is the backstop.
+        signal.setitimer(signal.ITIMER_REAL, options["timeout"] + 1)
+    try:
+        problem = load_problem(grid_file, robots_file, agents_file, name)
+        search_stats = SearchStats()
+        if options["method"] == 'prioritized':
+            result = prioritized.solve(problem.grid, problem.starts, problem.goals, problem.reservations,
+                                       max_time=options["max_time"], heuristic_mode=options["heuristic"],
+                                       search_stats=search_stats)
+        else:
+            result = cbs.solve(problem.grid, problem.starts, problem.goals, problem.reservations, w=options["w"],
+                               time_limit=options["timeout"] or cbs.TIME_LIMIT, max_time=options["max_time"],
+                               heuristic_mode=options["heuristic"], search_stats=search_stats)
+        record.update(result.summary())
+        record["robots"] = len(problem.starts)
+        record["expansions"] = search_stats.expansions
+        record["pushes"] = search_stats.pushes
+        if options["paths"]:
+            record["paths"] = [[list(state) for state in path] for path in result.paths]
+    except ScenarioTimeout:
+        record["status"] = "timeout"
+    except Exception as error:
+        record["status"] = "error"
+        record["error"] = f"{type(error).__name__}: {error}"
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    # runtime (when present) is the planner's; elapsed includes loading the files.
+    record["elapsed"] = round(time.perf_counter() - start_time, 4)
+    return record
+
+
+def recorded(out):
+    """Scenario keys already in the results file; a line cut short by an interruption is ignored."""
+    done = set()
+    if not os.path.exists(out):
+        return done
+    with open(out) as file:
+        for line in file:
+            try:
+                done.add(json.loads(line)["grid"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def open_results(out, restart):
+    """Open the results file for appending, starting a fresh line after any partial one."""
+    if restart or not os.path.exists(out):
+        return open(out, "w")
+    file = open(out, "a+")
+    if file.tell():
+        file.seek(file.tell() - 1)
+        if file.read(1) != "\n":
+            file.write("\n")
+    return file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="+")
+    parser.add_argument("--out", default="results.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per scenario (0 = planner default)")
+    parser.add_argument("--method", choices=METHODS, default="cbs")
+    parser.add_argument("--w", type=float, default=1.0, help="suboptimality bound for CBS (1 = optimal)")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    parser.add_argument("--max-time", type=int, default=1000)
+    parser.add_argument("--no-paths", dest="paths", action="store_false", help="leave paths out of the results")
+    parser.add_argument("--restart", action="store_true", help="discard earlier results instead of resuming")
+    args = parser.parse_args()
+
+    options = {"method": args.method, "w": args.w, "heuristic": args.heuristic, "max_time": args.max_time,
+               "timeout": args.timeout, "paths": args.paths}
+    done = set() if args.restart else recorded(args.out)
+    tasks = [(*scenario, options) for directory in args.dirs for scenario in scenarios(directory)
+             if scenario_key(scenario[1]) not in done]
+    print(f"{len(tasks)} scenarios to plan, {len(done)} already in {args.out}")
+
+    counts = {}
+    with open_results(args.out, args.restart) as file, \
+            multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+        for record in pool.imap_unordered(run_scenario, tasks):
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            print(f"{record['scenario']:<20} {record['status']:<8} {record['elapsed']:>8.2f}s")
+    print(", ".join(f"{status}: {count}" for status, count in sorted(counts.items())) or "nothing to do")
+
+
+if __name__ == "__main__":
+    main()
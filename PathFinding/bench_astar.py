@@ -0,0 +1,77 @@
+"""
+Compare pathfinder.a_star (packed grid, integer states) with the original
+dict-based a_star_reference: wall time and peak traced memory per robot on
+the bundled scenarios, plus an exhaustive case on Data/data1 with the goal walled in, where both
+searches must exhaust the space-time up to max_time.
+
+Usage: python bench_astar.py [--max-time 1000] [--exhaustive-time 150] [DIR ...]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from gridmap import GridMap
+from loader import DATA_DIRS, HERE, scenarios
+from pathfinder import a_star, a_star_reference, read_input
+
+
+def measure(search, *args, **kwargs):
+    """Return (path, seconds, peak bytes); timed in a separate run since tracing slows allocation."""
+    start = time.perf_counter()
+    path = search(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    search(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return path, elapsed, peak
+
+
+def wall_in(grid, x, y):
+    """Copy of grid with the four neighbours of (x, y) turned into obstacles."""
+    rows = [list(row) for row in grid]
+    for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+        if 0 <= nx < grid.rows and 0 <= ny < grid.cols:
+            rows[nx][ny] = 'X'
+    rows[x][y] = '.'
+    return GridMap.from_rows(rows)
+
+
+def report(label, grid, start, goal, reservations, max_time):
+    rows = list(grid)
+    path, fast, fast_peak = measure(a_star, grid, start, goal, reservations, max_time)
+    ref_path, slow, slow_peak = measure(a_star_reference, rows, start, goal, reservations, max_time)
+    same = "ok" if len(path) == len(ref_path) else "LENGTH MISMATCH"
+    print(f"{label:<22} {len(path) - 1:>5} {slow * 1000:>10.1f} {fast * 1000:>9.1f} {slow / max(fast, 1e-9):>7.1f}x "
+          f"{slow_peak / 1e6:>9.2f} {fast_peak / 1e6:>8.2f}  {same}")
+    return slow, fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--max-time", type=int, default=1000)
+    parser.add_argument("--exhaustive-time", type=int, default=150, help="max_time for the walled-in goal")
+    args = parser.parse_args()
+
+    print(f"{'case':<22} {'cost':>5} {'ref ms':>10} {'new ms':>9} {'speedup':>8} {'ref MB':>9} {'new MB':>8}")
+    totals = [0.0, 0.0]
+    for directory in args.dirs:
+        for name, grid_file, robots_file, agents_file in scenarios(directory):
+            grid, starts, goals, reservations = read_input(grid_file, robots_file, agents_file)
+            for robot, (start, goal) in enumerate(zip(starts, goals)):
+                slow, fast = report(f"{name} robot {robot}", grid, start, goal, reservations, args.max_time)
+                totals[0] += slow
+                totals[1] += fast
+    print(f"{'total':<22} {'':>5} {totals[0] * 1000:>10.1f} {totals[1] * 1000:>9.1f} "
+          f"{totals[0] / max(totals[1], 1e-9):>7.1f}x")
+
+    grid, starts, goals, reservations = read_input(*(os.path.join(HERE, "Data", f"{kind}1.txt")
+                                                     for kind in ("data", "Robots", "Agent")))
+    grid = wall_in(grid, *goals[0])
+    report(f"exhaustive t<={args.exhaustive_time}", grid, starts[0], goals[0], reservations, args.exhaustive_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark CBS and ECBS on the bundled Data/ and Data2/ scenarios, reporting
+sum-of-costs, makespan, constraint-tree nodes and runtime per instance.
+
+Usage: python bench_cbs.py [--w 1.0 1.5] [--time-limit 30] [--max-nodes 10000] [DIR ...]
+"""
+import argparse
+
+import cbs
+from loader import DATA_DIRS, scenarios
+from pathfinder import read_input
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--w", type=float, nargs="+", default=[1.0, 1.5], help="suboptimality bounds (1 = CBS)")
+    parser.add_argument("--time-limit", type=float, default=cbs.TIME_LIMIT)
+    parser.add_argument("--max-nodes", type=int, default=cbs.MAX_NODES)
+    args = parser.parse_args()
+
+    print(f"{'instance':<10} {'mode':<10} {'robots':>6} {'status':>7} {'SoC':>6} {'makespan':>8} "
+          f"{'nodes':>6} {'low-level':>9} {'seconds':>8}")
+    for directory in args.dirs:
+        for name, grid_file, robots_file, agents_file in scenarios(directory):
+            grid, starts, goals, reservations = read_input(grid_file, robots_file, agents_file)
+            for w in args.w:
+                result = cbs.solve(grid, starts, goals, reservations, w=w, max_nodes=args.max_nodes,
+                                   time_limit=args.time_limit)
+                mode = "CBS" if w == 1.0 else f"ECBS({w:g})"
+                stats = result.stats
+                print(f"{name:<10} {mode:<10} {len(starts):>6} {result.status:>7} {result.sum_of_costs:>6} "
+                      f"{result.makespan:>8} {stats['nodes_expanded']:>6} {stats['low_level_calls']:>9} "
+                      f"{stats['runtime']:>8.3f}")
+                if result.failed:
+                    print(f"{'':<10} unreachable goals for robots {result.failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Repair cost of incremental replanning (dstar.IncrementalPlanner) against
+planning from scratch. Each bundled scenario is replayed step by step: the
+agents' cells at time t are pushed as an observation, every robot's D* Lite
+search is repaired, and a fresh search from each robot's current cell is
+run for comparison before the robots take their next step. A last case has
+an agent patrolling across a robot's straight route on an open map, so the
+repairs land on the path itself.
+
+Usage: python bench_dstar.py [--steps 200] [DIR ...]
+"""
+import argparse
+import time
+
+from dstar import DStarLite, IncrementalPlanner
+from gridmap import GridMap
+from loader import DATA_DIRS, scenarios
+from pathfinder import read_input
+from reservation import ReservationTable
+
+
+def replay(grid, starts, goals, reservations, steps):
+    """Return (ticks with changes, repair expansions, full expansions, repair seconds, full seconds)."""
+    planner = IncrementalPlanner(grid, starts, goals)
+    ticks = repair = full = 0
+    repair_time = full_time = 0.0
+    for t in range(steps):
+        before = sum(robot.expansions for robot in planner.robots)
+        begin = time.perf_counter()
+        changed = planner.observe(reservations.occupied_at(t))
+        repair_time += time.perf_counter() - begin
+        if changed:
+            ticks += 1
+            repair += sum(robot.expansions for robot in planner.robots) - before
+            for robot in planner.robots:
+                begin = time.perf_counter()
+                fresh = DStarLite(grid, grid.coords(robot.start), grid.coords(robot.goal), planner.occupied)
+                full_time += time.perf_counter() - begin
+                full += fresh.expansions
+                assert fresh.g[fresh.start] == robot.g[robot.start], (t, grid.coords(robot.start))
+        if all(robot.start == robot.goal for robot in planner.robots):
+            break
+        planner.advance()
+    return ticks, repair, full, repair_time, full_time
+
+
+def patrol(size, steps):
+    """
+    Open size x size map; the robot crosses the middle row while an agent
+    walks up and down the middle column. Returns (grid, starts, goals, reservations).
+    """
+    middle = size // 2
+    reach = size // 4
+    schedule = []
+    for t in range(steps):
+        offset = t % (4 * reach)
+        offset = offset if offset < 2 * reach else 4 * reach - offset
+        schedule.append((middle - reach + offset, middle, t))
+    reservations = ReservationTable()
+    reservations.reserve_path(schedule, park=False)
+    grid = GridMap.from_rows(['.' * size] * size)
+    return grid, [(middle, 0)], [(middle, size - 1)], reservations
+
+
+def report(label, robots, ticks, repair, full, repair_time, full_time):
+    print(f"{label:<10} {robots:>6} {ticks:>7} {repair:>10} {full:>10} {full / max(repair, 1):>6.1f}x "
+          f"{repair_time * 1000:>9.1f} {full_time * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--steps", type=int, default=200, help="time steps replayed per scenario")
+    args = parser.parse_args()
+
+    print(f"{'instance':<10} {'robots':>6} {'changes':>7} {'repair exp':>10} {'full exp':>10} {'fewer':>7} "
+          f"{'repair ms':>9} {'full ms':>9}")
+    totals = [0, 0, 0.0, 0.0]
+    for directory in args.dirs:
+        for name, grid_file, robots_file, agents_file in scenarios(directory):
+            grid, starts, goals, reservations = read_input(grid_file, robots_file, agents_file)
+            ticks, *counts = replay(grid, starts, goals, reservations, args.steps)
+            for i, value in enumerate(counts):
+                totals[i] += value
+            report(name, len(starts), ticks, *counts)
+    report("total", "", "", *totals)
+    grid, starts, goals, reservations = patrol(61, args.steps)
+    report("patrol", len(starts), *replay(grid, starts, goals, reservations, args.steps))
+
+
+if __name__ == "__main__":
+    main()
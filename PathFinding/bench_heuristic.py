@@ -0,0 +1,54 @@
+"""
+Node expansions of pathfinder.a_star with the Manhattan heuristic against the
+true-distance tables (one reverse BFS per goal, see GridMap.distances_to) on
+the bundled scenarios. The BFS time is reported separately; later searches
+for the same goal reuse the cached table.
+
+Usage: python bench_heuristic.py [--max-time 1000] [DIR ...]
+"""
+import argparse
+import time
+
+from loader import DATA_DIRS, scenarios
+from pathfinder import SearchStats, a_star, read_input
+
+
+def run(grid, start, goal, reservations, max_time, mode):
+    stats = SearchStats()
+    begin = time.perf_counter()
+    path = a_star(grid, start, goal, reservations, max_time, heuristic_mode=mode, stats=stats)
+    return path, stats, time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--max-time", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'case':<18} {'cost':>5} {'manhattan':>10} {'true':>8} {'ratio':>7} {'ms':>8} {'ms':>7} {'bfs ms':>7}")
+    totals = {"manhattan": 0, "true": 0}
+    for directory in args.dirs:
+        for name, grid_file, robots_file, agents_file in scenarios(directory):
+            grid, starts, goals, reservations = read_input(grid_file, robots_file, agents_file)
+            for robot, (start, goal) in enumerate(zip(starts, goals)):
+                path, manhattan, manhattan_time = run(grid, start, goal, reservations, args.max_time, "manhattan")
+                bfs_time = 0.0
+                if grid.is_open(*goal):
+                    begin = time.perf_counter()
+                    grid.distances_to(*goal)
+                    bfs_time = time.perf_counter() - begin
+                true_path, true, true_time = run(grid, start, goal, reservations, args.max_time, "true")
+                assert len(path) == len(true_path), (name, robot)
+                totals["manhattan"] += manhattan.expansions
+                totals["true"] += true.expansions
+                ratio = f"{manhattan.expansions / true.expansions:.1f}x" if true.expansions else "-"
+                print(f"{name + ' robot ' + str(robot):<18} {len(path) - 1:>5} {manhattan.expansions:>10} "
+                      f"{true.expansions:>8} {ratio:>7} {manhattan_time * 1000:>8.1f} {true_time * 1000:>7.1f} "
+                      f"{bfs_time * 1000:>7.1f}")
+    print(f"total expansions: manhattan={totals['manhattan']} true={totals['true']} "
+          f"({totals['manhattan'] / max(totals['true'], 1):.1f}x fewer)")
+
+
+if __name__ == "__main__":
+    main()
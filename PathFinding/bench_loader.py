@@ -0,0 +1,86 @@
+"""
+Grid loading: loader.read_grid against the original character-by-character
+reader, wall time and peak traced memory, on the bundled maps and on copies of
+one map tiled into larger ones (written to a temporary directory). Maps of
+loader.MMAP_THRESHOLD bytes or more take the memory-mapped path.
+
+Usage: python bench_loader.py [--base Data2/data2.txt] [--scales 2 4] [--legacy-limit 10] [DIR ...]
+"""
+import argparse
+import os
+import tempfile
+
+from bench_astar import measure
+from gridmap import GridMap
+from loader import DATA_DIRS, HERE, MMAP_THRESHOLD, read_grid, scenarios
+
+
+def read_grid_reference(grid_file):
+    """The grid part of the original read_input: rows built one character at a time."""
+    grid = []
+    with open(grid_file, "r") as file:
+        num_rows = int(file.readline())
+        for _ in range(num_rows):
+            grid_row = []
+            line = file.readline()
+            for char in line[:-1]:
+                if char == 'X':
+                    grid_row.append('X')
+                elif char == ' ':
+                    grid_row.append('.')
+            grid.append(grid_row)
+    return GridMap.from_rows(grid)
+
+
+def write_scaled(grid_file, scale, directory):
+    """Tile grid_file scale times in each direction; returns the new file's path."""
+    with open(grid_file) as file:
+        num_rows = int(file.readline())
+        rows = [file.readline().rstrip('\n') for _ in range(num_rows)]
+    width = max(len(row) for row in rows)
+    path = os.path.join(directory, f"scaled{scale}_{os.path.basename(grid_file)}")
+    with open(path, "w") as file:
+        file.write(f"{num_rows * scale}\n")
+        for _ in range(scale):
+            for row in rows:
+                file.write(row.ljust(width) * scale + "\n")
+    return path
+
+
+def report(label, grid_file, legacy_limit):
+    size = os.path.getsize(grid_file)
+    grid, fast, fast_peak = measure(read_grid, grid_file)
+    mode = "mmap" if size >= MMAP_THRESHOLD else "read"
+    if size > legacy_limit:
+        print(f"{label:<22} {grid.rows:>5}x{grid.cols:<6} {size / 1e6:>7.1f} {'-':>9} {fast * 1000:>8.1f} "
+              f"{'-':>8} {'-':>9} {fast_peak / 1e6:>8.1f}  {mode}")
+        return
+    ref, slow, slow_peak = measure(read_grid_reference, grid_file)
+    same = "ok" if (ref.rows, ref.cols, ref.blocked) == (grid.rows, grid.cols, grid.blocked) else "MISMATCH"
+    print(f"{label:<22} {grid.rows:>5}x{grid.cols:<6} {size / 1e6:>7.1f} {slow * 1000:>9.1f} {fast * 1000:>8.1f} "
+          f"{slow / max(fast, 1e-9):>7.1f}x {slow_peak / 1e6:>9.1f} {fast_peak / 1e6:>8.1f}  {mode} {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--base", default=os.path.join(HERE, "Data2", "data2.txt"), help="map to tile")
+    parser.add_argument("--scales", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--legacy-limit", type=float, default=10, help="skip the reference reader above this many MB")
+    args = parser.parse_args()
+    legacy_limit = args.legacy_limit * 1e6
+
+    print(f"{'map':<22} {'size':>12} {'MB':>7} {'ref ms':>9} {'new ms':>8} {'speedup':>8} "
+          f"{'ref peak':>9} {'new peak':>8}")
+    for directory in args.dirs:
+        for name, grid_file, _, _ in scenarios(directory):
+            report(name, grid_file, legacy_limit)
+    with tempfile.TemporaryDirectory() as scratch:
+        for scale in args.scales:
+            path = write_scaled(args.base, scale, scratch)
+            report(f"{os.path.basename(args.base)} x{scale}", path, legacy_limit)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
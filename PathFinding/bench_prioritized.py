@@ -0,0 +1,62 @@
+"""
+Throughput benchmark for prioritized planning: scatters N robots with random
+free starts and goals over one of the bundled maps (keeping its dynamic
+agents) and reports robots planned per second, failures and sum-of-costs.
+
+Usage: python bench_prioritized.py [--map Data/data2.txt] [--agents Data/Agent2.txt]
+                                   [--robots 50 100 200] [--order distance] [--goal-mode vanish]
+                                   [--restarts 0] [--seed 1] [--low-level astar]
+"""
+import argparse
+import os
+import random
+
+import prioritized
+from loader import HERE
+from pathfinder import read_input
+
+
+def random_robots(grid, count, rng, max_distance):
+    """Distinct random free starts, each with a distinct free goal within max_distance (Manhattan)."""
+    free = [(x, y) for x, row in enumerate(grid) for y, cell in enumerate(row) if cell != 'X']
+    free_set = set(free)
+    starts = rng.sample(free, count)
+    goals, used = [], set()
+    for sx, sy in starts:
+        while True:
+            goal = (sx + rng.randint(-max_distance, max_distance), sy + rng.randint(-max_distance, max_distance))
+            if goal in free_set and goal not in used and goal != (sx, sy):
+                break
+        used.add(goal)
+        goals.append(goal)
+    return starts, goals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--map", default=os.path.join(HERE, "Data", "data2.txt"))
+    parser.add_argument("--robots-file", default=os.path.join(HERE, "Data", "Robots2.txt"))
+    parser.add_argument("--agents", default=os.path.join(HERE, "Data", "Agent2.txt"))
+    parser.add_argument("--robots", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--max-distance", type=int, default=30, help="largest start-goal offset per axis")
+    parser.add_argument("--order", choices=prioritized.ORDERS, default="distance")
+    parser.add_argument("--goal-mode", choices=prioritized.GOAL_MODES, default="vanish")
+    parser.add_argument("--restarts", type=int, default=0)
+    parser.add_argument("--low-level", choices=prioritized.LOW_LEVELS, default="astar")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    grid, _, _, reservations = read_input(args.map, args.robots_file, args.agents)
+    print(f"map {grid.rows}x{grid.cols}, order={args.order}, goal mode={args.goal_mode}, low level={args.low_level}")
+    print(f"{'robots':>6} {'failed':>6} {'attempts':>8} {'SoC':>7} {'makespan':>8} {'seconds':>8} {'robots/s':>9}")
+    for count in args.robots:
+        starts, goals = random_robots(grid, count, random.Random(args.seed), args.max_distance)
+        result = prioritized.solve(grid, starts, goals, reservations, order=args.order, restarts=args.restarts,
+                                   goal_mode=args.goal_mode, seed=args.seed, low_level=args.low_level)
+        stats = result.stats
+        print(f"{count:>6} {len(result.failed):>6} {stats['attempts']:>8} {result.sum_of_costs:>7} "
+              f"{result.makespan:>8} {stats['runtime']:>8.2f} {stats['robots_per_sec']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
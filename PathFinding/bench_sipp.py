@@ -0,0 +1,90 @@
+"""
+Compare sipp.sipp with the time-expanded pathfinder.a_star given wait moves
+(allow_wait): arrival time, node expansions and wall time per robot on the
+bundled scenarios, plus a long-horizon case where an agent holds the only
+gap in a wall for --hold steps and the robot has to wait for it, and a
+corridor where the robot's start is held at t = 0 and it has to wait there.
+
+Usage: python bench_sipp.py [--max-time 1000] [--hold 2000] [DIR ...]
+"""
+import argparse
+import time
+
+from gridmap import GridMap
+from loader import DATA_DIRS, scenarios
+from pathfinder import SearchStats, a_star, read_input
+from reservation import ReservationTable
+from sipp import sipp
+
+
+def run(search, *args, **kwargs):
+    stats = SearchStats()
+    start = time.perf_counter()
+    path = search(*args, stats=stats, **kwargs)
+    return path, stats, time.perf_counter() - start
+
+
+def report(label, grid, start, goal, reservations, max_time):
+    path, slow, slow_time = run(a_star, grid, start, goal, reservations, max_time, allow_wait=True)
+    sipp_path, fast, fast_time = run(sipp, grid, start, goal, reservations, max_time)
+    same = "ok" if len(path) == len(sipp_path) else "ARRIVAL MISMATCH"
+    ratio = f"{slow.expansions / fast.expansions:.1f}x" if fast.expansions else "-"
+    print(f"{label:<22} {len(sipp_path) - 1:>6} {slow.expansions:>9} {fast.expansions:>7} {ratio:>8} "
+          f"{slow_time * 1000:>9.1f} {fast_time * 1000:>8.1f}  {same}")
+    return slow.expansions, fast.expansions
+
+
+def gated_wall(size, hold):
+    """
+    An open size x size map cut in half by a wall with one gap, which an
+    agent occupies from t = 0 to hold. Returns (grid, start, goal, reservations).
+    """
+    middle = size // 2
+    rows = [['.'] * size for _ in range(size)]
+    for x in range(size):
+        rows[x][middle] = 'X'
+    rows[middle][middle] = '.'
+    reservations = ReservationTable()
+    reservations.reserve_path([(middle, middle, t) for t in range(hold + 1)], park=False)
+    return GridMap.from_rows(rows), (middle, 0), (middle, size - 1), reservations
+
+
+def start_held(length):
+    """
+    A one-row corridor of length cells. An agent leaves the robot's start
+    cell at t = 0 and blocks the next cell at t = 1 and 2, so the robot has
+    to wait on its start. Returns (grid, start, goal, reservations).
+    """
+    reservations = ReservationTable()
+    reservations.reserve_path([(0, 0, 0)], park=False)
+    reservations.reserve_path([(0, 1, 1), (0, 1, 2)], park=False)
+    return GridMap.from_rows(['.' * length]), (0, 0), (0, length - 1), reservations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dirs", nargs="*", default=DATA_DIRS)
+    parser.add_argument("--max-time", type=int, default=1000)
+    parser.add_argument("--hold", type=int, default=2000, help="steps the agent blocks the gap in the long-horizon case")
+    parser.add_argument("--size", type=int, default=21, help="side of the long-horizon map")
+    args = parser.parse_args()
+
+    print(f"{'case':<22} {'arrive':>6} {'A* wait':>9} {'SIPP':>7} {'fewer':>8} {'A* ms':>9} {'SIPP ms':>8}")
+    totals = [0, 0]
+    for directory in args.dirs:
+        for name, grid_file, robots_file, agents_file in scenarios(directory):
+            grid, starts, goals, reservations = read_input(grid_file, robots_file, agents_file)
+            for robot, (start, goal) in enumerate(zip(starts, goals)):
+                slow, fast = report(f"{name} robot {robot}", grid, start, goal, reservations, args.max_time)
+                totals[0] += slow
+                totals[1] += fast
+    print(f"{'total expansions':<22} {'':>6} {totals[0]:>9} {totals[1]:>7} {totals[0] / max(totals[1], 1):>7.1f}x")
+
+    grid, start, goal, reservations = gated_wall(args.size, args.hold)
+    report(f"gate held t<={args.hold}", grid, start, goal, reservations, args.hold + 2 * args.size)
+    grid, start, goal, reservations = start_held(args.size)
+    report("start held at t=0", grid, start, goal, reservations, 4 * args.size)
+
+
+if __name__ == "__main__":
+    main()
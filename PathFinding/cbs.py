@@ -0,0 +1,270 @@
+"""
+Conflict-Based Search (CBS) for the robots, with a bounded-suboptimal ECBS mode.
+
+The high level searches a constraint tree: each node holds one path per robot
+and the constraints that produced them. The cheapest node with conflicts is
+split on its earliest conflict into two children, each forbidding the cell (or
+swap move) to one of the two robots, and only that robot is replanned. The
+node's conflict list is carried over from its parent, and only the pairs
+involving the replanned robot are checked again.
+
+With w > 1 both levels become focal searches (ECBS): among the nodes whose
+cost is within w times the best lower bound, the one with the fewest conflicts
+is expanded. The solution costs at most w times the optimum. Robots leave the
+grid when they reach their goal, as the single-robot planner assumes.
+"""
+import heapq
+import itertools
+import time
+
+import pathfinder
+from result import FAILED, Result, path_cost
+
+# Per-instance budget: constraint tree nodes expanded and wall-clock seconds.
+MAX_NODES = 10000
+TIME_LIMIT = 30.0
+
+
+class FocalQueue:
+    """
+    Open list with a focal sublist. Entries whose cost is within w times the
+    smallest lower bound in the queue are popped in focal-key order. With
+    w = 1 and cost == lower bound this is an ordinary best-first queue with
+    the focal key as tie-breaker.
+    """
+
+    def __init__(self, w):
+        self.w = w
+        self.lower = []     # (lower bound, id); lazily cleaned.
+        self.waiting = []   # (cost, focal key, id) not yet in focal.
+        self.focal = []     # (focal key, id).
+        self.items = {}     # id -> item, until popped.
+        self.ids = itertools.count()
+
+    def __len__(self):
+        return len(self.items)
+
+    def push(self, item, lower, cost, focal_key):
+        i = next(self.ids)
+        self.items[i] = item
+        heapq.heappush(self.lower, (lower, i))
+        heapq.heappush(self.waiting, (cost, focal_key, i))
+
+    def min_lower(self):
+        while self.lower and self.lower[0][1] not in self.items:
+            heapq.heappop(self.lower)
+        return self.lower[0][0] if self.lower else None
+
+    def pop(self):
+        """Remove and return the best focal item, or None when empty."""
+        lower = self.min_lower()
+        if lower is None:
+            return None
+        bound = self.w * lower
+        while self.waiting and (self.waiting[0][0] <= bound or not self.focal):
+            _, focal_key, i = heapq.heappop(self.waiting)
+            heapq.heappush(self.focal, (focal_key, i))
+        _, i = heapq.heappop(self.focal)
+        return self.items.pop(i)
+
+
+def path_conflicts(a, path_a, b, path_b):
+    """
+    Vertex and swap conflicts between two robots' paths as
+    (t, kind, a, b, location). Shared start cells at t = 0 cannot be
+    resolved by constraints and are not reported.
+    """
+    found = []
+    if path_a[0][0] == -1 or path_b[0][0] == -1:
+        return found
+    n = min(len(path_a), len(path_b))
+    for t in range(1, n):
+        if path_a[t][:2] == path_b[t][:2]:
+            found.append((t, 'vertex', a, b, path_a[t][:2]))
+    for t in range(n - 1):
+        if path_a[t][:2] == path_b[t + 1][:2] and path_a[t + 1][:2] == path_b[t][:2]:
+            found.append((t, 'edge', a, b, path_a[t][:2] + path_a[t + 1][:2]))
+    return found
+
+
+def occupancy(paths, skip):
+    """Count the cells and moves of every path except paths[skip]."""
+    cells, moves = {}, {}
+    for robot, path in enumerate(paths):
+        if robot == skip or path[0][0] == -1:
+            continue
+        for x, y, t in path:
+            cells[(x, y, t)] = cells.get((x, y, t), 0) + 1
+        for (x, y, t), (nx, ny, _) in zip(path, path[1:]):
+            moves[(x, y, nx, ny, t)] = moves.get((x, y, nx, ny, t), 0) + 1
+    return cells, moves
+
+
+def focal_a_star(grid, start, goal, reservations, constraints, paths, robot, w, max_time=1000,
+                 heuristic_mode='manhattan', stats=None):
+    """
+    ECBS low level: A* over (x, y, t) where, among states with f within w of
+    the smallest f, the one whose partial path conflicts least with the other
+    robots' paths is expanded. Returns (path, lower bound on the optimal cost).
+    """
+    if stats is not None:
+        stats.calls += 1
+    if not pathfinder.is_open_cell(grid, goal):
+        return FAILED, 0
+    if heuristic_mode == 'true':
+        distances = grid.distances_to(*goal)
+
+        def heuristic(cell, goal):
+            # Off-map table entries are blocked cells, where only a robot's start can be.
+            index = grid.index(*cell)
+            return pathfinder.heuristic(cell, goal) if grid.blocked[index] else distances[index]
+    else:
+        heuristic = pathfinder.heuristic
+    cells, moves = occupancy(paths, robot)
+    root = (start[0], start[1], 0)
+    came_from = {}
+    conflicts = {root: 0}
+    closed = set()
+    queue = FocalQueue(w)
+    f = heuristic(start, goal)
+    if f < 0:
+        return FAILED, 0
+    queue.push(root, f, f, (0, f))
+    lower = f
+    while len(queue):
+        lower = max(lower, queue.min_lower())
+        state = queue.pop()
+        if state in closed:
+            if stats is not None:
+                stats.duplicate_pops += 1
+            continue
+        closed.add(state)
+        x, y, t = state
+        if stats is not None:
+            stats.expansions += 1
+            if stats.detailed:
+                stats.expanded(t + heuristic((x, y), goal), x, y, t, len(queue) + 1)
+        if (x, y) == goal:
+            path = [state]
+            while path[-1] in came_from:
+                path.append(came_from[path[-1]])
+            return path[::-1], lower
+        if t >= max_time:
+            continue
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nx, ny, nt = x + dx, y + dy, t + 1
+            if not grid.is_open(nx, ny):
+                continue
+            if not reservations.can_move(x, y, nx, ny, t):
+                continue
+            if constraints and ((nx, ny, nt) in constraints or (x, y, nx, ny, t) in constraints):
+                continue
+            h = heuristic((nx, ny), goal)
+            if h < 0:
+                continue
+            child = (nx, ny, nt)
+            # g == t because every move takes one step, so a state has one cost
+            # and only its conflict count can improve.
+            count = conflicts[state] + cells.get(child, 0) + moves.get((nx, ny, x, y, t), 0)
+            if child in closed or count >= conflicts.get(child, count + 1):
+                continue
+            conflicts[child] = count
+            came_from[child] = state
+            f = nt + h
+            queue.push(child, f, f, (count, f, -nt))
+            if stats is not None:
+                stats.pushes += 1
+    return FAILED, lower
+
+
+class Node:
+    """Constraint tree node."""
+    __slots__ = ('constraints', 'paths', 'lowers', 'cost', 'lower', 'conflicts')
+
+    def __init__(self, constraints, paths, lowers, conflicts):
+        self.constraints = constraints      # One frozenset per robot.
+        self.paths = paths
+        self.lowers = lowers                # Per-robot lower bounds (== cost for CBS).
+        self.cost = sum(path_cost(path) for path in paths)
+        self.lower = sum(lowers)
+        self.conflicts = conflicts
+
+
+def solve(grid, starts, goals, reservations, w=1.0, max_nodes=MAX_NODES, time_limit=TIME_LIMIT, max_time=1000,
+          heuristic_mode='manhattan', search_stats=None):
+    """
+    Plan collision-free paths for all robots. w = 1 is optimal CBS on top of
+    pathfinder.a_star; w > 1 is ECBS. heuristic_mode is passed to the low
+    level (see pathfinder.HEURISTICS), and a pathfinder.SearchStats given as
+    search_stats sums the low-level node counts. Robots whose goal is
+    unreachable keep the failed path [(-1, -1, 0)] and are ignored by the
+    others. As in prioritized.solve, the status is 'failed' when a robot
+    whose goal is a free cell has no path, or when every branch of the
+    constraint tree was pruned. When the budget runs out, the expanded node
+    with the fewest conflicts is returned with status 'budget'.
+    """
+    start_time = time.perf_counter()
+    stats = {"nodes_expanded": 0, "nodes_generated": 1, "low_level_calls": 0}
+
+    def plan(robot, constraints, paths):
+        stats["low_level_calls"] += 1
+        if w == 1.0:
+            path = pathfinder.a_star(grid, starts[robot], goals[robot], reservations, max_time, constraints,
+                                     heuristic_mode=heuristic_mode, stats=search_stats)
+            return path, path_cost(path)
+        return focal_a_star(grid, starts[robot], goals[robot], reservations, constraints, paths, robot, w,
+                            max_time, heuristic_mode, search_stats)
+
+    robots = range(len(starts))
+    paths, lowers = [], []
+    for robot in robots:
+        path, lower = plan(robot, frozenset(), paths + [FAILED] * (len(starts) - len(paths)))
+        paths.append(path)
+        lowers.append(lower)
+    conflicts = [c for a in robots for b in range(a + 1, len(starts))
+                 for c in path_conflicts(a, paths[a], b, paths[b])]
+    root = Node((frozenset(),) * len(starts), paths, lowers, conflicts)
+
+    queue = FocalQueue(w)
+    queue.push(root, root.lower, root.cost, (len(root.conflicts), root.cost, 0))
+    best = root
+    unreachable = sum(1 for goal in goals if not pathfinder.is_open_cell(grid, goal))
+    status = 'failed'
+    while len(queue):
+        if stats["nodes_expanded"] >= max_nodes or time.perf_counter() - start_time > time_limit:
+            status = 'budget'
+            break
+        node = queue.pop()
+        stats["nodes_expanded"] += 1
+        if len(node.conflicts) < len(best.conflicts):
+            best = node
+        if not node.conflicts:
+            unplanned = sum(1 for path in node.paths if path[0][0] == -1) - unreachable
+            status = 'failed' if unplanned else 'solved'
+            break
+        t, kind, a, b, location = min(node.conflicts)
+        if kind == 'vertex':
+            splits = ((a, location + (t,)), (b, location + (t,)))
+        else:
+            x, y, nx, ny = location
+            splits = ((a, (x, y, nx, ny, t)), (b, (nx, ny, x, y, t)))
+        for robot, constraint in splits:
+            constraints = list(node.constraints)
+            constraints[robot] = constraints[robot] | {constraint}
+            path, lower = plan(robot, constraints[robot], node.paths)
+            if path[0][0] == -1:
+                continue  # This robot cannot honour the constraint; prune the branch.
+            paths = list(node.paths)
+            paths[robot] = path
+            lowers = list(node.lowers)
+            lowers[robot] = lower
+            conflicts = [c for c in node.conflicts if robot not in (c[2], c[3])]
+            for other in robots:
+                if other != robot:
+                    conflicts.extend(path_conflicts(robot, path, other, paths[other]))
+            child = Node(tuple(constraints), paths, lowers, conflicts)
+            stats["nodes_generated"] += 1
+            queue.push(child, child.lower, child.cost, (len(child.conflicts), child.cost, stats["nodes_generated"]))
+
+    stats["runtime"] = round(time.perf_counter() - start_time, 4)
+    return Result(best.paths, status, len(best.conflicts), stats)
@@ -0,0 +1,186 @@
+"""
+Incremental replanning with D* Lite on the static grid.
+
+A D* Lite search runs backwards from the robot's goal and keeps, per cell,
+its distance estimate g and the one-step lookahead rhs. When cells become
+blocked or free, only the cells whose rhs changes are put back on the queue,
+so a repair touches the part of the map the change affects instead of
+searching again from scratch. As the robot moves the queue keys stay valid
+through the km offset, so the search state lives for the robot's whole run.
+
+Dynamic agents are treated as obstacles on the cells they are observed on
+(there is no time dimension here). IncrementalPlanner keeps one search per
+robot; push each new set of agent positions with observe() and read the
+repaired paths back with paths().
+"""
+import heapq
+from array import array
+
+FAILED = [(-1, -1, 0)]
+
+# Distance of a cell that cannot reach the goal.
+INF = 1 << 30
+
+
+class DStarLite:
+    """
+    Search state for one robot on a GridMap. occupied is a bytearray over
+    the packed cells, 1 where an agent is observed; it may be shared between
+    robots, and every change to it must be reported with cells_changed().
+    """
+
+    def __init__(self, grid, start, goal, occupied):
+        self.grid = grid
+        self.occupied = occupied
+        self.start = grid.index(*start)
+        self.goal = grid.index(*goal)
+        self.steps = (1, grid.stride, -1, -grid.stride)
+        self.g = array('i', [INF]) * grid.size
+        self.rhs = array('i', [INF]) * grid.size
+        self.km = 0
+        self.queue = []       # (k1, k2, cell); stale entries are skipped on pop.
+        self.queued = {}      # cell -> its current key.
+        self.expansions = 0
+        if grid.is_open(*goal):
+            self.rhs[self.goal] = 0
+            self.push(self.goal)
+        self.compute()
+
+    def h(self, cell):
+        """Manhattan distance from the robot's current cell to cell."""
+        x, y = divmod(cell, self.grid.stride)
+        sx, sy = divmod(self.start, self.grid.stride)
+        return abs(x - sx) + abs(y - sy)
+
+    def key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self.h(cell) + self.km, best)
+
+    def push(self, cell):
+        key = self.key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key[0], key[1], cell))
+
+    def passable(self, cell):
+        return not self.grid.blocked[cell] and not self.occupied[cell]
+
+    def update(self, cell):
+        """Recompute rhs of cell from its neighbours and requeue it if inconsistent."""
+        # A robot may start on an obstacle; no other obstacle cell needs a value.
+        if self.grid.blocked[cell] and cell != self.start:
+            return
+        if cell != self.goal:
+            g = self.g
+            best = INF
+            for step in self.steps:
+                ncell = cell + step
+                if g[ncell] < best and self.passable(ncell):
+                    best = g[ncell]
+            self.rhs[cell] = best + 1 if best < INF else INF
+        if self.g[cell] != self.rhs[cell]:
+            self.push(cell)
+        else:
+            self.queued.pop(cell, None)
+
+    def compute(self):
+        """Expand inconsistent cells until the start's distance is settled."""
+        g, rhs, queue, queued = self.g, self.rhs, self.queue, self.queued
+        start = self.start
+        while queue:
+            k1, k2, cell = queue[0]
+            if queued.get(cell) != (k1, k2):
+                heapq.heappop(queue)
+                continue
+            if (k1, k2) >= self.key(start) and rhs[start] == g[start]:
+                break
+            heapq.heappop(queue)
+            new_key = self.key(cell)
+            if (k1, k2) < new_key:
+                queued[cell] = new_key
+                heapq.heappush(queue, (new_key[0], new_key[1], cell))
+                continue
+            del queued[cell]
+            self.expansions += 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self.update(cell)
+            for step in self.steps:
+                self.update(cell + step)
+
+    def move_to(self, x, y):
+        """The robot is now on (x, y); keys computed so far stay comparable."""
+        cell = self.grid.index(x, y)
+        self.km += self.h(cell)
+        self.start = cell
+
+    def cells_changed(self, cells):
+        """Repair after the given packed cells were blocked or freed in occupied."""
+        for cell in cells:
+            for step in self.steps:
+                self.update(cell + step)
+        self.compute()
+
+    def successor(self, cell):
+        """The passable neighbour of cell closest to the goal, or None."""
+        best, best_cell = INF, None
+        for step in self.steps:
+            ncell = cell + step
+            if self.g[ncell] < best and self.passable(ncell):
+                best, best_cell = self.g[ncell], ncell
+        return best_cell
+
+    def path(self, t=0):
+        """Current shortest path as [(x, y, t), ...] from time t, or FAILED."""
+        if self.g[self.start] >= INF:
+            return FAILED
+        cell = self.start
+        path = [self.grid.coords(cell) + (t,)]
+        while cell != self.goal:
+            cell = self.successor(cell)
+            if cell is None:
+                return FAILED
+            t += 1
+            path.append(self.grid.coords(cell) + (t,))
+        return path
+
+
+class IncrementalPlanner:
+    """One D* Lite search per robot over a shared map of observed agent cells."""
+
+    def __init__(self, grid, starts, goals):
+        self.grid = grid
+        self.time = 0
+        self.occupied = bytearray(grid.size)
+        self.observed = set()     # Packed cells agents were last seen on.
+        self.robots = [DStarLite(grid, start, goal, self.occupied) for start, goal in zip(starts, goals)]
+
+    def observe(self, agent_cells):
+        """
+        Replace the observed agent positions with agent_cells, (x, y) pairs,
+        and repair every robot's search. Returns the cells that changed.
+        """
+        grid = self.grid
+        cells = {grid.index(x, y) for x, y in agent_cells if 0 <= x < grid.rows and 0 <= y < grid.cols}
+        changed = cells ^ self.observed
+        for cell in changed:
+            self.occupied[cell] = cell in cells
+        self.observed = cells
+        if changed:
+            for robot in self.robots:
+                robot.cells_changed(changed)
+        return changed
+
+    def advance(self):
+        """Move every robot that has a path one step along it and advance the clock."""
+        self.time += 1
+        for robot in self.robots:
+            if robot.start != robot.goal and robot.g[robot.start] < INF:
+                cell = robot.successor(robot.start)
+                if cell is not None:
+                    robot.move_to(*self.grid.coords(cell))
+
+    def paths(self):
+        """Each robot's current path from the present time step."""
+        return [robot.path(self.time) for robot in self.robots]
@@ -0,0 +1,116 @@
+"""
+Packed obstacle map for the planners.
+
+Cells live in one bytearray (1 = obstacle) surrounded by a border of blocked
+cells, so a neighbour is cell +-1 or +-stride and needs no bounds check. A
+cell's integer index is (x + 1) * stride + (y + 1); A* states add a time
+layer on top of it. The map also owns scratch arrays that searches reuse
+between calls, invalidated by bumping a generation counter instead of being
+cleared. distances_to() gives exact obstacle-aware distances to a goal,
+cached per goal cell for use as an A* heuristic.
+"""
+from array import array
+from collections import OrderedDict, deque
+
+# Goal distance tables kept per map (least recently used are dropped first).
+DISTANCE_CACHE_SIZE = 64
+
+
+class GridMap:
+    def __init__(self, rows, cols, blocked):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.size = (rows + 2) * self.stride
+        self.blocked = blocked          # bytearray of self.size, border included.
+        # Search scratch: per cell the generation that last touched it and a
+        # bitset of the time steps already generated there. Allocated by the
+        # first new_search(), so loading a map that is never searched stays cheap.
+        self.stamp = None
+        self.seen = None
+        self.generation = 0
+        self.distance_tables = OrderedDict()   # goal cell -> array of distances.
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from rows of cells where 'X' marks an obstacle; short rows are padded with free cells."""
+        rows = [''.join(row) for row in rows]
+        cols = max((len(row) for row in rows), default=0)
+        stride = cols + 2
+        blocked = bytearray(b'\x01' * stride)
+        for row in rows:
+            cells = row.encode('latin-1').translate(OBSTACLE_BYTES)
+            blocked += b'\x01' + cells + bytes(cols - len(cells)) + b'\x01'
+        blocked += b'\x01' * stride
+        return cls(len(rows), cols, blocked)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, x):
+        """Row x as a string of 'X' and '.', for code that still indexes grid[x][y]."""
+        if not 0 <= x < self.rows:
+            raise IndexError(x)
+        start = (x + 1) * self.stride + 1
+        return self.blocked[start:start + self.cols].translate(ROW_CHARS).decode()
+
+    def __iter__(self):
+        for x in range(self.rows):
+            yield self[x]
+
+    def index(self, x, y):
+        return (x + 1) * self.stride + y + 1
+
+    def coords(self, cell):
+        x, y = divmod(cell, self.stride)
+        return x - 1, y - 1
+
+    def is_open(self, x, y):
+        """True if (x, y) is on the map and not an obstacle."""
+        return 0 <= x < self.rows and 0 <= y < self.cols and not self.blocked[(x + 1) * self.stride + y + 1]
+
+    def distances_to(self, x, y):
+        """
+        array('i') over the packed cells with the shortest move count from
+        each cell to (x, y) around static obstacles, -1 where (x, y) cannot
+        be reached. One reverse BFS per goal, cached for replans and for
+        robots that share the goal.
+        """
+        goal = self.index(x, y)
+        table = self.distance_tables.get(goal)
+        if table is not None:
+            self.distance_tables.move_to_end(goal)
+            return table
+        table = array('i', [-1]) * self.size
+        blocked = self.blocked
+        steps = (1, self.stride, -1, -self.stride)
+        table[goal] = 0
+        queue = deque([goal])
+        while queue:
+            cell = queue.popleft()
+            distance = table[cell] + 1
+            for step in steps:
+                ncell = cell + step
+                if not blocked[ncell] and table[ncell] < 0:
+                    table[ncell] = distance
+                    queue.append(ncell)
+        self.distance_tables[goal] = table
+        if len(self.distance_tables) > DISTANCE_CACHE_SIZE:
+            self.distance_tables.popitem(last=False)
+        return table
+
+    def new_search(self):
+        """Start a search: every scratch entry from earlier searches becomes stale."""
+        if self.stamp is None:
+            self.stamp = array('I', bytes(4 * self.size))
+            self.seen = [0] * self.size
+        self.generation += 1
+        if self.generation == 1 << 32:
+            self.stamp = array('I', bytes(4 * self.size))
+            self.generation = 1
+        return self.generation
+
+
+ROW_CHARS = bytes.maketrans(b'\x00\x01', b'.X')
+# Byte translation table: 'X' -> 1, anything else -> 0.
+OBSTACLE_BYTES = bytes(1 if byte == ord('X') else 0 for byte in range(256))
@@ -0,0 +1,110 @@
+"""
+Loading of PathFinding test cases (data*.txt, Robots*.txt, Agent*.txt).
+
+A grid file is a row count followed by one line per row, where 'X' is an
+obstacle and any other character a free cell. It is read in bulk and each
+row is translated straight into the packed GridMap bytes, with no
+per-character Python work; files of MMAP_THRESHOLD bytes or more are
+memory-mapped instead of read into memory. Robot and agent files are parsed
+line by line as they stream in.
+"""
+import mmap
+import os
+import re
+
+from gridmap import OBSTACLE_BYTES, GridMap
+from reservation import ReservationTable
+
+# Grid files at least this large are memory-mapped rather than read whole.
+MMAP_THRESHOLD = 16 << 20
+
+ROBOT_LINE = re.compile(rb'\d+')
+GRID_NAME = re.compile(r'data(\d+)\.txt$')
+
+# The bundled test-case directories, which the benchmarks and profilers default to.
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIRS = [os.path.join(HERE, "Data"), os.path.join(HERE, "Data2")]
+
+
+class Problem:
+    """One test case: the map, each robot's start and goal, and the agents' reservations."""
+
+    def __init__(self, grid, starts, goals, reservations, name=None):
+        self.grid = grid
+        self.starts = starts
+        self.goals = goals
+        self.reservations = reservations
+        self.name = name
+
+    def __repr__(self):
+        return (f"Problem({self.name!r}, {self.grid.rows}x{self.grid.cols}, {len(self.starts)} robots, "
+                f"{len(self.reservations.cells)} agent cells)")
+
+
+def read_grid(grid_file):
+    """Load a grid file into a GridMap; short or missing rows are padded with free cells."""
+    with open(grid_file, 'rb') as file:
+        num_rows = int(file.readline())
+        body_start = file.tell()
+        if os.fstat(file.fileno()).st_size - body_start >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return pack_rows(data, body_start, num_rows)
+        return pack_rows(file.read(), 0, num_rows)
+
+
+def pack_rows(data, pos, num_rows):
+    """GridMap from num_rows newline-terminated rows of data (bytes or mmap) starting at pos."""
+    spans = []
+    for _ in range(num_rows):
+        end = data.find(b'\n', pos)
+        if end < 0:
+            end = len(data)
+        line_end = end - 1 if end > pos and data[end - 1] == 13 else end   # Drop a '\r'.
+        spans.append((pos, line_end))
+        pos = min(end + 1, len(data))
+    cols = max((end - start for start, end in spans), default=0)
+    stride = cols + 2
+    blocked = bytearray(b'\x01') * ((num_rows + 2) * stride)
+    row_start = stride + 1
+    for start, end in spans:
+        width = end - start
+        blocked[row_start:row_start + width] = data[start:end].translate(OBSTACLE_BYTES)
+        blocked[row_start + width:row_start + cols] = bytes(cols - width)
+        row_start += stride
+    return GridMap(num_rows, cols, blocked)
+
+
+def read_robots(robots_file):
+    """Yield (start, goal) per robot line, e.g. 'Robot 1: Start (8, 46) End (41, 5)'."""
+    with open(robots_file, 'rb') as file:
+        for line in file:
+            numbers = ROBOT_LINE.findall(line)
+            if len(numbers) >= 5:
+                start_x, start_y, goal_x, goal_y = map(int, numbers[1:5])
+                yield (start_x, start_y), (goal_x, goal_y)
+
+
+def load_problem(grid_file, robots_file, agents_file, name=None):
+    """Read one test case into a Problem."""
+    grid = read_grid(grid_file)
+    starts, goals = [], []
+    for start, goal in read_robots(robots_file):
+        starts.append(start)
+        goals.append(goal)
+    reservations = ReservationTable.from_agents_file(agents_file)
+    return Problem(grid, starts, goals, reservations, name)
+
+
+def load_scenario(directory, num):
+    """Problem for data{num}.txt, Robots{num}.txt and Agent{num}.txt in directory."""
+    files = [os.path.join(directory, f"{kind}{num}.txt") for kind in ("data", "Robots", "Agent")]
+    return load_problem(*files, name=f"{os.path.basename(os.path.normpath(directory))}/{num}")
+
+
+def scenarios(directory):
+    """Yield (name, grid, robots, agents) paths for every complete, non-empty data/Robots/Agent triple."""
+    numbers = sorted(int(m.group(1)) for m in map(GRID_NAME.match, os.listdir(directory)) if m)
+    for num in numbers:
+        files = [os.path.join(directory, f"{kind}{num}.txt") for kind in ("data", "Robots", "Agent")]
+        if all(os.path.exists(path) for path in files) and os.path.getsize(files[0]) and os.path.getsize(files[1]):
+            yield (f"{os.path.basename(os.path.normpath(directory))}/{num}", *files)
@@ -2,89 +2,223 @@
 # 22i-0781
 # AI assignment 1
 
-import re
 import heapq
-from collections import defaultdict
+import time
+from array import array
 
-# Global variables
-starts = []
-goals = []
-num_robots = 0
-num_agents = 0
-dynamic_agents = []
-agents_times = []
+import cbs
+import prioritized
+from loader import load_problem, load_scenario
 
-robots_curr_pos = []
-curr_time = 0
-time_dict = {}
-
-grid = []
 
 def read_input(grid_file, robots_file, agents_file):
-    global grid, starts, goals, num_robots, num_agents, dynamic_agents, agents_times
-
-    # Read grid
-    with open(grid_file, "r") as file:
-        # num_rows = int(file.readline())
-        # grid = [file.readline()[:-1] for _ in range(num_rows)]
-        num_rows = int(file.readline())
-        # grid = [[char for char in file.readline()[:-1]] for _ in range(num_rows)]
-        for _ in range(num_rows):
-            grid_row = []
-            line = file.readline()
-            for char in line[:-1]:
-                if char == 'X':
-                    grid_row.append('X')
-                elif char == ' ':
-                    grid_row.append('.')
-            grid.append(grid_row) 
-
-    # Read robots
-    with open(robots_file, "r") as file:
-        lines = file.readlines()
-        num_robots = len(lines)
-        for line in lines:
-            positions = re.findall(r'\d+', line)
-            if positions:
-                start_x, start_y = int(positions[1]), int(positions[2])
-                goal_x, goal_y = int(positions[3]), int(positions[4])
-                starts.append((start_x, start_y))
-                goals.append((goal_x, goal_y))
-
-    # Read agents
-    with open(agents_file, "r") as file:
-        lines = file.readlines()
-        num_agents = len(lines)
-        for line in lines:
-            coord_matches = re.findall(r'\((\d+), (\d+)\)', line)
-            time_matches = re.findall(r'\d+', line.split("at times")[-1])
-            if coord_matches and time_matches:
-                dynamic_agents.append([[int(x), int(y)] for x, y in coord_matches])
-                agents_times.append([int(t) for t in time_matches])
-
-
-    # Store the locations of dynamic agents at their times in the time_dict dictionary
-    for i in range(len(dynamic_agents)):  # Use len(dynamic_agents) instead of num_agents
-        for time, loc in zip(agents_times[i], dynamic_agents[i]):
-            if time not in time_dict:
-                time_dict[time] = []
-            time_dict[time].append(loc)
+    """Return (grid, starts, goals, reservations) for one test case; grid is a GridMap (see loader.py)."""
+    problem = load_problem(grid_file, robots_file, agents_file)
+    return problem.grid, problem.starts, problem.goals, problem.reservations
+
+
+# 'manhattan' ignores obstacles; 'true' uses the exact BFS distance to the goal around them.
+HEURISTICS = ('manhattan', 'true')
+
+
+class SearchStats:
+    """
+    Node counters for the single-robot searches (a_star, sipp.sipp,
+    cbs.focal_a_star); pass one in to have them filled. The searches only
+    test for it once per expansion and per push, so leaving stats=None
+    costs nothing.
+
+    With detailed the searches also keep the peak open-list size, a
+    histogram of the f-values expanded, the number and time of reservation
+    checks (the work is_cell_safe does), and, with trace, every expanded
+    (x, y, t) state for heatmap().
+    """
+
+    def __init__(self, detailed=False, trace=False):
+        self.calls = 0
+        self.expansions = 0
+        self.pushes = 0
+        self.duplicate_pops = 0     # Popped states that were already expanded or superseded.
+        self.detailed = detailed or trace
+        self.peak_open = 0
+        self.f_values = {}          # f -> expansions with that f.
+        self.safety_checks = 0
+        self.safety_time = 0.0
+        self.trace = [] if trace else None
+
+    def expanded(self, f, x, y, t, open_size):
+        """Record one expansion in detail; open_size counts the popped state."""
+        self.f_values[f] = self.f_values.get(f, 0) + 1
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+        if self.trace is not None:
+            self.trace.append((x, y, t))
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.expansions += other.expansions
+        self.pushes += other.pushes
+        self.duplicate_pops += other.duplicate_pops
+        self.peak_open = max(self.peak_open, other.peak_open)
+        for f, count in other.f_values.items():
+            self.f_values[f] = self.f_values.get(f, 0) + count
+        self.safety_checks += other.safety_checks
+        self.safety_time += other.safety_time
+        if self.trace is not None and other.trace is not None:
+            self.trace.extend(other.trace)
+
+    def summary(self):
+        return {"calls": self.calls, "expansions": self.expansions, "pushes": self.pushes,
+                "duplicate_pops": self.duplicate_pops, "peak_open": self.peak_open,
+                "safety_checks": self.safety_checks, "safety_time": round(self.safety_time, 6)}
+
+    def heatmap(self, rows, cols):
+        """Expansions per cell from the trace, as rows lists of cols counts."""
+        counts = [[0] * cols for _ in range(rows)]
+        for x, y, _ in self.trace or ():
+            if 0 <= x < rows and 0 <= y < cols:
+                counts[x][y] += 1
+        return counts
 
 
 def heuristic(a, b):
     """Calculate the Manhattan distance between two points."""
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def is_cell_safe(x, y, t, dynamic_agents):
+def is_open_cell(grid, cell):
+    """True if cell lies on the grid and is not an obstacle."""
+    return grid.is_open(*cell)
+
+def is_cell_safe(x, y, t, reservations):
     """Check if the cell (x, y) is safe at time t (not occupied by any dynamic agent)."""
-    if t in time_dict and [x, y] in time_dict[t]:
-        return False
-    return True
+    return reservations.is_free(x, y, t)
+
+def a_star(grid, start, goal, reservations, max_time=1000, constraints=None, stay_at_goal=False,
+           heuristic_mode='manhattan', stats=None, allow_wait=False):
+    """
+    A* algorithm with dynamic agents (avoiding their cells and swapping places with them).
+    Runs on a GridMap with integer states: g == t because every move takes one
+    step, so the search only has to remember which (cell, t) states it has
+    generated (a per-cell bitset of times in the map's reusable scratch) and
+    each state's parent (flat arrays indexed by node id). Ties on f go to the
+    deeper state.
+    constraints is an optional set of (x, y, t) cells and (x, y, nx, ny, t)
+    moves this robot may not use, as imposed by the CBS planner. With
+    stay_at_goal the robot only arrives once nothing else is reserved on the
+    goal afterwards, so it can remain there.
+    With heuristic_mode 'true' the heuristic is the goal's cached distance
+    table (GridMap.distances_to): states that cannot reach the goal are never
+    pushed, and an unreachable goal fails without searching.
+    allow_wait adds a wait move, staying on the cell for one step; robots
+    normally have to move every step. It gives the time-expanded baseline
+    for the SIPP planner (sipp.py).
+    """
+    if stats is not None:
+        stats.calls += 1
+    if not is_open_cell(grid, goal):
+        return [(-1, -1, 0)]
+    if heuristic_mode not in HEURISTICS:
+        raise ValueError(f"unknown heuristic mode {heuristic_mode!r}; expected one of {HEURISTICS}")
+    distances = grid.distances_to(*goal) if heuristic_mode == 'true' else None
+    stride = grid.stride
+    blocked = grid.blocked
+    reserved = reservations.cell_mask(grid)
+    generation = grid.new_search()
+    stamp, seen = grid.stamp, grid.seen
+    gx, gy = goal
+    goal_cell = grid.index(gx, gy)
+    # Same neighbour order as a_star_reference: (0, 1), (1, 0), (0, -1), (-1, 0).
+    steps = (1, stride, -1, -stride, 0) if allow_wait else (1, stride, -1, -stride)
+
+    start_cell = grid.index(*start)
+    # Robots may start on an obstacle (they only have to step off it); the table has no entry there.
+    start_h = heuristic(start, goal) if distances is None or blocked[start_cell] else distances[start_cell]
+    if start_h < 0:
+        return [(-1, -1, 0)]
+    node_cell = array('i', [start_cell])
+    node_parent = array('i', [-1])
+    stamp[start_cell] = generation
+    seen[start_cell] = 1
+    open_set = [(start_h, 0, 0)]  # (f, -t, node id)
+    while open_set:
+        f, neg_t, node = heapq.heappop(open_set)
+        t = -neg_t
+        cell = node_cell[node]
+        if stats is not None:
+            stats.expansions += 1
+            if stats.detailed:
+                x, y = grid.coords(cell)
+                stats.expanded(f, x, y, t, len(open_set) + 1)
+        if cell == goal_cell and (not stay_at_goal or reservations.free_after(gx, gy, t)):
+            path = []
+            while node >= 0:
+                x, y = divmod(node_cell[node], stride)
+                path.append((x - 1, y - 1, t))
+                node = node_parent[node]
+                t -= 1
+            return path[::-1]
+        if t >= max_time:
+            continue
+        nt = t + 1
+        bit = 1 << nt
+        for step in steps:
+            ncell = cell + step
+            if blocked[ncell]:
+                continue
+            if stamp[ncell] == generation:
+                if seen[ncell] & bit:
+                    continue
+            else:
+                stamp[ncell] = generation
+                seen[ncell] = 0
+            # Only cells that some reservation touches can hold a vertex or swap conflict.
+            if reserved[ncell] or constraints:
+                x, y = divmod(cell, stride)
+                nx, ny = divmod(ncell, stride)
+                x, y, nx, ny = x - 1, y - 1, nx - 1, ny - 1
+                if stats is not None and stats.detailed:
+                    began = time.perf_counter()
+                    safe = reservations.can_move(x, y, nx, ny, t)
+                    stats.safety_checks += 1
+                    stats.safety_time += time.perf_counter() - began
+                    if not safe:
+                        continue
+                elif not reservations.can_move(x, y, nx, ny, t):
+                    continue
+                if constraints and ((nx, ny, nt) in constraints or (x, y, nx, ny, t) in constraints):
+                    continue
+            if distances is None:
+                nx, ny = divmod(ncell, stride)
+                h = abs(nx - 1 - gx) + abs(ny - 1 - gy)
+            else:
+                h = distances[ncell]
+                if h < 0:
+                    continue
+            seen[ncell] |= bit
+            node_cell.append(ncell)
+            node_parent.append(node)
+            heapq.heappush(open_set, (nt + h, -nt, len(node_cell) - 1))
+            if stats is not None:
+                stats.pushes += 1
+
+    # If the open set is empty and the goal was never reached, return failure
+    return [(-1, -1, 0)]  # Return a path with invalid coordinates and time
 
-def a_star(grid, start, goal, dynamic_agents, max_time=1000):
-    """A* algorithm with dynamic agents."""
+def a_star_reference(grid, start, goal, reservations, max_time=1000, constraints=None, stay_at_goal=False):
+    """
+    The original dict-based A* over (x, y, t) tuples on a list of rows, kept
+    to check and benchmark a_star against.
+    constraints is an optional set of (x, y, t) cells and (x, y, nx, ny, t)
+    moves this robot may not use, as imposed by the CBS planner. With
+    stay_at_goal the robot only arrives once nothing else is reserved on the
+    goal afterwards, so it can remain there.
+    """
     # Define possible movements (up, down, left, right)
     neighbors = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+    # A goal off the map or on an obstacle has no path; don't search the whole space-time for it.
+    if not (0 <= goal[0] < len(grid) and 0 <= goal[1] < len(grid[0])) or grid[goal[0]][goal[1]] == 'X':
+        return [(-1, -1, 0)]
     
     # Initialize the open and closed sets
     open_set = []
@@ -99,7 +233,7 @@ def a_star(grid, start, goal, dynamic_agents, max_time=1000):
         x, y, t = current_state
         # print(current_state)
         # If we've reached the goal, reconstruct the path
-        if (x, y) == goal:
+        if (x, y) == goal and (not stay_at_goal or reservations.free_after(x, y, t)):
             path = []
             while (x, y, t) in came_from:
                 path.append((x, y, t))
@@ -119,7 +253,9 @@ def a_star(grid, start, goal, dynamic_agents, max_time=1000):
             # Check if the neighbor is within the grid boundaries
             if 0 <= nx < len(grid) and 0 <= ny < len(grid[0]):
                 # Check if the neighbor is not an obstacle and is safe at time nt
-                if grid[nx][ny] == 'X' or not is_cell_safe(nx, ny, nt, dynamic_agents):
+                if grid[nx][ny] == 'X' or not reservations.can_move(x, y, nx, ny, t):
+                    continue
+                if constraints and ((nx, ny, nt) in constraints or (x, y, nx, ny, t) in constraints):
                     continue
                 
                 # Calculate tentative g_score
@@ -135,70 +271,39 @@ def a_star(grid, start, goal, dynamic_agents, max_time=1000):
     # If the open set is empty and the goal was never reached, return failure
     return [(-1, -1, 0)]  # Return a path with invalid coordinates and time
 
-def resolve_conflicts(robot_paths):
-    """Resolve conflicts between robot paths."""
-    max_time = max(len(path) for path in robot_paths)
-    for t in range(max_time):
-        # Track occupied cells at time t
-        occupied = defaultdict(list)
-        for robot_id, path in enumerate(robot_paths):
-            if t < len(path):
-                x, y, _ = path[t]  # Unpack (x, y, t) and ignore t
-                occupied[(x, y)].append(robot_id)
-        
-        # Collect conflicts
-        conflicts = []
-        for cell, robots in occupied.items():
-            if len(robots) > 1:
-                conflicts.append((cell, robots))
-        
-        # Resolve conflicts
-        for cell, robots in conflicts:
-            # Allow the first robot to move, and reroute the others
-            for robot_id in robots[1:]:
-                # Find an alternative move for the conflicting robot
-                x_prev, y_prev, _ = robot_paths[robot_id][t - 1]  # Unpack (x, y, t) and ignore t
-                neighbors = [(x_prev + dx, y_prev + dy) for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]]
-                for nx, ny in neighbors:
-                    if (nx, ny) not in occupied:
-                        robot_paths[robot_id][t] = (nx, ny, t)  # Update with time component
-                        occupied[(nx, ny)].append(robot_id)
-                        break
-                else:
-                    # No alternative move found, stay in place
-                    robot_paths[robot_id][t] = (x_prev, y_prev, t)  # Update with time component
-    return robot_paths
-
-def plan_robot_movements(grid, starts, goals, dynamic_agents):
-    """Plan movements for multiple robots."""
-    robot_paths = []
-    for start, goal in zip(starts, goals):
-        path = a_star(grid, start, goal, dynamic_agents)
-        robot_paths.append(path)
-    
-    # Resolve conflicts between robot paths
-    robot_paths = resolve_conflicts(robot_paths)
-    
-    return robot_paths
+def plan_robot_movements(grid, starts, goals, reservations, w=1.0, method='cbs', heuristic_mode='manhattan'):
+    """
+    Plan movements for multiple robots with Conflict-Based Search (ECBS when
+    w > 1), or with prioritized planning when method is 'prioritized'.
+    Returns one path per robot; see cbs.solve and prioritized.solve for the
+    statistics.
+    """
+    if method == 'prioritized':
+        return prioritized.solve(grid, starts, goals, reservations, heuristic_mode=heuristic_mode).paths
+    return cbs.solve(grid, starts, goals, reservations, w=w, heuristic_mode=heuristic_mode).paths
+
 
+def main():
+    num = int(input("Enter test number: "))
+    problem = load_scenario("Data", num)
 
-num = int(input("Enter test number: "))
-data_name = f"Data/data{num}.txt"
-robots_name = f"Data/Robots{num}.txt"
-agents_name = f"Data/Agent{num}.txt"
+    # Plan movements for all robots
+    result = cbs.solve(problem.grid, problem.starts, problem.goals, problem.reservations)
+    robot_paths = result.paths
 
-read_input(data_name, robots_name, agents_name)
+    # Print the paths
+    for robot_id, path in enumerate(robot_paths):
+        print(f"Robot {robot_id} path:")
+        for x, y, t in path:
+            # print(f"({x}, {y}) at time {t}", end=" -> ")
+            print(f"({x}, {y}) ", end="->")
+        print("Total time = ", t)
+        print()
+        print()
+    print(f"CBS {result.status}: sum of costs = {result.sum_of_costs}, makespan = {result.makespan}, "
+          f"{result.stats['nodes_expanded']} nodes in {result.stats['runtime']}s")
 
-# Plan movements for all robots
-robot_paths = plan_robot_movements(grid, starts, goals, dynamic_agents)
 
-# Print the paths
-for robot_id, path in enumerate(robot_paths):
-    print(f"Robot {robot_id} path:")
-    for x, y, t in path:
-        # print(f"({x}, {y}) at time {t}", end=" -> ")
-        print(f"({x}, {y}) ", end="->")
-    print("Total time = ", t)
-    print()
-    print()
+if __name__ == "__main__":
+    main()
 
@@ -0,0 +1,97 @@
+"""
+Prioritized planning: robots are planned one at a time with pathfinder.a_star.
+Each path is written into a shared space-time reservation table, and every
+later robot must avoid it. The result is not optimal and can fail where CBS
+would succeed, but each robot costs one A* search, so it scales to hundreds of
+robots.
+
+Priority orders:
+    'distance'  longest start-to-goal Manhattan distance first
+    'index'     the order of the Robots file
+    'random'    a seeded shuffle
+Each random restart replans everyone in a fresh random order and keeps the
+best attempt (fewest failed robots, then lowest sum-of-costs).
+
+Goal occupancy:
+    'vanish'    a robot leaves the grid on arrival, as CBS assumes
+    'park'      a robot stays on its goal, so it may only arrive once no
+                higher-priority robot or agent needs that cell later
+
+Low-level planners:
+    'astar'     pathfinder.a_star; robots move every step
+    'sipp'      sipp.sipp over safe intervals; robots may wait for a cell
+"""
+import random
+import time
+
+import pathfinder
+import sipp
+from result import Result, path_cost
+
+ORDERS = ('distance', 'index', 'random')
+GOAL_MODES = ('vanish', 'park')
+LOW_LEVELS = ('astar', 'sipp')
+
+
+def priority_order(starts, goals, order, rng):
+    robots = list(range(len(starts)))
+    if order == 'distance':
+        robots.sort(key=lambda r: -pathfinder.heuristic(starts[r], goals[r]))
+    elif order == 'random':
+        rng.shuffle(robots)
+    elif order != 'index':
+        raise ValueError(f"unknown priority order {order!r}; expected one of {ORDERS}")
+    return robots
+
+
+def plan_in_order(grid, starts, goals, reservations, robots, goal_mode, max_time, heuristic_mode='manhattan',
+                  low_level='astar', search_stats=None):
+    """Plan robots in the given order against a copy of reservations; returns the paths."""
+    if goal_mode not in GOAL_MODES:
+        raise ValueError(f"unknown goal mode {goal_mode!r}; expected one of {GOAL_MODES}")
+    if low_level not in LOW_LEVELS:
+        raise ValueError(f"unknown low-level planner {low_level!r}; expected one of {LOW_LEVELS}")
+    search = sipp.sipp if low_level == 'sipp' else pathfinder.a_star
+    park = goal_mode == 'park'
+    table = reservations.copy()
+    paths = [None] * len(starts)
+    for robot in robots:
+        path = search(grid, starts[robot], goals[robot], table, max_time, stay_at_goal=park,
+                      heuristic_mode=heuristic_mode, stats=search_stats)
+        paths[robot] = path
+        if path[0][0] != -1:
+            table.reserve_path(path, park=park)
+    return paths
+
+
+def solve(grid, starts, goals, reservations, order='distance', restarts=0, goal_mode='vanish', seed=None,
+          max_time=1000, heuristic_mode='manhattan', low_level='astar', search_stats=None):
+    """
+    Plan all robots by priority. Returns a Result with status 'solved' if
+    every robot whose goal is a free cell got a path, else 'failed'. stats
+    also carries the throughput in robots planned per second. low_level
+    picks the single-robot planner (see LOW_LEVELS); search_stats, a
+    pathfinder.SearchStats, sums its node counts over every attempt.
+    """
+    rng = random.Random(seed)
+    unreachable = sum(1 for goal in goals if not pathfinder.is_open_cell(grid, goal))
+    start_time = time.perf_counter()
+    best, best_key = None, None
+    planned = 0
+    attempts = 0
+    for attempt in range(restarts + 1):
+        robots = priority_order(starts, goals, order if attempt == 0 else 'random', rng)
+        paths = plan_in_order(grid, starts, goals, reservations, robots, goal_mode, max_time, heuristic_mode,
+                              low_level, search_stats)
+        planned += len(robots)
+        attempts += 1
+        failed = sum(1 for path in paths if path[0][0] == -1) - unreachable
+        key = (failed, sum(path_cost(path) for path in paths))
+        if best_key is None or key < best_key:
+            best, best_key = paths, key
+        if not failed:
+            break
+    runtime = time.perf_counter() - start_time
+    stats = {"attempts": attempts, "robots_planned": planned, "runtime": round(runtime, 4),
+             "robots_per_sec": round(planned / runtime, 1) if runtime else 0.0}
+    return Result(best, 'solved' if best_key[0] == 0 else 'failed', 0, stats)
@@ -0,0 +1,93 @@
+"""
+Instrumented run of one robot's search: the SearchStats counters, the f-value
+histogram, the cost of the instrumentation itself (the same search timed with
+stats=None, plain counters and detailed stats), and optionally the expanded
+(x, y, t) states as CSV and a heatmap of expansions per cell as a PGM image.
+
+Usage: python profile_search.py [--dir Data] [--test 2] [--robot 1] [--planner astar]
+                                [--heuristic manhattan] [--trace trace.csv] [--heatmap heat.pgm]
+"""
+import argparse
+import os
+import time
+
+from loader import HERE, load_scenario
+from pathfinder import HEURISTICS, SearchStats, a_star
+from sipp import sipp
+
+PLANNERS = {"astar": a_star, "sipp": sipp}
+
+
+def best_time(search, runs, *args, **kwargs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        search(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_trace(path, trace):
+    with open(path, "w") as file:
+        file.write("x,y,t\n")
+        file.writelines(f"{x},{y},{t}\n" for x, y, t in trace)
+
+
+def write_heatmap(path, grid, counts):
+    """Plain PGM: obstacles black, unexpanded cells white, darker grey for more expansions."""
+    peak = max((count for row in counts for count in row), default=0) or 1
+    with open(path, "w") as file:
+        file.write(f"P2\n{grid.cols} {grid.rows}\n255\n")
+        for x, row in enumerate(counts):
+            line = []
+            for y, count in enumerate(row):
+                if not grid.is_open(x, y):
+                    line.append(0)
+                elif count:
+                    line.append(220 - 180 * count // peak)
+                else:
+                    line.append(255)
+            file.write(" ".join(map(str, line)) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", default=os.path.join(HERE, "Data"))
+    parser.add_argument("--test", type=int, default=2)
+    parser.add_argument("--robot", type=int, default=1)
+    parser.add_argument("--planner", choices=sorted(PLANNERS), default="astar")
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="manhattan")
+    parser.add_argument("--max-time", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5, help="timed repetitions for the overhead check")
+    parser.add_argument("--trace", help="write the expanded states to this CSV file")
+    parser.add_argument("--heatmap", help="write expansions per cell to this PGM file")
+    args = parser.parse_args()
+
+    problem = load_scenario(args.dir, args.test)
+    search = PLANNERS[args.planner]
+    call = (problem.grid, problem.starts[args.robot], problem.goals[args.robot], problem.reservations, args.max_time)
+    options = {"heuristic_mode": args.heuristic}
+
+    stats = SearchStats(detailed=True, trace=bool(args.trace or args.heatmap))
+    path = search(*call, stats=stats, **options)
+    print(f"{problem.name} robot {args.robot} ({args.planner}, {args.heuristic}): arrival {path[-1][2]}")
+    for name, value in stats.summary().items():
+        print(f"  {name:<15} {value}")
+    print("  f histogram:   " + " ".join(f"{f}:{count}" for f, count in sorted(stats.f_values.items())))
+
+    plain = best_time(search, args.runs, *call, **options)
+    counted = best_time(search, args.runs, *call, stats=SearchStats(), **options)
+    detailed = best_time(search, args.runs, *call, stats=SearchStats(detailed=True), **options)
+    print(f"  time: stats=None {plain * 1000:.2f} ms, counters {counted * 1000:.2f} ms, "
+          f"detailed {detailed * 1000:.2f} ms")
+
+    if args.trace:
+        write_trace(args.trace, stats.trace)
+        print(f"  wrote {len(stats.trace)} states to {args.trace}")
+    if args.heatmap:
+        write_heatmap(args.heatmap, problem.grid, stats.heatmap(problem.grid.rows, problem.grid.cols))
+        print(f"  wrote {args.heatmap}")
+
+
+if __name__ == "__main__":
+    main()
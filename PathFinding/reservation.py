@@ -0,0 +1,140 @@
+"""
+Space-time reservation table for the dynamic agents (and, later, robots).
+
+Occupied cells are kept in a set keyed by (x, y, t), so checking a cell is
+O(1) instead of scanning every agent position at that time. Traversed edges
+are kept as (from_x, from_y, to_x, to_y, t) for a move leaving at t, which
+lets a planner reject swapping places with an agent (an edge conflict). An
+agent whose schedule has ended stays parked on its last cell from then on.
+The reserved times are also indexed per cell, so the free time of a cell can
+be read off as safe intervals (for SIPP).
+"""
+import re
+
+# End of a safe interval that never closes.
+FOREVER = float('inf')
+
+AGENT_CELL = re.compile(r'\((\d+), (\d+)\)')
+AGENT_TIME = re.compile(r'\d+')
+
+
+class ReservationTable:
+    def __init__(self):
+        self.cells = set()     # (x, y, t) occupied at time t.
+        self.edges = set()     # (x, y, nx, ny, t): moves (x, y) -> (nx, ny) between t and t + 1.
+        self.parked = {}       # (x, y) -> first time from which it stays occupied for good.
+        self.latest = {}       # (x, y) -> last time step it is reserved.
+        self.times = {}        # (x, y) -> reserved time steps, unordered.
+        self.intervals = {}    # (x, y) -> cached safe_intervals(), dropped when the cell changes.
+        self.horizon = 0       # Last time step with a timed reservation.
+        self.masks = []        # (GridMap, bytearray) cell masks kept in step with the reservations.
+
+    def copy(self):
+        table = ReservationTable()
+        table.cells = set(self.cells)
+        table.edges = set(self.edges)
+        table.parked = dict(self.parked)
+        table.latest = dict(self.latest)
+        table.times = {cell: list(times) for cell, times in self.times.items()}
+        table.intervals = dict(self.intervals)
+        table.horizon = self.horizon
+        table.masks = [(grid, bytearray(mask)) for grid, mask in self.masks]
+        return table
+
+    def cell_mask(self, grid):
+        """
+        bytearray over grid's packed cells, 1 where any reservation ever
+        touches the cell. Built once per grid and updated by reserve_path, so
+        a planner can skip the (x, y, t) lookups for all other cells.
+        """
+        for known, mask in self.masks:
+            if known is grid:
+                return mask
+        mask = bytearray(grid.size)
+        for x, y in self.latest:
+            if 0 <= x < grid.rows and 0 <= y < grid.cols:
+                mask[grid.index(x, y)] = 1
+        self.masks.append((grid, mask))
+        return mask
+
+    def reserve_path(self, path, park=True):
+        """
+        Reserve a path given as [(x, y, t), ...] in time order. With park the
+        last cell stays occupied after the path ends.
+        """
+        for x, y, t in path:
+            if (x, y, t) not in self.cells:
+                self.cells.add((x, y, t))
+                self.times.setdefault((x, y), []).append(t)
+                self.intervals.pop((x, y), None)
+            if t > self.latest.get((x, y), -1):
+                self.latest[(x, y)] = t
+                for grid, mask in self.masks:
+                    if 0 <= x < grid.rows and 0 <= y < grid.cols:
+                        mask[grid.index(x, y)] = 1
+        for (x, y, t), (nx, ny, nt) in zip(path, path[1:]):
+            if nt == t + 1 and (x, y) != (nx, ny):
+                self.edges.add((x, y, nx, ny, t))
+        if path:
+            x, y, t = path[-1]
+            self.horizon = max(self.horizon, t)
+            if park:
+                self.parked[(x, y)] = min(t, self.parked.get((x, y), t))
+                self.intervals.pop((x, y), None)
+
+    def is_free(self, x, y, t):
+        """True if no reservation holds (x, y) at time t."""
+        if (x, y, t) in self.cells:
+            return False
+        since = self.parked.get((x, y))
+        return since is None or t < since
+
+    def safe_intervals(self, x, y):
+        """
+        Maximal (start, end) time ranges, in order, during which (x, y) is
+        free; the last one ends at FOREVER unless something parks there.
+        """
+        intervals = self.intervals.get((x, y))
+        if intervals is not None:
+            return intervals
+        parked = self.parked.get((x, y), FOREVER)
+        intervals = []
+        start = 0
+        for t in sorted(self.times.get((x, y), ())):
+            if t >= parked:
+                break
+            if t > start:
+                intervals.append((start, t - 1))
+            start = t + 1
+        if parked > start:
+            intervals.append((start, parked - 1 if parked != FOREVER else FOREVER))
+        self.intervals[(x, y)] = intervals
+        return intervals
+
+    def occupied_at(self, t):
+        """The (x, y) cells held at time t, parked ones included."""
+        cells = {(x, y) for x, y, held in self.cells if held == t}
+        cells.update(cell for cell, since in self.parked.items() if since <= t)
+        return cells
+
+    def free_after(self, x, y, t):
+        """True if nothing is reserved on (x, y) after time t, so a robot can stay there for good."""
+        return self.latest.get((x, y), -1) <= t and (x, y) not in self.parked
+
+    def can_move(self, x, y, nx, ny, t):
+        """True if moving (x, y) -> (nx, ny) between t and t + 1 hits no vertex or swap conflict."""
+        return self.is_free(nx, ny, t + 1) and (nx, ny, x, y, t) not in self.edges
+
+    @classmethod
+    def from_agents_file(cls, agents_file):
+        """Build the table from an Agent*.txt file of scheduled agent paths."""
+        table = cls()
+        with open(agents_file, "r") as file:
+            for line in file:
+                cells, _, times = line.rpartition("at times")
+                coord_matches = AGENT_CELL.findall(cells or times)
+                time_matches = AGENT_TIME.findall(times)
+                if coord_matches and time_matches:
+                    schedule = sorted((int(t), int(x), int(y)) for (x, y), t in zip(coord_matches, time_matches))
+                    table.reserve_path([(x, y, t) for t, x, y in schedule])
+        return table
@@ -0,0 +1,29 @@
+"""
+Outcome of a multi-robot solve, shared by cbs and prioritized. It imports
+no planner, so either solver can use it without importing the other.
+"""
+
+FAILED = [(-1, -1, 0)]
+
+
+def path_cost(path):
+    """Arrival time of a path; failed paths cost nothing."""
+    return 0 if path is FAILED or path[0][0] == -1 else path[-1][2]
+
+
+class Result:
+    """Outcome of one solve() call."""
+
+    def __init__(self, paths, status, conflicts, stats):
+        self.paths = paths
+        self.status = status                # 'solved', 'failed' or 'budget'.
+        self.conflicts = conflicts          # Conflicts left in paths (0 when solved).
+        self.failed = [robot for robot, path in enumerate(paths) if path[0][0] == -1]
+        costs = [path_cost(path) for path in paths if path[0][0] != -1]
+        self.sum_of_costs = sum(costs)
+        self.makespan = max(costs, default=0)
+        self.stats = stats
+
+    def summary(self):
+        return {"status": self.status, "sum_of_costs": self.sum_of_costs, "makespan": self.makespan,
+                "failed": self.failed, "conflicts": self.conflicts, **self.stats}
@@ -0,0 +1,151 @@
+"""
+Safe-Interval Path Planning (SIPP) for one robot among the dynamic agents.
+
+Instead of one state per (cell, t), a cell's time line is cut into safe
+intervals: maximal runs of time steps in which no reservation holds it (see
+ReservationTable.safe_intervals). A state is (cell, interval) and its cost is
+the earliest time the robot can be there. A successor is generated once per
+neighbouring interval, arriving as early as that interval and the current one
+allow, so however long a robot waits for an agent to pass, the wait is a single
+edge. Waiting is allowed here, unlike in pathfinder.a_star; the returned
+path lists the robot on its cell at every time step, waits included.
+
+With a consistent heuristic the first goal state popped has the earliest
+possible arrival time, the same as a time-expanded A* with wait moves
+(pathfinder.a_star with allow_wait) but with far fewer states when agents keep
+cells busy for long stretches.
+"""
+import heapq
+from array import array
+
+import pathfinder
+from reservation import FOREVER
+
+FAILED = [(-1, -1, 0)]
+
+
+def sipp(grid, start, goal, reservations, max_time=1000, stay_at_goal=False, heuristic_mode='manhattan',
+         stats=None):
+    """
+    Earliest-arrival path from start to goal with waits, as [(x, y, t), ...],
+    or [(-1, -1, 0)] when the goal cannot be reached by max_time. With
+    stay_at_goal the robot only arrives in the goal's last safe interval, so
+    it can remain there. heuristic_mode and stats are as for pathfinder.a_star.
+    """
+    if stats is not None:
+        stats.calls += 1
+    if not pathfinder.is_open_cell(grid, goal):
+        return FAILED
+    if heuristic_mode not in pathfinder.HEURISTICS:
+        raise ValueError(f"unknown heuristic mode {heuristic_mode!r}; expected one of {pathfinder.HEURISTICS}")
+    distances = grid.distances_to(*goal) if heuristic_mode == 'true' else None
+    stride = grid.stride
+    blocked = grid.blocked
+    reserved = reservations.cell_mask(grid)
+    edges = reservations.edges
+    gx, gy = goal
+    goal_cell = grid.index(gx, gy)
+    steps = (1, stride, -1, -stride)
+    always = [(0, FOREVER)]
+    intervals = {}   # cell -> its safe intervals, built on first visit.
+
+    def cell_intervals(cell):
+        found = intervals.get(cell)
+        if found is None:
+            x, y = divmod(cell, stride)
+            found = intervals[cell] = reservations.safe_intervals(x - 1, y - 1) if reserved[cell] else always
+        return found
+
+    start_cell = grid.index(*start)
+    start_h = pathfinder.heuristic(start, goal) if distances is None or blocked[start_cell] else distances[start_cell]
+    if start_h < 0:
+        return FAILED
+    # A robot may start on an obstacle or a cell that is not free at t = 0.
+    # If the cell is free from t = 1 it may stay, so that interval is pulled
+    # back to t = 0; otherwise it can only leave at once and gets a one-step
+    # interval there.
+    start_intervals = [] if blocked[start_cell] else cell_intervals(start_cell)
+    if start_intervals and start_intervals[0][0] == 1:
+        intervals[start_cell] = [(0, start_intervals[0][1])] + start_intervals[1:]
+    elif not start_intervals or start_intervals[0][0] > 0:
+        intervals[start_cell] = [(0, 0)] + start_intervals
+
+    node_cell = array('i', [start_cell])
+    node_interval = array('i', [0])
+    node_time = array('i', [0])
+    node_parent = array('i', [-1])
+    best = {(start_cell, 0): 0}      # (cell, interval index) -> earliest arrival so far.
+    open_set = [(start_h, 0, 0)]     # (f, -t, node id)
+    while open_set:
+        f, neg_t, node = heapq.heappop(open_set)
+        t = -neg_t
+        cell = node_cell[node]
+        index = node_interval[node]
+        if best[(cell, index)] < t:
+            if stats is not None:
+                stats.duplicate_pops += 1
+            continue  # Reached this interval earlier through another node.
+        if stats is not None:
+            stats.expansions += 1
+            if stats.detailed:
+                x, y = grid.coords(cell)
+                stats.expanded(f, x, y, t, len(open_set) + 1)
+        end = intervals[cell][index][1]
+        if cell == goal_cell and (not stay_at_goal or end == FOREVER):
+            return expand_path(grid, node, node_cell, node_time, node_parent)
+        if t >= max_time:
+            continue
+        # The robot may leave at any time from t until its interval ends.
+        last_departure = min(end, max_time - 1)
+        for step in steps:
+            ncell = cell + step
+            if blocked[ncell]:
+                continue
+            if distances is None:
+                nx, ny = divmod(ncell, stride)
+                h = abs(nx - 1 - gx) + abs(ny - 1 - gy)
+            else:
+                h = distances[ncell]
+                if h < 0:
+                    continue
+            for nindex, (start_t, end_t) in enumerate(cell_intervals(ncell)):
+                arrival = max(t + 1, start_t)
+                if arrival > last_departure + 1:
+                    break  # This and every later interval opens after the robot must have left.
+                if arrival > end_t:
+                    continue
+                # A swap with an agent only rules out that one departure; try the later ones.
+                if reserved[ncell] and reserved[cell]:
+                    x, y = divmod(cell, stride)
+                    nx, ny = divmod(ncell, stride)
+                    latest = min(end_t, last_departure + 1)
+                    while arrival <= latest and (nx - 1, ny - 1, x - 1, y - 1, arrival - 1) in edges:
+                        arrival += 1
+                    if arrival > latest:
+                        continue
+                key = (ncell, nindex)
+                if arrival >= best.get(key, FOREVER):
+                    continue
+                best[key] = arrival
+                node_cell.append(ncell)
+                node_interval.append(nindex)
+                node_time.append(arrival)
+                node_parent.append(node)
+                heapq.heappush(open_set, (arrival + h, -arrival, len(node_cell) - 1))
+                if stats is not None:
+                    stats.pushes += 1
+    return FAILED
+
+
+def expand_path(grid, node, node_cell, node_time, node_parent):
+    """Turn a chain of SIPP nodes into one (x, y, t) entry per time step, waits included."""
+    path = []
+    t = node_time[node]
+    while node >= 0:
+        x, y = grid.coords(node_cell[node])
+        # The robot holds this cell from its arrival until it leaves for the next node.
+        while t >= node_time[node]:
+            path.append((x, y, t))
+            t -= 1
+        node = node_parent[node]
+    return path[::-1]
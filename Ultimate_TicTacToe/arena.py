@@ -0,0 +1,84 @@
+"""
+Headless arena: MCTS against iterative-deepening minimax over N games, with
+colours alternating each game. Both players get the same per-move budget;
+the CPU seconds each one actually used are reported next to the results so
+strength can be compared per CPU-second.
+
+Usage: python arena.py [--games 10] [--budget-ms 300] [--seed 1]
+"""
+import argparse
+import time
+
+from bitboard import BitBoard, PLAYERS, X_SIDE, O_SIDE
+from mcts import MCTS
+from ttable import TranspositionTable
+from engine import AI_SIDE, TT_SIZE_BITS, iterative_deepening
+
+
+class MinimaxPlayer:
+    name = "minimax"
+
+    def __init__(self):
+        self.table = TranspositionTable(TT_SIZE_BITS)
+
+    def choose(self, board, budget_ms):
+        # evaluate_state scores from O's (AI_SIDE's) point of view.
+        maximizing = board.side_to_move() == AI_SIDE
+        return iterative_deepening(board, budget_ms, self.table, maximizing)[1]
+
+
+class MCTSPlayer:
+    name = "mcts"
+
+    def __init__(self, seed):
+        self.engine = MCTS(seed=seed)
+        self.playouts = 0
+
+    def choose(self, board, budget_ms):
+        _, move, playouts = self.engine.search(board, budget_ms)
+        self.playouts += playouts
+        return move
+
+
+def play_game(players, budget_ms, cpu):
+    """players[side] moves for side; returns the winning side or None."""
+    board = BitBoard()
+    while not board.game_over():
+        side = board.side_to_move()
+        player = players[side]
+        start = time.process_time()
+        move = player.choose(board, budget_ms)
+        cpu[player.name] += time.process_time() - start
+        board.make(move, side)
+    return board.winner()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--budget-ms", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    mcts, minimax = MCTSPlayer(args.seed), MinimaxPlayer()
+    score = {"mcts": 0, "minimax": 0, "draw": 0}
+    cpu = {"mcts": 0.0, "minimax": 0.0}
+    for game in range(args.games):
+        players = (mcts, minimax) if game % 2 == 0 else (minimax, mcts)
+        winner = play_game(players, args.budget_ms, cpu)
+        result = "draw" if winner is None else players[winner].name
+        score[result] += 1
+        print(f"game {game + 1}: X={players[X_SIDE].name} O={players[O_SIDE].name} -> "
+              f"{'draw' if winner is None else PLAYERS[winner] + ' (' + result + ')'}")
+
+    print(f"mcts {score['mcts']} - minimax {score['minimax']} - draws {score['draw']}")
+    for name in ("mcts", "minimax"):
+        points = score[name] + 0.5 * score["draw"]
+        per_cpu = points / cpu[name] if cpu[name] else 0.0
+        print(f"{name:<8} cpu={cpu[name]:8.2f}s  points/cpu-s={per_cpu:.3f}")
+    if cpu["mcts"]:
+        print(f"mcts playouts/s: {mcts.playouts / cpu['mcts']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
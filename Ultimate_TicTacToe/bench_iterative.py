@@ -0,0 +1,46 @@
+"""
+Time-to-move benchmark: fixed-depth minimax against the time-budgeted
+iterative-deepening driver on the same seeded positions.
+
+Usage: python bench_iterative.py [--budget-ms 800] [--positions 10] [--plies 11] [--seed 1]
+"""
+import argparse
+import math
+import time
+
+from bitboard import BitBoard
+from bench_bitboard import random_positions
+from ttable import TranspositionTable
+from engine import SEARCH_DEPTH, TT_SIZE_BITS, SearchStats, iterative_deepening, minimax
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=int, default=800)
+    parser.add_argument("--positions", type=int, default=10)
+    parser.add_argument("--plies", type=int, default=11)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions, args.plies, args.seed)
+    table = TranspositionTable(TT_SIZE_BITS)
+    print(f"{'pos':>3} {'moves':>5} | {'fixed d' + str(SEARCH_DEPTH) + ' ms':>12} | {'id depth':>8} {'id ms':>8} {'nodes':>8}")
+    id_times = []
+    for i, (state, active) in enumerate(positions):
+        board = BitBoard.from_state(state, active)
+
+        start = time.perf_counter()
+        minimax(board, SEARCH_DEPTH, -math.inf, math.inf, True)
+        fixed_ms = (time.perf_counter() - start) * 1000
+
+        stats = SearchStats()
+        start = time.perf_counter()
+        _, _, depth = iterative_deepening(board, args.budget_ms, table, stats=stats)
+        id_ms = (time.perf_counter() - start) * 1000
+        id_times.append(id_ms)
+        print(f"{i:>3} {len(board.moves()):>5} | {fixed_ms:>12.1f} | {depth:>8} {id_ms:>8.1f} {stats.nodes:>8}")
+    print(f"iterative deepening: max {max(id_times):.1f} ms, mean {sum(id_times) / len(id_times):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Scaling benchmark for the root-parallel search: wall-clock speedup over the
+serial minimax at 1/2/4/8 workers on a fixed set of seeded midgame positions,
+checking that every parallel run picks the serial best move.
+
+Usage: python bench_parallel.py [--depth 7] [--positions 6] [--plies 20] [--workers 1 2 4 8] [--no-ybw]
+"""
+import argparse
+import math
+import os
+import time
+
+from bitboard import BitBoard
+from bench_bitboard import random_positions
+from parallel import ParallelSearcher
+from engine import SearchStats, minimax
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--positions", type=int, default=6)
+    parser.add_argument("--plies", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--no-ybw", action="store_true", help="dispatch all root moves at once")
+    args = parser.parse_args()
+
+    boards = [BitBoard.from_state(*p) for p in random_positions(args.positions, args.plies, args.seed)]
+    print(f"{len(boards)} positions, depth {args.depth}, {os.cpu_count()} cpus")
+
+    stats = SearchStats()
+    start = time.perf_counter()
+    serial = [minimax(board, args.depth, -math.inf, math.inf, True, stats) for board in boards]
+    serial_time = time.perf_counter() - start
+    print(f"{'serial':>9}  time={serial_time:8.3f}s  nodes={stats.nodes:>9}")
+
+    for workers in args.workers:
+        stats = SearchStats()
+        with ParallelSearcher(workers) as searcher:
+            searcher.search(boards[0], 1)  # Start the worker processes outside the timing.
+            start = time.perf_counter()
+            results = [searcher.search(board, args.depth, ybw=not args.no_ybw, stats=stats) for board in boards]
+            elapsed = time.perf_counter() - start
+        same = sum(1 for a, b in zip(serial, results) if a == b)
+        print(f"{workers:>2} workers  time={elapsed:8.3f}s  nodes={stats.nodes:>9}  "
+              f"speedup={serial_time / elapsed:5.2f}x  identical={same}/{len(boards)}")
+
+
+if __name__ == "__main__":
+    main()
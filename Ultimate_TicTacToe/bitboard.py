@@ -0,0 +1,336 @@
+"""
+Packed bitboard representation of an Ultimate Tic-Tac-Toe position.
+
+Cell (G_r, G_c, L_r, L_c) lives at bit index (G_r*3 + G_c)*9 + L_r*3 + L_c,
+so iterating set bits from low to high visits moves in the same order as the
+nested loops of engine.available_moves.
+"""
+import random
+
+# ---------------------------
+# Constants and Precomputed Tables
+# ---------------------------
+PLAYERS = ('X', 'O')    # Side index -> mark used by the GUI state.
+X_SIDE = 0
+O_SIDE = 1
+FREE = -1               # active value when the next player may move anywhere.
+
+FULL_BOARD = 0x1FF      # 9-bit mask of a complete 3x3 board.
+ALL_CELLS = (1 << 81) - 1
+
+# Rows, columns and diagonals of a 3x3 board as 9-bit masks.
+WIN_LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# WIN_TABLE[mask] is True when the 9-bit mask contains a complete line.
+WIN_TABLE = tuple(any(mask & line == line for line in WIN_LINES) for mask in range(512))
+
+# THREAT_LINES[mask] lists the lines in which the 9-bit mask holds exactly two cells.
+THREAT_LINES = tuple(tuple(line for line in WIN_LINES if (mask & line).bit_count() == 2) for mask in range(512))
+
+# BOARD_MASKS[b] selects the 9 cells of small board b inside an 81-bit mask.
+BOARD_MASKS = tuple(FULL_BOARD << (9 * b) for b in range(9))
+
+# OPEN_CELLS[finished] is the 81-bit mask of every cell in the unfinished boards.
+OPEN_CELLS = tuple(
+    sum(BOARD_MASKS[b] for b in range(9) if not (finished >> b) & 1)
+    for finished in range(512)
+)
+
+# The 8 symmetries of a 3x3 grid as permutations of 0..8. Ultimate TTT is
+# invariant when the same symmetry is applied to the boards and to the cells
+# inside them, so SYMMETRY_CELLS[s][idx] maps a bit index under symmetry s.
+SYMMETRIES = tuple(
+    tuple(r * 3 + c for r, c in (transform(i // 3, i % 3) for i in range(9)))
+    for transform in (
+        lambda r, c: (r, c), lambda r, c: (c, 2 - r), lambda r, c: (2 - r, 2 - c), lambda r, c: (2 - c, r),
+        lambda r, c: (r, 2 - c), lambda r, c: (2 - r, c), lambda r, c: (c, r), lambda r, c: (2 - c, 2 - r),
+    )
+)
+SYMMETRY_CELLS = tuple(tuple(perm[idx // 9] * 9 + perm[idx % 9] for idx in range(81)) for perm in SYMMETRIES)
+
+# Zobrist keys: one per (side, cell) plus one per active-board value
+# (index 0 is a free move, 1..9 are the forced boards). Won and drawn boards
+# follow from the cells, so they need no keys of their own, and the side to
+# move follows from the mark count.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_CELLS = tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(81)) for _ in range(2))
+ZOBRIST_ACTIVE = tuple(_zobrist_rng.getrandbits(64) for _ in range(10))
+del _zobrist_rng
+
+
+def move_to_index(move):
+    """Convert a (G_r, G_c, L_r, L_c) move into a bit index."""
+    gr, gc, lr, lc = move
+    return (gr * 3 + gc) * 9 + lr * 3 + lc
+
+
+def index_to_move(idx):
+    """Convert a bit index into a (G_r, G_c, L_r, L_c) move."""
+    board, cell = divmod(idx, 9)
+    return board // 3, board % 3, cell // 3, cell % 3
+
+
+def count_threats(own, blocked):
+    """Lines where the 9-bit own mask holds two cells and the third is not blocked."""
+    count = 0
+    for line in THREAT_LINES[own]:
+        if not line & blocked:
+            count += 1
+    return count
+
+
+def iter_bits(mask):
+    """Yield the indices of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# ---------------------------
+# Bitboard
+# ---------------------------
+class BitBoard:
+    """
+    Two 81-bit cell masks, a 9-bit won mask per player and a shared 9-bit
+    drawn mask. Moves are applied in place with make() and reverted with
+    unmake(), so a search never copies the position. hash is the Zobrist
+    key of the cells and the active board, updated incrementally.
+
+    The evaluation terms are kept up to date the same way: board_threats
+    holds, per side and unfinished small board (index side*9 + b), the open
+    two-in-a-row lines; threats is their per-side total and global_threats
+    counts the same pattern on the boards each side has won.
+    """
+
+    __slots__ = ('cells', 'won', 'drawn', 'active', 'hash', 'board_threats', 'threats', 'global_threats',
+                 'history')
+
+    def __init__(self):
+        self.cells = [0, 0]
+        self.won = [0, 0]
+        self.drawn = 0
+        self.active = FREE
+        self.hash = ZOBRIST_ACTIVE[FREE + 1]
+        self.board_threats = [0] * 18
+        self.threats = [0, 0]
+        self.global_threats = [0, 0]
+        self.history = []
+
+    @classmethod
+    def from_state(cls, state, active_board):
+        """Build a bitboard from the GUI's nested-dict state."""
+        board = cls()
+        for gr in range(3):
+            for gc in range(3):
+                b = gr * 3 + gc
+                small = state[gr][gc]
+                for lr in range(3):
+                    for lc in range(3):
+                        mark = small['cells'][lr][lc]
+                        if mark is not None:
+                            board.cells[PLAYERS.index(mark)] |= 1 << (b * 9 + lr * 3 + lc)
+                if small['winner'] == 'D':
+                    board.drawn |= 1 << b
+                elif small['winner'] is not None:
+                    board.won[PLAYERS.index(small['winner'])] |= 1 << b
+        if active_board is not None:
+            b = active_board[0] * 3 + active_board[1]
+            if not (board.finished() >> b) & 1:
+                board.active = b
+        board.hash = board.compute_hash()
+        board.recompute_threats()
+        return board
+
+    def to_state(self):
+        """Return the position as the GUI's nested-dict state."""
+        state = []
+        for gr in range(3):
+            row = []
+            for gc in range(3):
+                b = gr * 3 + gc
+                cells = [[None for _ in range(3)] for _ in range(3)]
+                for side in (X_SIDE, O_SIDE):
+                    for idx in iter_bits(self.cells[side] & BOARD_MASKS[b]):
+                        cells[(idx % 9) // 3][idx % 3] = PLAYERS[side]
+                winner = None
+                if (self.won[X_SIDE] >> b) & 1:
+                    winner = PLAYERS[X_SIDE]
+                elif (self.won[O_SIDE] >> b) & 1:
+                    winner = PLAYERS[O_SIDE]
+                elif (self.drawn >> b) & 1:
+                    winner = 'D'
+                row.append({'cells': cells, 'winner': winner})
+            state.append(row)
+        return state
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Parse the to_string() form: 81 of '.XO' in index order, then the
+        active board. Board results follow from the final cells, not from
+        the order the marks were placed in.
+        """
+        cells, active = text.split()
+        board = cls()
+        for idx, mark in enumerate(cells):
+            if mark != '.':
+                board.cells[PLAYERS.index(mark)] |= 1 << idx
+        for b in range(9):
+            x = (board.cells[X_SIDE] >> (9 * b)) & FULL_BOARD
+            o = (board.cells[O_SIDE] >> (9 * b)) & FULL_BOARD
+            if WIN_TABLE[x]:
+                board.won[X_SIDE] |= 1 << b
+            elif WIN_TABLE[o]:
+                board.won[O_SIDE] |= 1 << b
+            elif x | o == FULL_BOARD:
+                board.drawn |= 1 << b
+        board.active = int(active)
+        board.hash = board.compute_hash()
+        board.recompute_threats()
+        return board
+
+    def to_string(self):
+        marks = ['.'] * 81
+        for side in (X_SIDE, O_SIDE):
+            for idx in iter_bits(self.cells[side]):
+                marks[idx] = PLAYERS[side]
+        return ''.join(marks) + ' ' + str(self.active)
+
+    def active_board(self):
+        """Return the forced board as (G_r, G_c), or None for a free move."""
+        if self.active == FREE:
+            return None
+        return divmod(self.active, 3)
+
+    def copy(self):
+        """Return an independent copy without the undo history."""
+        board = BitBoard()
+        board.cells = self.cells[:]
+        board.won = self.won[:]
+        board.drawn = self.drawn
+        board.active = self.active
+        board.hash = self.hash
+        board.board_threats = self.board_threats[:]
+        board.threats = self.threats[:]
+        board.global_threats = self.global_threats[:]
+        return board
+
+    def transformed(self, sym):
+        """Return a copy with symmetry number sym applied (without history)."""
+        perm, cell_perm = SYMMETRIES[sym], SYMMETRY_CELLS[sym]
+        board = BitBoard()
+        for side in (X_SIDE, O_SIDE):
+            for idx in iter_bits(self.cells[side]):
+                board.cells[side] |= 1 << cell_perm[idx]
+            for b in iter_bits(self.won[side]):
+                board.won[side] |= 1 << perm[b]
+        for b in iter_bits(self.drawn):
+            board.drawn |= 1 << perm[b]
+        board.active = FREE if self.active == FREE else perm[self.active]
+        board.hash = board.compute_hash()
+        board.recompute_threats()
+        return board
+
+    def compute_hash(self):
+        """Zobrist key computed from scratch (make/unmake keep hash in sync)."""
+        key = ZOBRIST_ACTIVE[self.active + 1]
+        for side in (X_SIDE, O_SIDE):
+            for idx in iter_bits(self.cells[side]):
+                key ^= ZOBRIST_CELLS[side][idx]
+        return key
+
+    def recompute_threats(self):
+        """Rebuild the threat counters from scratch (make/unmake keep them in sync)."""
+        finished = self.finished()
+        for side in (X_SIDE, O_SIDE):
+            for b in range(9):
+                own = (self.cells[side] >> (9 * b)) & FULL_BOARD
+                opp = (self.cells[side ^ 1] >> (9 * b)) & FULL_BOARD
+                self.board_threats[side * 9 + b] = 0 if (finished >> b) & 1 else count_threats(own, opp)
+            self.threats[side] = sum(self.board_threats[side * 9:side * 9 + 9])
+            self.global_threats[side] = count_threats(self.won[side], self.won[side ^ 1] | self.drawn)
+
+    def finished(self):
+        """9-bit mask of small boards that are won or drawn."""
+        return self.won[0] | self.won[1] | self.drawn
+
+    def winner(self):
+        """Return the side index that owns a line of small boards, or None."""
+        if WIN_TABLE[self.won[X_SIDE]]:
+            return X_SIDE
+        if WIN_TABLE[self.won[O_SIDE]]:
+            return O_SIDE
+        return None
+
+    def open_cells(self):
+        """Number of empty cells left in unfinished boards (the most plies remaining)."""
+        return (~(self.cells[0] | self.cells[1]) & OPEN_CELLS[self.won[0] | self.won[1] | self.drawn]).bit_count()
+
+    def side_to_move(self):
+        """X moves first, so the side to move follows from the mark count."""
+        return (self.cells[0].bit_count() + self.cells[1].bit_count()) & 1
+
+    def moves_mask(self):
+        """81-bit mask of legal moves for the side to move."""
+        empty = ~(self.cells[0] | self.cells[1])
+        if self.active != FREE:
+            return empty & BOARD_MASKS[self.active]
+        return empty & OPEN_CELLS[self.won[0] | self.won[1] | self.drawn]
+
+    def moves(self):
+        """List of legal move indices, in available_moves order."""
+        return list(iter_bits(self.moves_mask()))
+
+    def game_over(self):
+        """True when a player owns a global line or no small board is left."""
+        finished = self.won[0] | self.won[1] | self.drawn
+        return finished == FULL_BOARD or WIN_TABLE[self.won[0]] or WIN_TABLE[self.won[1]]
+
+    def make(self, idx, side):
+        """Place side's mark on cell idx and update results and threats in place."""
+        b = idx // 9
+        shift = b * 9
+        other = side ^ 1
+        board_threats, threats, global_threats = self.board_threats, self.threats, self.global_threats
+        own_slot, opp_slot = side * 9 + b, other * 9 + b
+        old_own, old_opp = board_threats[own_slot], board_threats[opp_slot]
+        self.history.append((idx, side, self.active, self.won[side], self.drawn, self.hash, old_own, old_opp,
+                             threats[0], threats[1], global_threats[0], global_threats[1]))
+        cells = self.cells[side] | (1 << idx)
+        self.cells[side] = cells
+        own = (cells >> shift) & FULL_BOARD
+        opp = (self.cells[other] >> shift) & FULL_BOARD
+        if WIN_TABLE[own] or own | opp == FULL_BOARD:
+            if WIN_TABLE[own]:
+                self.won[side] |= 1 << b
+            else:
+                self.drawn |= 1 << b
+            new_own = new_opp = 0
+            global_threats[side] = count_threats(self.won[side], self.won[other] | self.drawn)
+            global_threats[other] = count_threats(self.won[other], self.won[side] | self.drawn)
+        else:
+            new_own = count_threats(own, opp)
+            new_opp = count_threats(opp, own)
+        board_threats[own_slot] = new_own
+        board_threats[opp_slot] = new_opp
+        threats[side] += new_own - old_own
+        threats[other] += new_opp - old_opp
+        nxt = idx % 9
+        if ((self.won[0] | self.won[1] | self.drawn) >> nxt) & 1:
+            nxt = FREE
+        self.hash ^= ZOBRIST_CELLS[side][idx] ^ ZOBRIST_ACTIVE[self.active + 1] ^ ZOBRIST_ACTIVE[nxt + 1]
+        self.active = nxt
+
+    def unmake(self):
+        """Revert the most recent make()."""
+        (idx, side, self.active, self.won[side], self.drawn, self.hash, old_own, old_opp,
+         self.threats[0], self.threats[1], self.global_threats[0], self.global_threats[1]) = self.history.pop()
+        self.cells[side] &= ~(1 << idx)
+        b = idx // 9
+        self.board_threats[side * 9 + b] = old_own
+        self.board_threats[(side ^ 1) * 9 + b] = old_opp
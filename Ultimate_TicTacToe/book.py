@@ -0,0 +1,124 @@
+"""
+On-disk position tables for Ultimate Tic-Tac-Toe: the opening book and the
+endgame cache of solved late-game positions.
+
+File format (little endian), version FORMAT_VERSION:
+    header  magic (4s) | version (H) | param (H) | key check (I) | count (I)
+    entries key (Q) | score (h) | move (b) | depth (B), sorted by key
+
+param is the book's ply limit or the cache's open-cell limit. key check is a
+fingerprint of the Zobrist keys, so a table built with different keys is
+rejected instead of silently missing. Tables are read through mmap and
+binary-searched in place, so opening a large cache costs nothing up front.
+"""
+import mmap
+import os
+import struct
+
+from bitboard import SYMMETRIES, SYMMETRY_CELLS, ZOBRIST_ACTIVE, ZOBRIST_CELLS
+
+FORMAT_VERSION = 1
+BOOK_MAGIC = b'UTTB'
+ENDGAME_MAGIC = b'UTTE'
+
+HEADER = struct.Struct('<4sHHII')
+ENTRY = struct.Struct('<QhbB')
+KEY_CHECK = (ZOBRIST_ACTIVE[0] ^ ZOBRIST_CELLS[1][80]) & 0xFFFFFFFF
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOOK_FILE = os.path.join(HERE, 'opening_book.bin')
+ENDGAME_FILE = os.path.join(HERE, 'endgame_cache.bin')
+
+
+def write_table(path, magic, param, entries):
+    """Write {key: (score, move, depth)} as a sorted table file."""
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(magic, FORMAT_VERSION, param, KEY_CHECK, len(entries)))
+        for key in sorted(entries):
+            score, move, depth = entries[key]
+            file.write(ENTRY.pack(key, score, move, depth))
+
+
+def canonical(board):
+    """Return (key, symmetry) of the symmetric variant with the smallest hash."""
+    return min((board.transformed(sym).hash, sym) for sym in range(len(SYMMETRIES)))
+
+
+class PositionTable:
+    """Read-only, memory-mapped table with lookup counters."""
+
+    def __init__(self, path, magic):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        found, version, self.param, key_check, self.count = HEADER.unpack_from(self.data, 0)
+        if found != magic:
+            raise ValueError(f"{path}: not a {magic.decode()} table")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+        if key_check != KEY_CHECK:
+            raise ValueError(f"{path}: built with different Zobrist keys")
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.lookups = 0
+        self.hits = 0
+
+    def close(self):
+        self.data.close()
+
+    def lookup(self, key):
+        """Return (score, move, depth) for key, or None."""
+        self.lookups += 1
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * ENTRY.size
+            found = struct.unpack_from('<Q', self.data, offset)[0]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                self.hits += 1
+                return ENTRY.unpack_from(self.data, offset)[1:]
+        return None
+
+    def entries(self):
+        """Yield every (key, score, move, depth) in key order."""
+        for i in range(self.count):
+            yield ENTRY.unpack_from(self.data, HEADER.size + i * ENTRY.size)
+
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class OpeningBook(PositionTable):
+    """Book moves keyed by canonical (symmetry-reduced) position; param is the ply limit."""
+
+    def __init__(self, path=BOOK_FILE):
+        super().__init__(path, BOOK_MAGIC)
+
+    def probe(self, board):
+        """Return (score, move index, depth) for board, or None."""
+        if (board.cells[0] | board.cells[1]).bit_count() > self.param:
+            return None
+        key, sym = canonical(board)
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        score, move, depth = entry
+        # The stored move is in the canonical frame; map it back.
+        return score, SYMMETRY_CELLS[sym].index(move), depth
+
+
+class EndgameCache(PositionTable):
+    """Exact values of solved positions; param is the most open cells a stored position has."""
+
+    def __init__(self, path=ENDGAME_FILE):
+        super().__init__(path, ENDGAME_MAGIC)
+
+
+def load_optional(cls, path):
+    """Open a table if its file exists, else return None."""
+    return cls(path) if os.path.exists(path) else None
@@ -0,0 +1,137 @@
+"""
+Offline builder for the opening book and the endgame cache (see book.py).
+
+  python build_book.py book [--plies 2] [--depth 8] [--out opening_book.bin]
+      Deep-searches every position within --plies of the start, one per
+      symmetry class, and stores the best move.
+
+  python build_book.py endgame [--games 40] [--max-open 12] [--seed 1] [--append]
+      Plays seeded games (random opening, shallow minimax after) and solves
+      every position with at most --max-open empty cells in unfinished boards
+      by searching to the end of the game.
+
+  python build_book.py info FILE
+      Prints the header and entry count of a table.
+"""
+import argparse
+import math
+import random
+import time
+
+from bitboard import BitBoard
+from book import (BOOK_FILE, BOOK_MAGIC, ENDGAME_FILE, ENDGAME_MAGIC, HEADER, EndgameCache,
+                  OpeningBook, canonical, write_table)
+from engine import AI_SIDE, TT_SIZE_BITS, minimax
+from ttable import TranspositionTable
+
+
+def opening_positions(plies):
+    """Canonical boards of every position reachable within plies moves."""
+    frontier = {canonical(BitBoard())[0]: BitBoard()}
+    positions = dict(frontier)
+    for _ in range(plies):
+        nxt = {}
+        for board in frontier.values():
+            if board.game_over():
+                continue
+            side = board.side_to_move()
+            for move in board.moves():
+                child = board.copy()
+                child.make(move, side)
+                key, sym = canonical(child)
+                if key not in positions and key not in nxt:
+                    nxt[key] = child.transformed(sym)
+        positions.update(nxt)
+        frontier = nxt
+    return positions
+
+
+def build_book(args):
+    positions = opening_positions(args.plies)
+    table = TranspositionTable(TT_SIZE_BITS)
+    entries = {}
+    start = time.perf_counter()
+    for i, (key, board) in enumerate(positions.items()):
+        table.new_search()
+        maximizing = board.side_to_move() == AI_SIDE
+        score, move = minimax(board, args.depth, -math.inf, math.inf, maximizing, table=table)
+        entries[key] = (score, move, args.depth)
+        print(f"\r{i + 1}/{len(positions)} positions  {time.perf_counter() - start:7.1f}s", end="", flush=True)
+    print()
+    write_table(args.out, BOOK_MAGIC, args.plies, entries)
+    print(f"wrote {len(entries)} book entries to {args.out}")
+
+
+def build_endgame(args):
+    entries = {}
+    if args.append:
+        existing = EndgameCache(args.out)
+        entries = {key: (score, move, depth) for key, score, move, depth in existing.entries()}
+        existing.close()
+    rng = random.Random(args.seed)
+    table = TranspositionTable(TT_SIZE_BITS)
+    solved_before = len(entries)
+    start = time.perf_counter()
+    for game in range(args.games):
+        board = BitBoard()
+        plies = 0
+        while not board.game_over():
+            side = board.side_to_move()
+            maximizing = side == AI_SIDE
+            open_cells = board.open_cells()
+            if open_cells <= args.max_open and board.hash not in entries:
+                table.new_search()
+                score, move = minimax(board, open_cells, -math.inf, math.inf, maximizing, table=table)
+                entries[board.hash] = (score, move, open_cells)
+            if plies < args.random_plies:
+                move = rng.choice(board.moves())
+            else:
+                move = minimax(board, args.play_depth, -math.inf, math.inf, maximizing)[1]
+            board.make(move, side)
+            plies += 1
+        print(f"\rgame {game + 1}/{args.games}  solved {len(entries) - solved_before}  "
+              f"{time.perf_counter() - start:7.1f}s", end="", flush=True)
+    print()
+    write_table(args.out, ENDGAME_MAGIC, args.max_open, entries)
+    print(f"wrote {len(entries)} solved positions to {args.out}")
+
+
+def show_info(args):
+    with open(args.file, 'rb') as file:
+        magic, version, param, key_check, count = HEADER.unpack(file.read(HEADER.size))
+    print(f"{args.file}: magic={magic.decode()} version={version} param={param} "
+          f"key_check={key_check:#010x} entries={count}")
+    cls = OpeningBook if magic == BOOK_MAGIC else EndgameCache
+    cls(args.file).close()  # Validates the header against this build.
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    book = sub.add_parser("book")
+    book.add_argument("--plies", type=int, default=2)
+    book.add_argument("--depth", type=int, default=8)
+    book.add_argument("--out", default=BOOK_FILE)
+    book.set_defaults(run=build_book)
+
+    endgame = sub.add_parser("endgame")
+    endgame.add_argument("--games", type=int, default=40)
+    endgame.add_argument("--max-open", type=int, default=12)
+    endgame.add_argument("--random-plies", type=int, default=8)
+    endgame.add_argument("--play-depth", type=int, default=3)
+    endgame.add_argument("--seed", type=int, default=1)
+    endgame.add_argument("--append", action="store_true", help="merge into the existing --out file")
+    endgame.add_argument("--out", default=ENDGAME_FILE)
+    endgame.set_defaults(run=build_endgame)
+
+    info = sub.add_parser("info")
+    info.add_argument("file")
+    info.set_defaults(run=show_info)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
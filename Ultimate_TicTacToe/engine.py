@@ -0,0 +1,532 @@
+"""
+Game logic and search for Ultimate Tic-Tac-Toe, importable without tkinter.
+
+q3.py builds the GUI on top of this module; the benchmarks, arena and
+self-play harness use it directly.
+"""
+import copy
+import math
+import queue
+import threading
+import time
+
+from bitboard import PLAYERS, OPEN_CELLS, FULL_BOARD, WIN_TABLE
+from ttable import TranspositionTable, EXACT, LOWER, UPPER
+
+# ---------------------------
+# Constants and Global Config
+# ---------------------------
+# Players
+HUMAN = 'X'
+AI = 'O'
+
+# Side indices of the players on the bitboard.
+HUMAN_SIDE = PLAYERS.index(HUMAN)
+AI_SIDE = PLAYERS.index(AI)
+
+# Fixed search depth used by the benchmarks; the GUI searches by time budget.
+SEARCH_DEPTH = 5
+# Transposition table size as a power of two (2**18 entries is about 4 MB).
+TT_SIZE_BITS = 18
+# Wall-clock budget (ms) for the AI's iterative-deepening search.
+AI_TIME_BUDGET_MS = 800
+MAX_SEARCH_DEPTH = 81
+WIN_SCORE = 1000
+
+# Evaluation weights; the largest possible total stays well below WIN_SCORE.
+BOARD_WEIGHT = 20           # Per small board won.
+GLOBAL_THREAT_WEIGHT = 30   # Per open global line holding two won boards.
+LOCAL_THREAT_WEIGHT = 3     # Per open two-in-a-row line inside an unfinished board.
+
+# Move-ordering scores (higher is searched first).
+ORDER_WIN_GAME = 1000       # Completes a global line.
+ORDER_WIN_BOARD = 100       # Wins the small board.
+ORDER_BLOCK = 50            # Takes the cell that completes an opponent line.
+ORDER_FREE_MOVE = -40       # Sends the opponent to a finished board (free move).
+ORDER_GIFT = -20            # Sends the opponent to a board where they have a threat.
+
+# ---------------------------
+# Helper Functions for CSP & Game Logic
+# ---------------------------
+def check_win(board):
+    """Check win condition for a 3x3 board."""
+    lines = []
+    # Rows and columns.
+    for i in range(3):
+        lines.append(board[i])
+        lines.append([board[r][i] for r in range(3)])
+    # Diagonals.
+    lines.append([board[i][i] for i in range(3)])
+    lines.append([board[i][2-i] for i in range(3)])
+    
+    for line in lines:
+        if line[0] is not None and all(cell == line[0] for cell in line):
+            return line[0]
+    return None
+
+def board_full(board):
+    return all(cell is not None for row in board for cell in row)
+
+def global_winner(global_state):
+    """Determine winner on the global board based on the small boards."""
+    global_board = [[global_state[gr][gc]['winner'] for gc in range(3)] for gr in range(3)]
+    return check_win(global_board)
+
+def available_moves(state, active_board):
+    """
+    Return all valid moves as (G_r, G_c, L_r, L_c).
+    Only cells in small boards not yet finished are allowed.
+    """
+    moves = []
+    if active_board is not None:
+        gr, gc = active_board
+        if state[gr][gc]['winner'] is None:
+            board = state[gr][gc]['cells']
+            if not board_full(board):
+                for lr in range(3):
+                    for lc in range(3):
+                        if board[lr][lc] is None:
+                            moves.append((gr, gc, lr, lc))
+                if moves:
+                    return moves  # Forced moves in the active board.
+    
+    # Otherwise, allow any empty cell in unfinished boards.
+    for gr in range(3):
+        for gc in range(3):
+            if state[gr][gc]['winner'] is None:
+                board = state[gr][gc]['cells']
+                for lr in range(3):
+                    for lc in range(3):
+                        if board[lr][lc] is None:
+                            moves.append((gr, gc, lr, lc))
+    return moves
+
+def apply_move(state, move, player):
+    """
+    Apply a move to the board state.
+    move: (G_r, G_c, L_r, L_c)
+    Returns a tuple (new_state, next_active_board).
+    """
+    new_state = copy.deepcopy(state)
+    gr, gc, lr, lc = move
+    new_state[gr][gc]['cells'][lr][lc] = player
+
+    board = new_state[gr][gc]['cells']
+    winner = check_win(board)
+    if winner:
+        new_state[gr][gc]['winner'] = winner
+    elif board_full(board):
+        new_state[gr][gc]['winner'] = 'D'  # D for draw
+
+    next_board = (lr, lc)
+    if new_state[next_board[0]][next_board[1]]['winner'] is not None:
+        next_board = None
+    return new_state, next_board
+
+def forward_check(state, move, player):
+    gr, gc, lr, lc = move
+    return state[gr][gc]['cells'][lr][lc] is None
+
+def ac3(state):
+    # For our case, we assume arc consistency is maintained by available_moves.
+    return True
+
+def evaluate_state(board):
+    """
+    Evaluate a BitBoard for the minimax algorithm.
+    Returns a large positive value if AI is winning, negative if HUMAN is winning.
+    Every term is read from counters that make/unmake keep up to date.
+    """
+    gw = board.winner()
+    if gw == AI_SIDE:
+        return WIN_SCORE
+    elif gw == HUMAN_SIDE:
+        return -WIN_SCORE
+
+    won, threats, global_threats = board.won, board.threats, board.global_threats
+    open_cells = OPEN_CELLS[won[0] | won[1] | board.drawn]
+    return (BOARD_WEIGHT * (won[AI_SIDE].bit_count() - won[HUMAN_SIDE].bit_count())
+            + GLOBAL_THREAT_WEIGHT * (global_threats[AI_SIDE] - global_threats[HUMAN_SIDE])
+            + LOCAL_THREAT_WEIGHT * (threats[AI_SIDE] - threats[HUMAN_SIDE])
+            + (board.cells[AI_SIDE] & open_cells).bit_count() - (board.cells[HUMAN_SIDE] & open_cells).bit_count())
+
+def move_score(board, idx, side):
+    """Cheap ordering score: wins and blocks first, handing out free moves last."""
+    b = idx // 9
+    shift = b * 9
+    local = idx - shift
+    bit = 1 << local
+    own = (board.cells[side] >> shift) & FULL_BOARD
+    opp = (board.cells[side ^ 1] >> shift) & FULL_BOARD
+    finished = board.won[0] | board.won[1] | board.drawn
+    score = 0
+    if WIN_TABLE[own | bit]:
+        if WIN_TABLE[board.won[side] | (1 << b)]:
+            return ORDER_WIN_GAME
+        score += ORDER_WIN_BOARD
+        finished |= 1 << b
+    elif own | opp | bit == FULL_BOARD:
+        finished |= 1 << b
+    if WIN_TABLE[opp | bit]:
+        score += ORDER_BLOCK
+    if (finished >> local) & 1:
+        score += ORDER_FREE_MOVE
+    elif board.board_threats[(side ^ 1) * 9 + local]:
+        score += ORDER_GIFT
+    return score
+
+def ordered_moves(board, side):
+    """Legal moves sorted by move_score, ties kept in index order."""
+    moves = board.moves()
+    moves.sort(key=lambda move: move_score(board, move, side), reverse=True)
+    return moves
+
+def game_over(state):
+    if global_winner(state) is not None:
+        return True
+    # A board without a winner always has an empty cell (a full one is marked 'D').
+    return all(state[gr][gc]['winner'] is not None for gr in range(3) for gc in range(3))
+
+class SearchStats:
+    """Counters filled in by a search when passed as its stats argument."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.interior = 0       # Nodes whose moves were searched.
+        self.moves = 0          # Legal moves at those nodes.
+        self.cutoffs = 0        # Interior nodes that ended in a beta cutoff.
+        self.first_cutoffs = 0  # ... of which on the first move tried.
+
+    def branching_factor(self):
+        return self.moves / self.interior if self.interior else 0.0
+
+    def cutoff_rate(self):
+        return self.cutoffs / self.interior if self.interior else 0.0
+
+    def first_cutoff_rate(self):
+        return self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def merge(self, other):
+        self.nodes += other.nodes
+        self.interior += other.interior
+        self.moves += other.moves
+        self.cutoffs += other.cutoffs
+        self.first_cutoffs += other.first_cutoffs
+
+class SearchTimeout(Exception):
+    """Raised inside minimax when the SearchContext deadline has passed."""
+
+class SearchContext:
+    """
+    Per-move state shared by the iterations of iterative_deepening:
+    principal-variation moves from the last completed depth, two killer
+    moves per ply, a history score per (side, cell) and the deadline.
+    The deadline is only enforced once armed, while cancel() stops the
+    search at any depth; both may be changed from another thread.
+    """
+
+    CHECK_EVERY = 256   # Nodes between clock reads.
+
+    def __init__(self, root_ply=0, deadline=math.inf):
+        self.root_ply = root_ply
+        self.deadline = deadline
+        self.armed = False
+        self.cancelled = False
+        self.pv_moves = {}
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = [[0] * 81, [0] * 81]
+        self.ticks = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def tick(self):
+        self.ticks += 1
+        if not self.ticks % self.CHECK_EVERY:
+            if self.cancelled or (self.armed and time.perf_counter() > self.deadline):
+                raise SearchTimeout()
+
+    def order(self, board, moves, tt_move, side):
+        """PV move, TT move and killers first, the rest by move_score then history."""
+        first = []
+        for move in (self.pv_moves.get(board.hash), tt_move, *self.killers[len(board.history) - self.root_ply]):
+            if move is not None and move in moves and move not in first:
+                first.append(move)
+        history = self.history[side]
+        rest = [move for move in moves if move not in first]
+        rest.sort(key=lambda move: (move_score(board, move, side), history[move]), reverse=True)
+        return first + rest
+
+    def record_cutoff(self, board, move, side, depth):
+        killers = self.killers[len(board.history) - self.root_ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[side][move] += depth * depth
+
+    def set_pv(self, board, root_move, table):
+        """Remember the principal variation: the root move, then TT best moves."""
+        self.pv_moves = {}
+        line = board.copy()
+        move, side = root_move, line.side_to_move()
+        while move is not None and move in line.moves() and line.hash not in self.pv_moves:
+            self.pv_moves[line.hash] = move
+            line.make(move, side)
+            side ^= 1
+            entry = table.probe(line.hash) if not line.game_over() else None
+            move = entry[3] if entry is not None else None
+
+# ---------------------------
+# Minimax with Alpha-Beta Pruning
+# ---------------------------
+def minimax(board, depth, alpha, beta, maximizing_player, stats=None, table=None, context=None, endgame=None):
+    """
+    Alpha-beta search on a BitBoard using make/unmake.
+    Returns (score, move index); convert the index with index_to_move.
+    With a TranspositionTable, stored bounds may cut the search short and the
+    stored best move is searched first. With a SearchContext, moves are
+    ordered by PV/killer/history and SearchTimeout is raised at the deadline.
+    With an EndgameCache, solved positions return their stored exact value.
+    """
+    if stats is not None:
+        stats.nodes += 1
+    if depth == 0 or board.game_over():
+        return evaluate_state(board), None
+    if endgame is not None and board.open_cells() <= endgame.param:
+        solved = endgame.lookup(board.hash)
+        if solved is not None:
+            return solved[0], solved[1]
+
+    side = AI_SIDE if maximizing_player else HUMAN_SIDE
+    moves = board.moves()
+    alpha_orig, beta_orig = alpha, beta
+    tt_move = None
+    if table is not None:
+        entry = table.probe(board.hash)
+        if entry is not None and entry[3] in moves:
+            tt_depth, tt_flag, tt_score, tt_move = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_score, tt_move
+                if tt_flag == LOWER:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if beta <= alpha:
+                    return tt_score, tt_move
+
+    if context is not None:
+        context.tick()
+        moves = context.order(board, moves, tt_move, side)
+    else:
+        # Just above the leaves a child costs about as much as scoring it.
+        if depth > 1:
+            moves.sort(key=lambda move: move_score(board, move, side), reverse=True)
+        if tt_move is not None:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+    best_move = None
+
+    if maximizing_player:
+        best_eval = -math.inf
+        for move in moves:
+            board.make(move, AI_SIDE)
+            eval_score, _ = minimax(board, depth - 1, alpha, beta, False, stats, table, context, endgame)
+            board.unmake()
+            if eval_score > best_eval:
+                best_eval = eval_score
+                best_move = move
+            alpha = max(alpha, eval_score)
+            if beta <= alpha:
+                break
+    else:
+        best_eval = math.inf
+        for move in moves:
+            board.make(move, HUMAN_SIDE)
+            eval_score, _ = minimax(board, depth - 1, alpha, beta, True, stats, table, context, endgame)
+            board.unmake()
+            if eval_score < best_eval:
+                best_eval = eval_score
+                best_move = move
+            beta = min(beta, eval_score)
+            if beta <= alpha:
+                break
+
+    if beta <= alpha:
+        if context is not None:
+            context.record_cutoff(board, best_move, side, depth)
+        if stats is not None:
+            stats.cutoffs += 1
+            if best_move == moves[0]:
+                stats.first_cutoffs += 1
+    if stats is not None:
+        stats.interior += 1
+        stats.moves += len(moves)
+    if table is not None:
+        if best_eval <= alpha_orig:
+            flag = UPPER
+        elif best_eval >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(board.hash, depth, flag, best_eval, best_move)
+    return best_eval, best_move
+
+# ---------------------------
+# Iterative Deepening with a Time Budget
+# ---------------------------
+def iterative_deepening(board, budget_ms, table=None, maximizing_player=True, max_depth=MAX_SEARCH_DEPTH,
+                        stats=None, context=None, book=None, endgame=None):
+    """
+    Search depth 1, 2, 3... until budget_ms of wall-clock time is spent.
+    Returns (score, move index, completed depth) from the last depth that
+    finished; depth 1 always runs to completion unless the context is
+    cancelled, in which case the move may be None. A position found in the
+    OpeningBook is answered from it without searching.
+    """
+    if book is not None:
+        entry = book.probe(board)
+        if entry is not None and entry[1] in board.moves():
+            return entry
+    if table is None:
+        table = TranspositionTable(TT_SIZE_BITS)
+    table.new_search()
+    root_ply = len(board.history)
+    if context is None:
+        context = SearchContext(root_ply)
+    context.root_ply = root_ply
+    # A deadline already set on the context (e.g. by ponderhit) is kept.
+    context.deadline = min(context.deadline, time.perf_counter() + budget_ms / 1000.0)
+    empty_cells = 81 - board.cells[0].bit_count() - board.cells[1].bit_count()
+    best_score, best_move, completed = None, None, 0
+
+    for depth in range(1, min(max_depth, empty_cells) + 1):
+        try:
+            score, move = minimax(board, depth, -math.inf, math.inf, maximizing_player, stats, table, context,
+                                  endgame)
+        except SearchTimeout:
+            while len(board.history) > root_ply:
+                board.unmake()
+            break
+        best_score, best_move, completed = score, move, depth
+        # The first iteration is unbounded so a move is always available.
+        context.armed = True
+        if move is None or abs(score) >= WIN_SCORE or len(board.moves()) == 1:
+            break
+        context.set_pv(board, move, table)
+        if context.cancelled or time.perf_counter() > context.deadline:
+            break
+    return best_score, best_move, completed
+
+# ---------------------------
+# Background Search Worker
+# ---------------------------
+class SearchWorker(threading.Thread):
+    """
+    Runs iterative_deepening on a private copy of the board in a daemon
+    thread and puts (score, move index, depth) on the results queue.
+    Given an engine with a search(board, budget_ms, context) method (such
+    as MCTS), that engine picks the move instead.
+    A pondering worker searches with no deadline until ponderhit() gives it
+    a real budget or cancel() stops it.
+    """
+
+    def __init__(self, board, budget_ms, table, maximizing_player=True, engine=None, book=None, endgame=None):
+        super().__init__(daemon=True)
+        self.board = board.copy()
+        self.root_hash = board.hash
+        self.budget_ms = budget_ms
+        self.table = table
+        self.maximizing_player = maximizing_player
+        self.engine = engine
+        self.book = book
+        self.endgame = endgame
+        self.context = SearchContext()
+        self.results = queue.Queue(maxsize=1)
+
+    def run(self):
+        if self.engine is not None:
+            self.results.put(self.engine.search(self.board, self.budget_ms, self.context))
+            return
+        self.results.put(iterative_deepening(self.board, self.budget_ms, self.table, self.maximizing_player,
+                                             context=self.context, book=self.book, endgame=self.endgame))
+
+    def ponderhit(self, budget_ms):
+        """Turn a pondering search into the real one, budget counted from now."""
+        self.context.deadline = time.perf_counter() + budget_ms / 1000.0
+
+    def cancel(self, wait=True):
+        self.context.cancel()
+        if wait:
+            self.join()
+
+    def poll(self):
+        """Return the result if the search has finished, else None."""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+# ---------------------------
+# Reference Search on the Nested-Dict State (deepcopy per node)
+# ---------------------------
+def evaluate_state_reference(state):
+    """Original mark-counting evaluation on the nested-dict state."""
+    gw = global_winner(state)
+    if gw == AI:
+        return 1000
+    elif gw == HUMAN:
+        return -1000
+
+    score = 0
+    for gr in range(3):
+        for gc in range(3):
+            if state[gr][gc]['winner'] is None:
+                board = state[gr][gc]['cells']
+                for row in board:
+                    score += row.count(AI) - row.count(HUMAN)
+    return score
+
+def minimax_reference(state, active_board, depth, alpha, beta, maximizing_player, stats=None):
+    """Original deepcopy-based search, kept as a correctness and speed baseline."""
+    if stats is not None:
+        stats.nodes += 1
+    if depth == 0 or game_over(state):
+        return evaluate_state_reference(state), None
+    
+    moves = available_moves(state, active_board)
+    best_move = None
+    
+    if maximizing_player:
+        max_eval = -math.inf
+        for move in moves:
+            if not forward_check(state, move, AI):
+                continue
+            new_state, next_board = apply_move(state, move, AI)
+            if not ac3(new_state):
+                continue
+            eval_score, _ = minimax_reference(new_state, next_board, depth - 1, alpha, beta, False, stats)
+            if eval_score > max_eval:
+                max_eval = eval_score
+                best_move = move
+            alpha = max(alpha, eval_score)
+            if beta <= alpha:
+                break
+        return max_eval, best_move
+    else:
+        min_eval = math.inf
+        for move in moves:
+            if not forward_check(state, move, HUMAN):
+                continue
+            new_state, next_board = apply_move(state, move, HUMAN)
+            if not ac3(new_state):
+                continue
+            eval_score, _ = minimax_reference(new_state, next_board, depth - 1, alpha, beta, True, stats)
+            if eval_score < min_eval:
+                min_eval = eval_score
+                best_move = move
+            beta = min(beta, eval_score)
+            if beta <= alpha:
+                break
+        return min_eval, best_move
@@ -0,0 +1,223 @@
+"""
+UCT / Monte Carlo Tree Search player for Ultimate Tic-Tac-Toe.
+
+The tree lives in a preallocated node pool (parallel lists indexed by node
+id) so no objects are created per node; the children of a node occupy one
+contiguous block of ids. Playouts run on plain integers copied out of the
+BitBoard. Between turns the subtree of the position actually reached is kept
+and searched further instead of starting from an empty tree.
+"""
+import math
+import random
+import time
+
+from bitboard import FREE, FULL_BOARD, OPEN_CELLS, WIN_TABLE, O_SIDE, X_SIDE
+
+# Exploration constant of the UCT formula.
+UCT_C = 1.4
+# Nodes in the pool; a full pool stops expansion until the tree is reset.
+POOL_SIZE = 1 << 18
+# Reset instead of reusing the tree when more than this share of the pool is used.
+REUSE_LIMIT = 0.75
+CHECK_EVERY = 64        # Playouts between clock reads.
+
+
+def random_playout(board, rng):
+    """Play uniformly random moves to the end; return the winning side or None."""
+    x, o = board.cells
+    wx, wo = board.won
+    drawn = board.drawn
+    active = board.active
+    side = board.side_to_move()
+    rand = rng.random
+    while True:
+        if WIN_TABLE[wx]:
+            return X_SIDE
+        if WIN_TABLE[wo]:
+            return O_SIDE
+        finished = wx | wo | drawn
+        if finished == FULL_BOARD:
+            return None
+        occupied = x | o
+        # Rejection-sample a legal cell from the active board or the whole grid.
+        if active != FREE:
+            base = active * 9
+            while True:
+                idx = base + int(rand() * 9)
+                if not (occupied >> idx) & 1:
+                    break
+        else:
+            legal = ~occupied & OPEN_CELLS[finished]
+            while True:
+                idx = int(rand() * 81)
+                if (legal >> idx) & 1:
+                    break
+        b = idx // 9
+        shift = b * 9
+        if side == X_SIDE:
+            x |= 1 << idx
+            if WIN_TABLE[(x >> shift) & FULL_BOARD]:
+                wx |= 1 << b
+            elif ((x | o) >> shift) & FULL_BOARD == FULL_BOARD:
+                drawn |= 1 << b
+        else:
+            o |= 1 << idx
+            if WIN_TABLE[(o >> shift) & FULL_BOARD]:
+                wo |= 1 << b
+            elif ((x | o) >> shift) & FULL_BOARD == FULL_BOARD:
+                drawn |= 1 << b
+        nxt = idx % 9
+        active = FREE if ((wx | wo | drawn) >> nxt) & 1 else nxt
+        side ^= 1
+
+
+class MCTS:
+    """
+    UCT search with a reusable node pool. search() has the same shape as
+    engine.iterative_deepening: it takes a board and a budget in ms and returns
+    (score, move index, playouts), where score is the chosen move's win rate.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, c=UCT_C, seed=None):
+        self.pool_size = pool_size
+        self.c = c
+        self.rng = random.Random(seed)
+        self.parent = [0] * pool_size
+        self.move = [0] * pool_size
+        self.key = [0] * pool_size           # Zobrist hash of the node's position.
+        self.first_child = [0] * pool_size
+        self.child_count = [0] * pool_size
+        self.visits = [0] * pool_size
+        self.wins = [0.0] * pool_size        # From the view of the side that moved into the node.
+        self.used = 0
+        self.root = None
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+        self.reused = False
+
+    def reset(self, board):
+        """Drop the tree (the pool itself is kept) and start from board."""
+        self.used = 1
+        self.root = 0
+        self.parent[0] = -1
+        self.move[0] = -1
+        self.key[0] = board.hash
+        self.first_child[0] = 0
+        self.child_count[0] = 0
+        self.visits[0] = 0
+        self.wins[0] = 0.0
+
+    def find(self, key):
+        """Return the node id of key among the root and its next two plies."""
+        frontier = [self.root]
+        for _ in range(3):
+            nxt = []
+            for node in frontier:
+                if self.key[node] == key:
+                    return node
+                first = self.first_child[node]
+                nxt.extend(range(first, first + self.child_count[node]))
+            frontier = nxt
+        return None
+
+    def set_root(self, board):
+        """Reuse the subtree for board if it is still in the tree, else reset."""
+        node = None
+        if self.root is not None and self.used < self.pool_size * REUSE_LIMIT:
+            node = self.find(board.hash)
+        self.reused = node is not None
+        if node is None:
+            self.reset(board)
+        else:
+            self.root = node
+
+    def expand(self, node, board):
+        moves = board.moves()
+        if self.used + len(moves) > self.pool_size:
+            return False
+        first = self.used
+        side = board.side_to_move()
+        for i, move in enumerate(moves):
+            child = first + i
+            self.parent[child] = node
+            self.move[child] = move
+            board.make(move, side)
+            self.key[child] = board.hash
+            board.unmake()
+            self.first_child[child] = 0
+            self.child_count[child] = 0
+            self.visits[child] = 0
+            self.wins[child] = 0.0
+        self.first_child[node] = first
+        self.child_count[node] = len(moves)
+        self.used += len(moves)
+        return True
+
+    def select_child(self, node):
+        first = self.first_child[node]
+        log_n = math.log(self.visits[node])
+        best, best_value = first, -1.0
+        visits, wins, c = self.visits, self.wins, self.c
+        for child in range(first, first + self.child_count[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            value = wins[child] / n + c * math.sqrt(log_n / n)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def iterate(self, board):
+        """One selection / expansion / playout / backpropagation pass."""
+        node = self.root
+        depth = 0
+        while self.child_count[node]:
+            node = self.select_child(node)
+            board.make(self.move[node], board.side_to_move())
+            depth += 1
+        if not board.game_over() and self.visits[node] and self.expand(node, board):
+            node = self.first_child[node]
+            board.make(self.move[node], board.side_to_move())
+            depth += 1
+        winner = board.winner() if board.game_over() else random_playout(board, self.rng)
+        # The side that moved into a node is the opposite of the side to move there.
+        mover = board.side_to_move() ^ 1
+        for _ in range(depth):
+            board.unmake()
+        for _ in range(depth + 1):
+            self.visits[node] += 1
+            if winner is None:
+                self.wins[node] += 0.5
+            elif winner == mover:
+                self.wins[node] += 1.0
+            mover ^= 1
+            node = self.parent[node]
+        self.playouts += 1
+
+    def search(self, board, budget_ms, context=None):
+        """Run playouts until budget_ms passes or the context is cancelled."""
+        board = board.copy()
+        self.set_root(board)
+        if board.game_over():
+            return None, None, 0
+        self.playouts = 0
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0
+        if context is not None:
+            context.deadline = min(context.deadline, deadline)
+        while True:
+            self.iterate(board)
+            if not self.playouts % CHECK_EVERY:
+                now = time.perf_counter()
+                if context is not None:
+                    if context.cancelled or now > context.deadline:
+                        break
+                elif now > deadline:
+                    break
+        self.playouts_per_second = self.playouts / max(time.perf_counter() - start, 1e-9)
+        if not self.child_count[self.root]:
+            self.expand(self.root, board)
+        first = self.first_child[self.root]
+        children = range(first, first + self.child_count[self.root])
+        best = max(children, key=self.visits.__getitem__)
+        return self.wins[best] / max(self.visits[best], 1), self.move[best], self.playouts
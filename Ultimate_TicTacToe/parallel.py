@@ -0,0 +1,103 @@
+"""
+Root-parallel alpha-beta for Ultimate Tic-Tac-Toe over a ProcessPoolExecutor.
+
+Root moves are searched as separate tasks. With young-brothers-wait (ybw) the
+eldest root move is searched first on its own so the shared bound is already
+tight when the younger brothers are dispatched together. Workers share the
+best root score found so far, and the position in move order of the move that
+scored it, through a multiprocessing.Array and open every task's window from
+it. A move ordered before the current best gets a window one point wider so a
+tie is still scored exactly, which keeps the chosen move identical to serial
+minimax at the same depth. The serial minimax in engine stays the default.
+"""
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import AI_SIDE, HUMAN_SIDE, SearchStats, evaluate_state, minimax, ordered_moves
+
+# [best root score so far from the root player's point of view, order of the
+# move that scored it]; installed in each worker by _init_worker.
+_shared_best = None
+
+
+def _init_worker(shared_best):
+    global _shared_best
+    _shared_best = shared_best
+
+
+def _search_root_move(board, move, order, depth, maximizing_player):
+    """Search the order-th root move in a worker; returns (score, nodes)."""
+    stats = SearchStats()
+    board.make(move, AI_SIDE if maximizing_player else HUMAN_SIDE)
+    with _shared_best.get_lock():
+        best, best_order = _shared_best[0], _shared_best[1]
+    if order < best_order:
+        best -= 1
+    if maximizing_player:
+        score, _ = minimax(board, depth - 1, best, math.inf, False, stats)
+        mine = score
+    else:
+        score, _ = minimax(board, depth - 1, -math.inf, -best, True, stats)
+        mine = -score
+    with _shared_best.get_lock():
+        if mine > _shared_best[0] or (mine == _shared_best[0] and order < _shared_best[1]):
+            _shared_best[0], _shared_best[1] = mine, order
+    return score, stats.nodes
+
+
+class ParallelSearcher:
+    """Owns a process pool; use as a context manager or call close()."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.shared_best = multiprocessing.Array('d', 2)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(self.shared_best,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def search(self, board, depth, maximizing_player=True, ybw=True, stats=None):
+        """Same contract as engine.minimax with a full window: (score, move index)."""
+        if depth == 0 or board.game_over():
+            return evaluate_state(board), None
+        # Root moves in minimax's own order, which is only sorted above depth 1.
+        if depth > 1:
+            moves = ordered_moves(board, AI_SIDE if maximizing_player else HUMAN_SIDE)
+        else:
+            moves = board.moves()
+        self.shared_best[0], self.shared_best[1] = -math.inf, math.inf
+        scores = {}
+
+        def submit(batch):
+            futures = {self.pool.submit(_search_root_move, board.copy(), move, moves.index(move), depth,
+                                        maximizing_player): move
+                       for move in batch}
+            for future in as_completed(futures):
+                score, nodes = future.result()
+                scores[futures[future]] = score
+                if stats is not None:
+                    stats.nodes += nodes
+
+        if ybw and len(moves) > 1:
+            submit(moves[:1])
+            submit(moves[1:])
+        else:
+            submit(moves)
+        if stats is not None:
+            stats.nodes += 1
+
+        # First move in minimax's root order with the best score, as minimax picks it.
+        best_move = None
+        for move in moves:
+            if best_move is None or (scores[move] > scores[best_move] if maximizing_player
+                                     else scores[move] < scores[best_move]):
+                best_move = move
+        return scores[best_move], best_move
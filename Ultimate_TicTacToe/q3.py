@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
-import copy
 import math
 
+from bitboard import BitBoard, index_to_move
+from engine import (HUMAN, AI, HUMAN_SIDE, AI_TIME_BUDGET_MS, TT_SIZE_BITS, SearchWorker,
+                    apply_move, available_moves, global_winner)
+from ttable import TranspositionTable
+from mcts import MCTS
+from book import BOOK_FILE, ENDGAME_FILE, EndgameCache, OpeningBook, load_optional
+
 # ---------------------------
 # Constants and Global Config
 # ---------------------------
@@ -11,12 +17,10 @@ BOARD_PADDING = 5       # Padding between small boards.
 SMALL_BOARD_SIZE = 3    # 3x3 small boards.
 GLOBAL_BOARD_SIZE = 3   # 3x3 grid of small boards.
 
-# Players
-HUMAN = 'X'
-AI = 'O'
-
-# AI search parameter: increasing depth makes the AI stronger.
-SEARCH_DEPTH = 5
+# How often (ms) the Tk loop polls the background search for its result.
+AI_POLL_MS = 30
+# AI player: 'minimax' (iterative-deepening alpha-beta) or 'mcts' (UCT playouts).
+AI_ENGINE = 'minimax'
 
 # Dark mode colors and fonts (Material inspired)
 BG_COLOR = "#121212"              # Main window background.
@@ -37,159 +41,6 @@ PULSE_STEPS = 10        # Number of pulses steps for win animation.
 PULSE_DELAY = 70        # Delay (ms) between steps in win animation.
 SPLASH_DURATION = 2000  # Splash screen duration in ms.
 
-# ---------------------------
-# Helper Functions for CSP & Game Logic
-# ---------------------------
-def check_win(board):
-    """Check win condition for a 3x3 board."""
-    lines = []
-    # Rows and columns.
-    for i in range(3):
-        lines.append(board[i])
-        lines.append([board[r][i] for r in range(3)])
-    # Diagonals.
-    lines.append([board[i][i] for i in range(3)])
-    lines.append([board[i][2-i] for i in range(3)])
-    
-    for line in lines:
-        if line[0] is not None and all(cell == line[0] for cell in line):
-            return line[0]
-    return None
-
-def board_full(board):
-    return all(cell is not None for row in board for cell in row)
-
-def global_winner(global_state):
-    """Determine winner on the global board based on the small boards."""
-    global_board = [[global_state[gr][gc]['winner'] for gc in range(3)] for gr in range(3)]
-    return check_win(global_board)
-
-def available_moves(state, active_board):
-    """
-    Return all valid moves as (G_r, G_c, L_r, L_c).
-    Only cells in small boards not yet finished are allowed.
-    """
-    moves = []
-    if active_board is not None:
-        gr, gc = active_board
-        if state[gr][gc]['winner'] is None:
-            board = state[gr][gc]['cells']
-            if not board_full(board):
-                for lr in range(3):
-                    for lc in range(3):
-                        if board[lr][lc] is None:
-                            moves.append((gr, gc, lr, lc))
-                if moves:
-                    return moves  # Forced moves in the active board.
-    
-    # Otherwise, allow any empty cell in unfinished boards.
-    for gr in range(3):
-        for gc in range(3):
-            if state[gr][gc]['winner'] is None:
-                board = state[gr][gc]['cells']
-                for lr in range(3):
-                    for lc in range(3):
-                        if board[lr][lc] is None:
-                            moves.append((gr, gc, lr, lc))
-    return moves
-
-def apply_move(state, move, player):
-    """
-    Apply a move to the board state.
-    move: (G_r, G_c, L_r, L_c)
-    Returns a tuple (new_state, next_active_board).
-    """
-    new_state = copy.deepcopy(state)
-    gr, gc, lr, lc = move
-    new_state[gr][gc]['cells'][lr][lc] = player
-
-    board = new_state[gr][gc]['cells']
-    winner = check_win(board)
-    if winner:
-        new_state[gr][gc]['winner'] = winner
-    elif board_full(board):
-        new_state[gr][gc]['winner'] = 'D'  # D for draw
-
-    next_board = (lr, lc)
-    if new_state[next_board[0]][next_board[1]]['winner'] is not None:
-        next_board = None
-    return new_state, next_board
-
-def forward_check(state, move, player):
-    gr, gc, lr, lc = move
-    return state[gr][gc]['cells'][lr][lc] is None
-
-def ac3(state):
-    # For our case, we assume arc consistency is maintained by available_moves.
-    return True
-
-def evaluate_state(state):
-    """
-    Evaluate state for the minimax algorithm.
-    Returns a large positive value if AI is winning, negative if HUMAN is winning.
-    """
-    gw = global_winner(state)
-    if gw == AI:
-        return 1000
-    elif gw == HUMAN:
-        return -1000
-
-    score = 0
-    # Simple heuristic: count the advantage of each small board.
-    for gr in range(3):
-        for gc in range(3):
-            if state[gr][gc]['winner'] is None:
-                board = state[gr][gc]['cells']
-                for row in board:
-                    score += row.count(AI) - row.count(HUMAN)
-    return score
-
-def game_over(state):
-    return global_winner(state) is not None or len(available_moves(state, None)) == 0
-
-# ---------------------------
-# Minimax with Alpha-Beta Pruning
-# ---------------------------
-def minimax(state, active_board, depth, alpha, beta, maximizing_player):
-    if depth == 0 or game_over(state):
-        return evaluate_state(state), None
-    
-    moves = available_moves(state, active_board)
-    best_move = None
-    
-    if maximizing_player:
-        max_eval = -math.inf
-        for move in moves:
-            if not forward_check(state, move, AI):
-                continue
-            new_state, next_board = apply_move(state, move, AI)
-            if not ac3(new_state):
-                continue
-            eval_score, _ = minimax(new_state, next_board, depth - 1, alpha, beta, False)
-            if eval_score > max_eval:
-                max_eval = eval_score
-                best_move = move
-            alpha = max(alpha, eval_score)
-            if beta <= alpha:
-                break
-        return max_eval, best_move
-    else:
-        min_eval = math.inf
-        for move in moves:
-            if not forward_check(state, move, HUMAN):
-                continue
-            new_state, next_board = apply_move(state, move, HUMAN)
-            if not ac3(new_state):
-                continue
-            eval_score, _ = minimax(new_state, next_board, depth - 1, alpha, beta, True)
-            if eval_score < min_eval:
-                min_eval = eval_score
-                best_move = move
-            beta = min(beta, eval_score)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
-
 # ---------------------------
 # Enhanced Dark Mode GUI with Animations and Material Design
 # ---------------------------
@@ -227,6 +78,12 @@ class UltimateTTTGUI:
         self.splash_frame.destroy()
         self.build_ui()
         self.init_game_state()
+        self.table = TranspositionTable(TT_SIZE_BITS)
+        self.engine = MCTS() if AI_ENGINE == 'mcts' else None
+        self.book = load_optional(OpeningBook, BOOK_FILE)
+        self.endgame = load_optional(EndgameCache, ENDGAME_FILE)
+        self.search = None        # Background SearchWorker for the AI's move.
+        self.ponder = None        # SearchWorker pondering the predicted reply.
         self.active_board = None  # Free move initially.
         self.turn = HUMAN         # Human starts.
         self.update_status()
@@ -253,6 +110,7 @@ class UltimateTTTGUI:
         self.canvas = tk.Canvas(self.master, width=canvas_width, height=canvas_height, bg=CANVAS_BG, highlightthickness=0)
         self.canvas.pack(pady=10)
         self.canvas.bind("<Button-1>", self.on_click)
+        self.create_items()
 
     def init_game_state(self):
         """Initialize the game state as a 3x3 grid of small boards."""
@@ -267,81 +125,101 @@ class UltimateTTTGUI:
                 row.append(board)
             self.state.append(row)
 
+    def create_items(self):
+        """Create every canvas item once; draw_board only reconfigures them."""
+        self.cell_rects = {}    # (gr, gc, lr, lc) -> rectangle item id.
+        self.cell_texts = {}    # (gr, gc, lr, lc) -> text item id.
+        self.board_covers = {}  # (gr, gc) -> rectangle shown over a finished board.
+        self.board_marks = {}   # (gr, gc) -> big winner mark on the cover.
+        self.rendered = {}      # Item id -> {option: value} it was last configured with.
+        self.anim_jobs = {}     # (gr, gc) -> pending after() id of its win animation.
+        width = CELL_SIZE * SMALL_BOARD_SIZE
+        for gr in range(3):
+            for gc in range(3):
+                offset_x = gc * (width + BOARD_PADDING)
+                offset_y = gr * (width + BOARD_PADDING)
+                for lr in range(3):
+                    for lc in range(3):
+                        x1 = offset_x + lc * CELL_SIZE
+                        y1 = offset_y + lr * CELL_SIZE
+                        cell = (gr, gc, lr, lc)
+                        self.cell_rects[cell] = self.canvas.create_rectangle(
+                            x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, fill=CANVAS_BG, outline="#444444", width=1,
+                            tags=f"cell_{gr}_{gc}_{lr}_{lc}")
+                        self.cell_texts[cell] = self.canvas.create_text(
+                            x1 + CELL_SIZE // 2, y1 + CELL_SIZE // 2, text="", font=MOVE_FONT)
+                        self.rendered[self.cell_rects[cell]] = {'fill': CANVAS_BG}
+                        self.rendered[self.cell_texts[cell]] = {'text': ""}
+                self.board_covers[(gr, gc)] = self.canvas.create_rectangle(
+                    offset_x, offset_y, offset_x + width, offset_y + width,
+                    fill=INACTIVE_COLOR, outline="black", width=2, state=tk.HIDDEN)
+                self.board_marks[(gr, gc)] = self.canvas.create_text(
+                    offset_x + width // 2, offset_y + width // 2, text="", font=WIN_FONT, state=tk.HIDDEN)
+                self.rendered[self.board_covers[(gr, gc)]] = {'state': tk.HIDDEN}
+                self.rendered[self.board_marks[(gr, gc)]] = {'state': tk.HIDDEN, 'font': WIN_FONT}
+                self.canvas.create_rectangle(offset_x, offset_y, offset_x + width, offset_y + width,
+                                             outline="#777777", width=2)
+        margin = BOARD_PADDING // 2
+        self.canvas.create_rectangle(margin, margin, int(self.canvas["width"]) - margin,
+                                     int(self.canvas["height"]) - margin, outline="#bbbbbb", width=4)
+
+    def configure_item(self, item, **options):
+        """itemconfigure only the options of item that differ from what it already shows."""
+        current = self.rendered.setdefault(item, {})
+        changed = {key: value for key, value in options.items() if current.get(key) != value}
+        if changed:
+            current.update(changed)
+            self.canvas.itemconfigure(item, **changed)
+
     def draw_board(self):
-        self.canvas.delete("all")
-        # Iterate over each small board.
+        """Bring the canvas items in line with the state; only changed items are touched."""
         for gr in range(3):
             for gc in range(3):
-                offset_x = gc * (CELL_SIZE * SMALL_BOARD_SIZE + BOARD_PADDING)
-                offset_y = gr * (CELL_SIZE * SMALL_BOARD_SIZE + BOARD_PADDING)
-                
                 board_status = self.state[gr][gc]['winner']
-                if board_status is not None:
-                    # Draw a filled rectangle for finished board.
-                    self.canvas.create_rectangle(offset_x, offset_y, offset_x + CELL_SIZE*3, offset_y + CELL_SIZE*3,
-                                                 fill=INACTIVE_COLOR, outline="black", width=2)
-                    # Determine the mark and color.
+                cover, big_mark = self.board_covers[(gr, gc)], self.board_marks[(gr, gc)]
+                if board_status is None:
+                    self.configure_item(cover, state=tk.HIDDEN)
+                    self.configure_item(big_mark, state=tk.HIDDEN)
+                    playable = self.active_board is None or self.active_board == (gr, gc)
+                    for lr in range(3):
+                        for lc in range(3):
+                            mark = self.state[gr][gc]['cells'][lr][lc]
+                            fill_color = HIGHLIGHT_COLOR if playable and mark is None else CANVAS_BG
+                            self.configure_item(self.cell_rects[(gr, gc, lr, lc)], fill=fill_color)
+                            if mark:
+                                self.configure_item(self.cell_texts[(gr, gc, lr, lc)], text=mark,
+                                                    fill=X_COLOR if mark == HUMAN else O_COLOR)
+                            else:
+                                self.configure_item(self.cell_texts[(gr, gc, lr, lc)], text="")
+                elif (gr, gc) not in self.anim_jobs:
+                    # Newly finished board: show the cover and pulse its mark once.
                     if board_status in (HUMAN, AI):
                         mark = board_status
                         mark_color = X_COLOR if mark == HUMAN else O_COLOR
                     else:
                         mark = "D"
                         mark_color = DRAW_COLOR
-                    # Start win animation for this block.
-                    self.animate_win_block(offset_x, offset_y, mark, mark_color, step=0)
-                else:
-                    # Normal cells.
-                    for lr in range(3):
-                        for lc in range(3):
-                            x1 = offset_x + lc * CELL_SIZE
-                            y1 = offset_y + lr * CELL_SIZE
-                            x2 = x1 + CELL_SIZE
-                            y2 = y1 + CELL_SIZE
-                            tag = f"cell_{gr}_{gc}_{lr}_{lc}"
+                    self.configure_item(cover, state=tk.NORMAL)
+                    self.configure_item(big_mark, state=tk.NORMAL, text=mark, fill=mark_color)
+                    self.animate_win_block(gr, gc, step=0)
 
-                            if (self.active_board is None or (self.active_board == (gr, gc))) and \
-                               self.state[gr][gc]['cells'][lr][lc] is None:
-                                fill_color = HIGHLIGHT_COLOR
-                            else:
-                                fill_color = CANVAS_BG
-                            
-                            self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill_color, outline="#444444", width=1, tags=tag)
-                            
-                            mark = self.state[gr][gc]['cells'][lr][lc]
-                            if mark:
-                                mark_color = X_COLOR if mark == HUMAN else O_COLOR
-                                self.canvas.create_text((x1+x2)//2, (y1+y2)//2, text=mark, font=MOVE_FONT, fill=mark_color)
-                
-                self.canvas.create_rectangle(offset_x, offset_y,
-                                             offset_x + CELL_SIZE * SMALL_BOARD_SIZE,
-                                             offset_y + CELL_SIZE * SMALL_BOARD_SIZE,
-                                             outline="#777777", width=2)
-        margin = BOARD_PADDING // 2
-        self.canvas.create_rectangle(margin, margin,
-                                     self.canvas.winfo_width()-margin,
-                                     self.canvas.winfo_height()-margin, outline="#bbbbbb", width=4)
-
-    def animate_win_block(self, offset_x, offset_y, mark, mark_color, step):
+    def animate_win_block(self, gr, gc, step):
         """Animate the winning block: a pulsing effect for the big mark."""
         # Calculate a scale factor (pulsing between 1.0 and 1.2).
         factor = 1.0 + 0.2 * math.sin((step / PULSE_STEPS) * math.pi)
-        width = CELL_SIZE * SMALL_BOARD_SIZE
-        height = CELL_SIZE * SMALL_BOARD_SIZE
-        center_x = offset_x + width // 2
-        center_y = offset_y + height // 2
-        # Clear and redraw this block with scaled text.
-        self.canvas.create_rectangle(offset_x, offset_y, offset_x + width, offset_y + height,
-                                     fill=INACTIVE_COLOR, outline="black", width=2)
-        self.canvas.create_text(center_x, center_y, text=mark, font=(WIN_FONT[0], int(WIN_FONT[1]*factor), WIN_FONT[2]),
-                                fill=mark_color, tags="win_anim")
+        self.configure_item(self.board_marks[(gr, gc)], font=(WIN_FONT[0], int(WIN_FONT[1]*factor), WIN_FONT[2]))
         if step < PULSE_STEPS:
-            self.master.after(PULSE_DELAY, self.animate_win_block, offset_x, offset_y, mark, mark_color, step+1)
+            self.anim_jobs[(gr, gc)] = self.master.after(PULSE_DELAY, self.animate_win_block, gr, gc, step+1)
         else:
-            # Final static drawing for the block.
-            self.canvas.delete("win_anim")
-            self.canvas.create_rectangle(offset_x, offset_y, offset_x + width, offset_y + height,
-                                         fill=INACTIVE_COLOR, outline="black", width=2)
-            self.canvas.create_text(center_x, center_y, text=mark, font=WIN_FONT, fill=mark_color)
+            # Done; the entry stays so the board is not animated again.
+            self.anim_jobs[(gr, gc)] = None
+
+    def stop_animations(self):
+        """Cancel pending win animations and forget which boards were animated."""
+        for job in self.anim_jobs.values():
+            if job is not None:
+                self.master.after_cancel(job)
+        self.anim_jobs.clear()
 
     def update_status(self):
         """Update the status label with move count and current turn."""
@@ -353,8 +231,8 @@ class UltimateTTTGUI:
         self.status_label.config(text=status_text)
 
     def on_click(self, event):
-        if self.animating:
-            return  # ignore clicks during animations
+        if self.animating or self.turn != HUMAN:
+            return  # ignore clicks during animations and while the AI thinks
         x, y = event.x, event.y
         for gr in range(3):
             for gc in range(3):
@@ -385,28 +263,77 @@ class UltimateTTTGUI:
 
         winner = global_winner(self.state)
         if winner:
+            self.stop_searches()
             self.status_label.config(text=f"Game Over: {winner} wins!")
             messagebox.showinfo("Game Over", f"Player {winner} wins the game!")
             return
         
         if len(available_moves(self.state, self.active_board)) == 0:
+            self.stop_searches()
             self.status_label.config(text="Game Over: Draw!")
             messagebox.showinfo("Game Over", "It's a draw!")
             return
 
         if player == HUMAN:
-            self.master.after(500, self.ai_move)
+            self.ai_move()
+        else:
+            self.start_ponder()
 
     def ai_move(self):
-        _, move = minimax(self.state, self.active_board, SEARCH_DEPTH, -math.inf, math.inf, True)
+        """Start (or adopt the pondering) background search and poll for it."""
+        board = BitBoard.from_state(self.state, self.active_board)
+        if self.ponder is not None and self.ponder.root_hash == board.hash:
+            self.ponder.ponderhit(AI_TIME_BUDGET_MS)
+            self.search = self.ponder
+        else:
+            self.stop_searches()
+            self.search = SearchWorker(board, AI_TIME_BUDGET_MS, self.table, engine=self.engine,
+                                       book=self.book, endgame=self.endgame)
+            self.search.start()
+        self.ponder = None
+        self.master.after(AI_POLL_MS, self.poll_ai_move, self.search)
+
+    def poll_ai_move(self, worker):
+        if worker is not self.search:
+            return  # Cancelled by a restart.
+        result = worker.poll()
+        if result is None:
+            self.master.after(AI_POLL_MS, self.poll_ai_move, worker)
+            return
+        self.search = None
+        _, move, _ = result
         if move is None:
             self.status_label.config(text="Game Over: Draw!")
             messagebox.showinfo("Game Over", "It's a draw!")
             return
-        self.make_move(move, AI)
+        self.make_move(index_to_move(move), AI)
+
+    def start_ponder(self):
+        """Search the position after the human's most likely reply (the TT move)."""
+        if self.engine is not None:
+            return  # MCTS keeps its tree between turns instead.
+        board = BitBoard.from_state(self.state, self.active_board)
+        entry = self.table.probe(board.hash)
+        if entry is None or entry[3] not in board.moves():
+            return
+        board.make(entry[3], HUMAN_SIDE)
+        if board.game_over():
+            return
+        self.ponder = SearchWorker(board, math.inf, self.table, book=self.book, endgame=self.endgame)
+        self.ponder.start()
+
+    def stop_searches(self):
+        """Cancel the running search and any ponder; wait so the TT is idle."""
+        for worker in (self.search, self.ponder):
+            if worker is not None:
+                worker.cancel()
+        self.search = None
+        self.ponder = None
 
     def restart_game(self):
         """Reset the game state and GUI."""
+        self.stop_searches()
+        self.stop_animations()
         self.move_count = 0
         self.turn = HUMAN
         self.active_board = None
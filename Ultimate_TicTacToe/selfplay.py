@@ -0,0 +1,187 @@
+"""
+Headless self-play and benchmark harness for the Ultimate Tic-Tac-Toe engine.
+
+Runs the fixed position suite (suite.txt) and/or seeded minimax self-play
+games and reports nodes searched, nodes/sec, branching factor, cutoff rates
+and time-to-move percentiles. With --json the results are written to a file
+so runs from different commits can be diffed.
+
+Usage: python selfplay.py [--mode all|suite|selfplay] [--depth 6 | --budget-ms 500]
+                          [--games 4] [--random-plies N] [--seed 1] [--json results.json]
+                          [--book opening_book.bin] [--endgame endgame_cache.bin]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import time
+
+from bitboard import BitBoard, index_to_move
+from book import EndgameCache, OpeningBook
+from ttable import TranspositionTable
+from engine import AI_SIDE, TT_SIZE_BITS, SearchStats, iterative_deepening, minimax
+
+SUITE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "suite.txt")
+
+# Random opening moves before the engine plays both sides.
+RANDOM_PLIES = 4
+
+
+def load_suite(path):
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith("#")]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Harness:
+    """Searches positions with one configuration and accumulates the metrics."""
+
+    def __init__(self, depth, budget_ms, tt_bits, book=None, endgame=None):
+        self.depth = depth
+        self.budget_ms = budget_ms
+        self.book = book
+        self.endgame = endgame
+        for table in (book, endgame):
+            if table is not None:
+                table.reset_counters()
+        self.table = TranspositionTable(tt_bits)
+        self.stats = SearchStats()
+        self.move_times = []
+
+    def choose(self, board):
+        """Search board for the side to move; returns (score, move index, depth)."""
+        maximizing = board.side_to_move() == AI_SIDE
+        start = time.perf_counter()
+        if self.budget_ms is not None:
+            score, move, depth = iterative_deepening(board, self.budget_ms, self.table, maximizing,
+                                                     stats=self.stats, book=self.book, endgame=self.endgame)
+        else:
+            entry = self.book.probe(board) if self.book is not None else None
+            if entry is not None:
+                score, move, depth = entry
+            else:
+                self.table.new_search()
+                score, move = minimax(board, self.depth, -math.inf, math.inf, maximizing, self.stats, self.table,
+                                      endgame=self.endgame)
+                depth = self.depth
+        self.move_times.append(time.perf_counter() - start)
+        return score, move, depth
+
+    def summary(self):
+        elapsed = sum(self.move_times)
+        ms = [t * 1000 for t in self.move_times] or [0.0]
+        tables = {name: {"lookups": table.lookups, "hits": table.hits, "hit_rate": round(table.hit_rate(), 4)}
+                  for name, table in (("book", self.book), ("endgame", self.endgame)) if table is not None}
+        return {
+            "moves": len(self.move_times),
+            "nodes": self.stats.nodes,
+            "seconds": round(elapsed, 4),
+            "nodes_per_sec": round(self.stats.nodes / elapsed) if elapsed else 0,
+            "branching_factor": round(self.stats.branching_factor(), 3),
+            "cutoff_rate": round(self.stats.cutoff_rate(), 4),
+            "first_move_cutoff_rate": round(self.stats.first_cutoff_rate(), 4),
+            "time_ms": {
+                "p50": round(percentile(ms, 50), 2),
+                "p90": round(percentile(ms, 90), 2),
+                "p99": round(percentile(ms, 99), 2),
+                "max": round(max(ms), 2),
+            },
+            "tables": tables,
+        }
+
+
+def run_suite(harness, positions):
+    results = []
+    for text in positions:
+        board = BitBoard.from_string(text)
+        score, move, depth = harness.choose(board)
+        results.append({"position": text, "score": score, "depth": depth,
+                        "move": None if move is None else index_to_move(move)})
+    return results
+
+
+def run_selfplay(harness, games, random_plies, seed):
+    """Seeded games: random_plies random opening moves, then the engine for both sides."""
+    rng = random.Random(seed)
+    results = []
+    for game in range(games):
+        board = BitBoard()
+        moves = []
+        while not board.game_over():
+            side = board.side_to_move()
+            if len(moves) < random_plies:
+                move = rng.choice(board.moves())
+            else:
+                move = harness.choose(board)[1]
+            board.make(move, side)
+            moves.append(move)
+        winner = board.winner()
+        results.append({"game": game, "winner": "draw" if winner is None else "XO"[winner],
+                        "plies": len(moves), "moves": moves})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=("all", "suite", "selfplay"), default="all")
+    parser.add_argument("--depth", type=int, default=6, help="fixed search depth (ignored with --budget-ms)")
+    parser.add_argument("--budget-ms", type=int, help="use iterative deepening with this budget per move")
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--random-plies", type=int,
+                        help=f"random opening moves per game (default {RANDOM_PLIES}, or the book's ply limit "
+                             "with --book, so the engine's first move is a book position)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tt-bits", type=int, default=TT_SIZE_BITS)
+    parser.add_argument("--suite", default=SUITE_FILE)
+    parser.add_argument("--book", help="opening book file (build_book.py book)")
+    parser.add_argument("--endgame", help="endgame cache file (build_book.py endgame)")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    book = OpeningBook(args.book) if args.book else None
+    endgame = EndgameCache(args.endgame) if args.endgame else None
+    if args.random_plies is None:
+        args.random_plies = RANDOM_PLIES if book is None else min(RANDOM_PLIES, book.param)
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "python": platform.python_version(),
+    }
+    if args.mode in ("all", "suite"):
+        harness = Harness(args.depth, args.budget_ms, args.tt_bits, book, endgame)
+        report["suite"] = {"positions": run_suite(harness, load_suite(args.suite)), "summary": harness.summary()}
+    if args.mode in ("all", "selfplay"):
+        harness = Harness(args.depth, args.budget_ms, args.tt_bits, book, endgame)
+        games = run_selfplay(harness, args.games, args.random_plies, args.seed)
+        report["selfplay"] = {"games": games, "summary": harness.summary()}
+
+    for section in ("suite", "selfplay"):
+        if section not in report:
+            continue
+        summary = report[section]["summary"]
+        times = summary["time_ms"]
+        print(f"{section}: moves={summary['moves']} nodes={summary['nodes']} "
+              f"nodes/s={summary['nodes_per_sec']} bf={summary['branching_factor']} "
+              f"cutoffs={summary['cutoff_rate']:.1%} first-move={summary['first_move_cutoff_rate']:.1%} "
+              f"ms p50/p90/p99/max={times['p50']}/{times['p90']}/{times['p99']}/{times['max']}")
+        for name, counts in summary["tables"].items():
+            print(f"{section} {name}: lookups={counts['lookups']} hits={counts['hits']} "
+                  f"hit-rate={counts['hit_rate']:.1%}")
+    if "selfplay" in report:
+        winners = [game["winner"] for game in report["selfplay"]["games"]]
+        print(f"selfplay results: X={winners.count('X')} O={winners.count('O')} draws={winners.count('draw')}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
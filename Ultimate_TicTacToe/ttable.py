@@ -0,0 +1,104 @@
+"""
+Fixed-size transposition table for the Ultimate Tic-Tac-Toe search.
+
+Entries live in parallel typed arrays (no per-entry objects), indexed by the
+low bits of the position's Zobrist key. The full 64-bit key is stored so that
+two positions sharing a slot are told apart and counted as a collision.
+"""
+from array import array
+
+# Bound flags stored with each score.
+EXACT = 0   # Score is the true minimax value at the stored depth.
+LOWER = 1   # Search failed high: the true value is >= score.
+UPPER = 2   # Search failed low: the true value is <= score.
+
+NO_MOVE = -1
+EMPTY_KEY = 0
+
+# Bytes per entry: key (8) + score (4) + depth, flag, move, generation (1 each).
+ENTRY_BYTES = 16
+
+
+class TranspositionTable:
+    """
+    Depth-preferred table with aging: a slot is overwritten when it is empty,
+    holds the same position, was written by an older search, or was searched
+    less deeply than the new entry.
+    """
+
+    def __init__(self, size_bits=18):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.keys = array('Q', bytes(8 * self.size))
+        self.scores = array('i', bytes(4 * self.size))
+        self.depths = array('b', bytes(self.size))
+        self.flags = array('b', bytes(self.size))
+        self.moves = array('b', [NO_MOVE]) * self.size
+        self.generations = array('B', bytes(self.size))
+        self.generation = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        """Age existing entries so the next search may replace them freely."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """Drop every entry (counters are left alone)."""
+        self.keys = array('Q', bytes(8 * self.size))
+        self.generation = 0
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) for key, or None on a miss."""
+        slot = key & self.mask
+        stored = self.keys[slot]
+        if stored == key:
+            self.hits += 1
+            return self.depths[slot], self.flags[slot], self.scores[slot], self.moves[slot]
+        if stored != EMPTY_KEY:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        slot = key & self.mask
+        stored = self.keys[slot]
+        if stored != EMPTY_KEY and stored != key:
+            if self.generations[slot] == self.generation and self.depths[slot] > depth:
+                return
+            self.overwrites += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.scores[slot] = score
+        self.moves[slot] = NO_MOVE if move is None else move
+        self.generations[slot] = self.generation
+        self.stores += 1
+
+    def memory_bytes(self):
+        return self.size * ENTRY_BYTES
+
+    def filled(self):
+        """Number of occupied slots (a full scan; meant for reporting only)."""
+        return self.size - self.keys.tolist().count(EMPTY_KEY)
+
+    def counters(self):
+        """Hit/miss/collision counters plus fill level, for tuning size_bits."""
+        probes = self.hits + self.misses
+        return {
+            'size': self.size,
+            'memory_bytes': self.memory_bytes(),
+            'filled': self.filled(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }